@@ -2,134 +2,12 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import requests
 from datetime import datetime
-import os
 from dotenv import load_dotenv
-from utils.supabase_client import get_standings, get_recent_games, get_current_season, get_available_seasons, get_leones_advanced_stats, get_batting_stats, get_pitching_stats
-from utils.ai_insights import get_ai_insights
-
-# Constantes para WPA
-TEAM_ID = 695  # Leones del Caracas
-
-# ========================================
-# FUNCIONES WPA PARA MVP DEL ÚLTIMO JUEGO
-# ========================================
-
-def calculate_wp(inning: int, diff: int) -> float:
-    """Calcula Win Probability simple basado en inning y diferencial"""
-    leverage = min(inning / 9.0, 1.0)
-    wp = 1.0 / (1.0 + np.exp(-0.75 * diff))
-    return max(0.0, min(1.0, wp + 0.25 * leverage * (wp - 0.5)))
-
-
-@st.cache_data(ttl=600)
-def get_game_wpa_mvp(game_pk: int) -> dict:
-    """Obtiene el MVP del juego basado en WPA"""
-    try:
-        # Obtener feed del juego
-        url = f"https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
-        response = requests.get(url, timeout=30)
-        feed = response.json()
-
-        # Identificar si Leones es local
-        home_id = feed["gameData"]["teams"]["home"]["id"]
-        leones_is_home = (home_id == TEAM_ID)
-
-        # Procesar jugadas
-        all_plays = feed.get("liveData", {}).get("plays", {}).get("allPlays", [])
-
-        if not all_plays:
-            return None
-
-        wpa_data = {}
-        prev_wp = 0.5
-        home_score = away_score = 0
-
-        for play in all_plays:
-            about = play.get("about", {})
-            matchup = play.get("matchup", {})
-
-            inning = about.get("inning", 1)
-            half = about.get("halfInning", "top")
-
-            # Calcular carreras
-            runs = sum(1 for runner in play.get("runners", [])
-                       if runner.get("movement", {}).get("end") == "score")
-
-            if half == "bottom":
-                home_score += runs
-            else:
-                away_score += runs
-
-            # Perspectiva Leones
-            leones_score = home_score if leones_is_home else away_score
-            opp_score = away_score if leones_is_home else home_score
-
-            # Calcular WPA
-            diff = leones_score - opp_score
-            wp_after = calculate_wp(inning, diff)
-            wpa = wp_after - prev_wp
-
-            # Acumular WPA por jugador
-            batter_id = matchup.get("batter", {}).get("id")
-            batter_name = matchup.get("batter", {}).get("fullName", "Desconocido")
-            pitcher_id = matchup.get("pitcher", {}).get("id")
-            pitcher_name = matchup.get("pitcher", {}).get("fullName", "Desconocido")
-
-            if batter_id:
-                if batter_id not in wpa_data:
-                    wpa_data[batter_id] = {"name": batter_name, "wpa_bat": 0, "wpa_pit": 0}
-                wpa_data[batter_id]["wpa_bat"] += wpa
-
-            if pitcher_id:
-                if pitcher_id not in wpa_data:
-                    wpa_data[pitcher_id] = {"name": pitcher_name, "wpa_bat": 0, "wpa_pit": 0}
-                wpa_data[pitcher_id]["wpa_pit"] += wpa
-
-            prev_wp = wp_after
-
-        # Obtener roster de Leones
-        try:
-            box_url = f"https://statsapi.mlb.com/api/v1/game/{game_pk}/boxscore"
-            box_response = requests.get(box_url, timeout=30)
-            box = box_response.json()
-
-            roster_ids = set()
-            for side in ["home", "away"]:
-                team_data = box.get("teams", {}).get(side, {})
-                if team_data.get("team", {}).get("id") == TEAM_ID:
-                    for player_id, _ in team_data.get("players", {}).items():
-                        try:
-                            roster_ids.add(int(player_id.replace("ID", "")))
-                        except:
-                            pass
-        except:
-            roster_ids = set()
-
-        # Calcular WPA total y filtrar solo Leones
-        mvp = None
-        max_wpa = -999
-
-        for player_id, data in wpa_data.items():
-            if roster_ids and player_id not in roster_ids:
-                continue
-
-            total_wpa = data["wpa_bat"] + data["wpa_pit"]
-            if total_wpa > max_wpa:
-                max_wpa = total_wpa
-                mvp = {
-                    "name": data["name"],
-                    "wpa_total": total_wpa,
-                    "wpa_bat": data["wpa_bat"],
-                    "wpa_pit": data["wpa_pit"]
-                }
-
-        return mvp
-
-    except Exception as e:
-        return None
+from utils.supabase_client import get_current_season, get_available_seasons
+from utils.home_loader import load_home_data, wait_for
+from utils.live import POLL_INTERVAL_S, get_live_tracker, inning_label
+from utils.warmup import start_background_warmup
 
 # Cargar variables de entorno
 load_dotenv()
@@ -141,6 +19,9 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+
+# Precarga en segundo plano de la temporada actual (una vez por proceso)
+start_background_warmup()
 # app.py - Después de st.set_page_config()
 
 # CSS para cambiar "app" por "Home" y alinearlo correctamente
@@ -258,9 +139,6 @@ with col2:
 with col3:
     st.write("")
 
-# Importar funciones DESPUÉS del header
-from utils.supabase_client import get_standings, get_recent_games, get_current_season, get_available_seasons
-
 # Sidebar COMPLETO
 with st.sidebar:
     st.image("logo.png", width=200)  # ← Usando tu logo.png local
@@ -313,8 +191,9 @@ with st.sidebar:
     st.markdown("[📊 MLB Stats API](https://statsapi.mlb.com)")
 
 # CONTENIDO PRINCIPAL - Dashboard con datos reales
-# Obtener datos reales
-standings_df = get_standings(selected_season)  # Usar selected_season
+# Todos los datos de la Home se piden a la vez; cada sección espera el suyo
+home_data = load_home_data(selected_season)
+standings_df = wait_for(home_data["standings"], height=110)  # Usar selected_season
 
 # Datos de los Leones
 if not standings_df.empty:
@@ -427,12 +306,51 @@ with col4:
 
 st.markdown("---")
 
+# Juego en vivo: el fragment se refresca solo, sin recargar el resto de la página
+live_game = wait_for(home_data["live_game"], height=60)
+
+@st.fragment(run_every=POLL_INTERVAL_S)
+def live_game_card(game_pk):
+    tracker = get_live_tracker(game_pk)
+    try:
+        tracker.poll()
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo actualizar el juego en vivo: {str(e)[:80]}")
+    if tracker.feed is None:
+        return
+
+    teams = tracker.feed.get("gameData", {}).get("teams", {})
+    linescore = tracker.linescore()
+    away_runs = linescore.get("teams", {}).get("away", {}).get("runs", 0)
+    home_runs = linescore.get("teams", {}).get("home", {}).get("runs", 0)
+    inning_text = "Final" if tracker.is_final else inning_label(linescore)
+
+    df_live = tracker.frame()
+    wp_text = f"{df_live.iloc[-1]['wp_after']:.0%}" if not df_live.empty else "50%"
+    last_play = df_live.iloc[-1]['description'] if not df_live.empty else ""
+
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+                padding: 1.25rem; border-radius: 1rem; border: 2px solid #CE1141;'>
+        <p style='color: #CE1141; font-weight: bold; margin: 0;'>🔴 EN VIVO · {inning_text}</p>
+        <h2 style='color: white; text-align: center; margin: 0.5rem 0;'>
+            {teams.get('away', {}).get('name', 'Visitante')} {away_runs} - {home_runs} {teams.get('home', {}).get('name', 'Local')}
+        </h2>
+        <p style='color: #FDB827; text-align: center; margin: 0;'>Probabilidad de victoria Leones: <b>{wp_text}</b></p>
+        <p style='color: #888; text-align: center; margin: 0.5rem 0 0 0; font-size: 0.85rem;'>{last_play}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+if live_game:
+    live_game_card(live_game["gamePk"])
+    st.markdown("---")
+
 # Tabs principales
 tab1, tab2, tab3, tab4 = st.tabs(["📅 Último Juego", "📈 Tendencias", "🌟 Líderes del Equipo", "🦁 Leones Stats"])
 
 with tab1:
     # Obtener último juego real
-    recent_games = get_recent_games(team_id=695, limit=1)
+    recent_games = wait_for(home_data["last_game"], height=160)
     
     col1, col2 = st.columns([2, 1])
     
@@ -494,7 +412,7 @@ with tab1:
             game_pk = last_game.get('id')
 
             if game_pk:
-                mvp_data = get_game_wpa_mvp(game_pk)
+                mvp_data = wait_for(home_data["mvp"], height=160)
 
                 if mvp_data:
                     wpa_color = "#196F3D" if mvp_data['wpa_total'] > 0 else "#922B21"
@@ -534,7 +452,7 @@ with tab1:
 with tab2:
     st.markdown("### 📊 Últimos 10 Juegos")
     
-    recent_10 = get_recent_games(team_id=695, limit=10)
+    recent_10 = wait_for(home_data["recent_10"], height=300)
     
     if not recent_10.empty:
         games_display = []
@@ -589,8 +507,8 @@ with tab2:
 
 with tab3:
     # Obtener estadísticas de bateo y pitcheo
-    batting_df = get_batting_stats(team_id=695, limit=10, season=selected_season)
-    pitching_df = get_pitching_stats(team_id=695, limit=10, season=selected_season)
+    batting_df = wait_for(home_data["batting"], height=300)
+    pitching_df = wait_for(home_data["pitching"], height=300)
 
     col1, col2 = st.columns(2)
 
@@ -692,7 +610,7 @@ with tab4:
     st.markdown("### 🦁 Leones del Caracas 25-26")
     
     # Obtener estadísticas avanzadas
-    advanced_stats = get_leones_advanced_stats(selected_season)
+    advanced_stats = wait_for(home_data["advanced"], height=300)
     
     if advanced_stats:
         col1, col2 = st.columns(2)
@@ -727,50 +645,38 @@ with tab4:
 st.markdown("---")
 st.markdown("### 🧠 Datos Curiosos con IA")
 
-# Verificar si hay API key disponible
-api_key_available = os.environ.get("OPENAI_API_KEY") is not None
-if not api_key_available:
-    try:
-        api_key_available = st.secrets.get("OPENAI_API_KEY") is not None
-    except:
-        pass
+# Sin API key igual se muestran los insights precalculados por la ingesta
+st.markdown("""
+<div style='background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+            padding: 1rem; border-radius: 0.5rem; margin-bottom: 1rem;
+            border-left: 4px solid #FDB827;'>
+    <span style='color: #888;'>Genera insights estadísticos interesantes sobre los Leones usando inteligencia artificial.</span>
+</div>
+""", unsafe_allow_html=True)
 
-if not api_key_available:
-    st.warning("⚠️ Para usar esta función, configura tu API key de OpenAI en las variables de entorno (OPENAI_API_KEY).")
-else:
-    st.markdown("""
-    <div style='background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-                padding: 1rem; border-radius: 0.5rem; margin-bottom: 1rem;
-                border-left: 4px solid #FDB827;'>
-        <span style='color: #888;'>Genera insights estadísticos interesantes sobre los Leones usando inteligencia artificial.</span>
-    </div>
-    """, unsafe_allow_html=True)
+if st.button("🔮 Generar Insights", type="primary", use_container_width=True):
+    # Import diferido: el cliente de OpenAI solo se carga al pedir insights
+    from utils.ai_insights import get_ai_insights
 
-    if st.button("🔮 Generar Insights", type="primary", use_container_width=True):
-        with st.spinner("Analizando datos con IA..."):
-            insights, error = get_ai_insights(
-                standings_df=standings_df,
-                recent_games=get_recent_games(team_id=695, limit=10),
-                batting_stats=batting_df if 'batting_df' in dir() else None,
-                pitching_stats=pitching_df if 'pitching_df' in dir() else None,
-                advanced_stats=get_leones_advanced_stats(selected_season)
-            )
-
-            if error:
-                st.error(f"❌ {error}")
-            elif insights:
-                st.markdown(f"""
-                <div style='background: linear-gradient(135deg, #0f0f23 0%, #1a1a3e 100%);
-                            padding: 1.5rem; border-radius: 1rem;
-                            border: 1px solid #FDB827;'>
-                    <div style='color: #e0e0e0; line-height: 1.6;'>
-                        {insights}
-                    </div>
-                    <p style='color: #666; font-size: 0.75rem; margin-top: 1rem; text-align: right;'>
-                        Generado por OpenAI | Los datos son actualizados diariamente
-                    </p>
+    # Snapshot de la ingesta si existe para los datos actuales; si no, en vivo
+    with st.spinner("Analizando datos con IA..."):
+        insights, error = get_ai_insights(selected_season)
+
+        if error:
+            st.error(f"❌ {error}")
+        elif insights:
+            st.markdown(f"""
+            <div style='background: linear-gradient(135deg, #0f0f23 0%, #1a1a3e 100%);
+                        padding: 1.5rem; border-radius: 1rem;
+                        border: 1px solid #FDB827;'>
+                <div style='color: #e0e0e0; line-height: 1.6;'>
+                    {insights}
                 </div>
-                """, unsafe_allow_html=True)
+                <p style='color: #666; font-size: 0.75rem; margin-top: 1rem; text-align: right;'>
+                    Generado por OpenAI | Los datos son actualizados diariamente
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
 
 st.markdown("---")
 
@@ -0,0 +1,131 @@
+# benchmarks/fake_openai.py
+"""
+Endpoint local compatible con la API de chat completions de OpenAI, para
+probar los insights de IA (utils/ai_insights.py) sin la API real.
+
+Responde de forma determinística (el contenido depende del hash del prompt),
+con una latencia configurable para simular la generación, y cuenta las
+llamadas recibidas.
+
+Uso en código:
+  with FakeOpenAI(latency_s=0.5) as fake:
+      os.environ["OPENAI_BASE_URL"] = fake.base_url
+      ...
+      fake.calls  # requests recibidas
+
+Uso como servidor:
+  python benchmarks/fake_openai.py --port 8765
+  OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake streamlit run app.py
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_completion(payload):
+    """Respuesta de chat completion para el request `payload`"""
+    prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    content = (
+        f"- ⚾ Insight de prueba {digest} ({len(prompt)} caracteres de prompt)\n"
+        "- 🦁 Generado por benchmarks/fake_openai.py"
+    )
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-{digest}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class FakeOpenAI:
+    """Servidor HTTP en un hilo; `base_url` va en OPENAI_BASE_URL"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_s=0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._reply(404, {"error": {"message": f"Ruta no soportada: {self.path}"}})
+                    return
+                with fake._lock:
+                    fake.calls += 1
+                time.sleep(fake.latency_s)
+                self._reply(200, fake_completion(payload))
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint local compatible con OpenAI chat completions")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos de espera por respuesta")
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(args.host, args.port, args.latency)
+    print(f"🤖 Endpoint falso de OpenAI en {fake.base_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+# benchmarks/fake_supabase.py
+"""
+Doble en memoria del cliente de Supabase (supabase-py / postgrest-py).
+
+Implementa el subconjunto de la API de queries que usa el proyecto:
+select (incluyendo recursos embebidos como `players!inner(full_name)` o
+`home_team:teams!games_home_team_id_fkey(name)`), eq/neq/gt/gte/lt/lte/in_/
+or_, order, limit, range, upsert, insert y delete. Cuenta cada `execute()`
+para que los benchmarks reporten round trips además de tiempos.
+"""
+
+import copy
+from collections import Counter
+
+# Llave primaria por tabla (para upsert)
+PRIMARY_KEYS = {
+    "games": ("id",),
+    "teams": ("id",),
+    "players": ("id",),
+    "batting_stats": ("game_id", "player_id"),
+    "pitching_stats": ("game_id", "player_id"),
+    "standings": ("season", "team_id"),
+    "elo_ratings": ("season", "phase", "team_id"),
+    "elo_game_log": ("season", "phase", "game_id"),
+    "game_innings": ("game_id", "inning"),
+    "game_facts": ("game_id", "team_id"),
+    "plate_appearances": ("game_id", "at_bat_index"),
+    "pitches": ("game_id", "at_bat_index", "pitch_number"),
+    "ingest_runs": ("id",),
+    "data_version": ("season",),
+    "ingest_dead_letters": ("kind", "key"),
+    "ai_insights": ("season", "prompt_hash"),
+}
+
+# Relaciones para recursos embebidos: (tabla, destino) -> [(hint, columna_local, columna_destino)]
+FOREIGN_KEYS = {
+    ("batting_stats", "players"): [(None, "player_id", "id")],
+    ("batting_stats", "games"): [(None, "game_id", "id")],
+    ("pitching_stats", "players"): [(None, "player_id", "id")],
+    ("pitching_stats", "games"): [(None, "game_id", "id")],
+    ("games", "teams"): [
+        ("games_home_team_id_fkey", "home_team_id", "id"),
+        ("games_away_team_id_fkey", "away_team_id", "id"),
+    ],
+    ("elo_ratings", "teams"): [(None, "team_id", "id")],
+    ("standings", "teams"): [(None, "team_id", "id")],
+    ("players", "teams"): [(None, "team_id", "id")],
+}
+
+
+class FakeAPIError(Exception):
+    """Imita postgrest.exceptions.APIError (args[0] es un dict con code/message)."""
+
+    def __init__(self, code, message):
+        super().__init__({"code": code, "message": message})
+        self.code = code
+        self.message = message
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(text, sep=","):
+    """Divide por `sep` ignorando separadores dentro de paréntesis."""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _parse_select(columns):
+    """Retorna (columnas_planas, embebidos) de un select de PostgREST."""
+    plain, embeds = [], []
+    for item in _split_top_level(columns or "*"):
+        if "(" in item:
+            head, inner = item.split("(", 1)
+            inner = inner.rsplit(")", 1)[0]
+            alias = None
+            if ":" in head:
+                alias, head = head.split(":", 1)
+            target, hint, inner_join = head, None, False
+            if "!" in head:
+                target, modifier = head.split("!", 1)
+                if modifier == "inner":
+                    inner_join = True
+                else:
+                    hint = modifier
+            embeds.append({
+                "alias": (alias or target).strip(),
+                "table": target.strip(),
+                "hint": hint,
+                "inner": inner_join,
+                "columns": _parse_select(inner)[0],
+            })
+        else:
+            plain.append(item.strip())
+    return plain, embeds
+
+
+def _coerce_equal(a, b):
+    if a is None or b is None:
+        return a is b
+    return a == b or str(a) == str(b)
+
+
+def _compare(op, value, target):
+    if op == "eq":
+        return _coerce_equal(value, target)
+    if op == "neq":
+        return not _coerce_equal(value, target)
+    if op == "in":
+        # target es un frozenset de strings (ver _in_set)
+        return value is not None and str(value) in target
+    if op == "is":
+        return value is None if str(target).lower() == "null" else value == target
+    if value is None:
+        return False
+    try:
+        left, right = (value, target) if not isinstance(value, str) else (value, str(target))
+        if not isinstance(value, str) and isinstance(target, str):
+            right = type(value)(target)
+        if op == "gt":
+            return left > right
+        if op == "gte":
+            return left >= right
+        if op == "lt":
+            return left < right
+        if op == "lte":
+            return left <= right
+    except (TypeError, ValueError):
+        return False
+    raise ValueError(f"Operador no soportado: {op}")
+
+
+def _in_set(values):
+    return frozenset(str(v) for v in values)
+
+
+def _parse_or(expression):
+    """'a.eq.1,b.in.(2,3)' -> [(a, eq, '1'), (b, in, ['2', '3'])]"""
+    conditions = []
+    for part in _split_top_level(expression):
+        column, op, raw = part.split(".", 2)
+        if op == "in":
+            raw = _in_set(v.strip() for v in raw.strip("()").split(",") if v.strip())
+        conditions.append((column, op, raw))
+    return conditions
+
+
+class FakeQuery:
+    def __init__(self, db, table_name):
+        self.db = db
+        self.table_name = table_name
+        self.action = "select"
+        self.columns = "*"
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.or_groups = []
+        self.orders = []
+        self.limit_n = None
+        self.offset = 0
+
+    # --- acciones ---
+    def select(self, columns="*", count=None):
+        self.action = "select"
+        self.columns = columns
+        return self
+
+    def upsert(self, payload, on_conflict=None, **kwargs):
+        self.action = "upsert"
+        self.payload = payload
+        self.on_conflict = on_conflict
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.action = "insert"
+        self.payload = payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self.action = "update"
+        self.payload = payload
+        return self
+
+    def delete(self, **kwargs):
+        self.action = "delete"
+        return self
+
+    # --- filtros ---
+    def _add(self, column, op, value):
+        self.filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._add(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._add(column, "in", _in_set(values))
+
+    def is_(self, column, value):
+        return self._add(column, "is", value)
+
+    def or_(self, expression, **kwargs):
+        self.or_groups.append(_parse_or(expression))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n, **kwargs):
+        self.limit_n = n
+        return self
+
+    def range(self, start, end, **kwargs):
+        self.offset = start
+        self.limit_n = end - start + 1
+        return self
+
+    # --- ejecución ---
+    def _matches(self, row, filters):
+        for column, op, value in filters:
+            if "." in column:
+                continue
+            if not _compare(op, row.get(column), value):
+                return False
+        return True
+
+    def _embed(self, row, embed):
+        relations = self.db.foreign_keys.get((self.table_name, embed["table"]), [])
+        relation = next((r for r in relations if embed["hint"] in (None, r[0])), None)
+        if relation is None:
+            raise FakeAPIError("PGRST200", f"No relationship between {self.table_name} and {embed['table']}")
+        _, local_col, target_col = relation
+        target = self.db.index(embed["table"], target_col).get(row.get(local_col))
+        if target is None:
+            return None
+        if embed["columns"] in ([], ["*"]):
+            return dict(target)
+        return {c: target.get(c) for c in embed["columns"]}
+
+    def _rows(self):
+        table = self.db.tables.get(self.table_name, [])
+        rows = [r for r in table if self._matches(r, self.filters)]
+        for group in self.or_groups:
+            rows = [r for r in rows if any(_compare(op, r.get(c), v) for c, op, v in group)]
+        return rows
+
+    def execute(self):
+        self.db.calls[(self.table_name, self.action)] += 1
+        if self.action == "select":
+            return FakeResponse(self._select())
+        if self.action in ("upsert", "insert"):
+            return FakeResponse(self.db.write(self.table_name, self.payload, self.action, self.on_conflict))
+        if self.action == "update":
+            rows = self._rows()
+            for row in rows:
+                row.update(self.payload)
+            self.db.invalidate(self.table_name)
+            return FakeResponse([dict(r) for r in rows])
+        if self.action == "delete":
+            doomed = {id(r) for r in self._rows()}
+            removed = [dict(r) for r in self.db.tables.get(self.table_name, []) if id(r) in doomed]
+            self.db.tables[self.table_name] = [r for r in self.db.tables.get(self.table_name, []) if id(r) not in doomed]
+            self.db.invalidate(self.table_name)
+            return FakeResponse(removed)
+        raise ValueError(self.action)
+
+    def _select(self):
+        plain, embeds = _parse_select(self.columns)
+        known = self.db.columns(self.table_name)
+        for column in plain:
+            if column != "*" and known and column not in known:
+                raise FakeAPIError("42703", f"column {self.table_name}.{column} does not exist")
+
+        result = []
+        for row in self._rows():
+            out = dict(row) if "*" in plain else {c: row.get(c) for c in plain}
+            keep = True
+            for embed in embeds:
+                value = self._embed(row, embed)
+                # Filtros sobre columnas embebidas (p. ej. games.season)
+                for column, op, target in self.filters:
+                    if column.startswith(embed["alias"] + ".") and value is not None:
+                        if not _compare(op, value.get(column.split(".", 1)[1]), target):
+                            value = None
+                if value is None and embed["inner"]:
+                    keep = False
+                    break
+                out[embed["alias"]] = value
+            if keep:
+                result.append(out)
+
+        for column, desc in reversed(self.orders):
+            result.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self.offset:
+            result = result[self.offset:]
+        if self.limit_n is not None:
+            result = result[:self.limit_n]
+        return copy.deepcopy(result)
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(FakeQuery(self.db, self.name), attr)
+
+
+class FakeSupabase:
+    """Cliente en memoria: `tables` es {nombre: [filas]}."""
+
+    def __init__(self, tables=None, primary_keys=None, foreign_keys=None):
+        self.tables = {name: [dict(r) for r in rows] for name, rows in (tables or {}).items()}
+        self.primary_keys = dict(PRIMARY_KEYS, **(primary_keys or {}))
+        self.foreign_keys = dict(FOREIGN_KEYS, **(foreign_keys or {}))
+        self.calls = Counter()
+        self._indexes = {}
+        self._next_id = Counter()
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+    def columns(self, name):
+        """Columnas conocidas de la tabla (vacío si no hay filas)."""
+        rows = self.tables.get(name) or []
+        return set(rows[0].keys()) if rows else set()
+
+    def invalidate(self, name):
+        for key in [k for k in self._indexes if name in (k[0], k[1])]:
+            del self._indexes[key]
+
+    def index(self, name, column):
+        key = (name, column)
+        if key not in self._indexes:
+            self._indexes[key] = {r.get(column): r for r in self.tables.get(name, [])}
+        return self._indexes[key]
+
+    def _pk_index(self, name, pk):
+        """Mapa llave -> fila, mantenido incrementalmente entre escrituras."""
+        key = ("__pk__", name, pk)
+        if key not in self._indexes:
+            self._indexes[key] = {tuple(r.get(c) for c in pk): r for r in self.tables.get(name, [])}
+        return self._indexes[key]
+
+    def write(self, name, payload, action, on_conflict=None):
+        rows = payload if isinstance(payload, list) else [payload]
+        table = self.tables.setdefault(name, [])
+        pk = tuple(c.strip() for c in on_conflict.split(",")) if on_conflict else self.primary_keys.get(name, ("id",))
+        existing = self._pk_index(name, pk)
+
+        written = []
+        for row in rows:
+            row = dict(row)
+            # Columnas bigserial: asignar id incremental
+            if pk == ("id",) and row.get("id") is None:
+                self._next_id[name] += 1
+                row["id"] = self._next_id[name]
+            key = tuple(row.get(c) for c in pk)
+            if key in existing:
+                if action == "insert":
+                    raise FakeAPIError("23505", f"duplicate key value violates unique constraint on {name}")
+                existing[key].update(row)
+                written.append(dict(existing[key]))
+            else:
+                existing[key] = row
+                table.append(row)
+                written.append(dict(row))
+        # Los índices por columna (embebidos) se reconstruyen; el de llave primaria se conserva
+        for index_key in [k for k in self._indexes if k[0] == name]:
+            del self._indexes[index_key]
+        return written
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
@@ -0,0 +1,100 @@
+# benchmarks/import_times.py
+"""
+Tiempo de importación de cada punto de entrada: la Home, cada página y el
+script nocturno (scripts/update_daily.py).
+
+Cada medición corre en un intérprete limpio y ejecuta solo los imports de
+primer nivel del archivo (lo que paga el primer render antes de dibujar
+algo); los imports diferidos dentro de funciones o pestañas no cuentan. Se
+reporta la mediana y qué módulos pesados quedaron cargados.
+
+Uso:
+  python benchmarks/import_times.py
+  python benchmarks/import_times.py --repeat 7 --only home,wpa
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    "home": "app.py",
+    "standings": "pages/1_📊_Standings.py",
+    "estadisticas": "pages/2_⚾_Estadisticas_Individuales.py",
+    "wpa": "pages/3_📈_Análisis_WPA.py",
+    "update_daily": "scripts/update_daily.py",
+}
+
+# Dependencias caras de importar que vale la pena diferir
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "plotly", "openai", "supabase", "statsapi", "httpx"]
+
+# Corre en el intérprete hijo: ejecuta los imports y reporta tiempo y módulos
+_CHILD = """
+import json, sys, time
+source = sys.stdin.read()
+start = time.perf_counter()
+exec(compile(source, {path!r}, "exec"), {{"__name__": "__import_bench__", "__file__": {path!r}}})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tiempo de importación de la app y del script nocturno")
+    parser.add_argument("--repeat", type=int, default=5, help="Intérpretes por punto de entrada (se reporta la mediana)")
+    parser.add_argument("--only", type=str, default="", help="Puntos de entrada, separados por coma")
+    return parser.parse_args()
+
+
+def _is_import(node):
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return True
+    # try/except de imports (las páginas tienen un fallback a streamlit_app.*)
+    return isinstance(node, ast.Try) and all(_is_import(n) for n in node.body)
+
+
+def import_header(path):
+    """Código con los imports de primer nivel del archivo"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    body = [node for node in tree.body if _is_import(node)]
+    return ast.unparse(ast.Module(body=body, type_ignores=[]))
+
+
+def measure(path, repeat):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "scripts")]))
+    # Sin credenciales: el script nocturno no crea cliente al importarse
+    env.pop("SUPABASE_URL", None)
+    env.pop("SUPABASE_KEY", None)
+    child = _CHILD.format(path=path, heavy=HEAVY_MODULES)
+    source = import_header(path)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", child], input=source, capture_output=True,
+            text=True, cwd=ROOT, env=env, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(r["seconds"] for r in runs), runs[-1]["loaded"]
+
+
+def main():
+    args = parse_args()
+    only = [e.strip() for e in args.only.split(",") if e.strip()]
+
+    print(f"⏱️ Imports de primer nivel ({args.repeat} intérpretes por punto de entrada)")
+    for name, relative in ENTRY_POINTS.items():
+        if only and name not in only:
+            continue
+        seconds, loaded = measure(os.path.join(ROOT, relative), args.repeat)
+        print(f"   {name:<14} {seconds:>7.3f}s  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/record_fixtures.py
+"""
+Graba respuestas reales de statsapi en benchmarks/fixtures/ para que los
+benchmarks las reproduzcan sin red.
+
+Uso:
+  python benchmarks/record_fixtures.py --date 2025-11-14
+  python benchmarks/record_fixtures.py --date 2025-11-14 --feeds 2
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import statsapi
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.replay import FIXTURES_DIR  # noqa: E402
+
+LEAGUE_ID = 135  # LVBP
+LEONES_ID = 695
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Grabar fixtures de statsapi")
+    parser.add_argument("--date", type=str, required=True, help="Fecha del schedule (YYYY-MM-DD)")
+    parser.add_argument("--feeds", type=int, default=1, help="Cantidad de feeds live a grabar (prioriza Leones)")
+    parser.add_argument("--out", type=str, default=FIXTURES_DIR, help="Directorio de salida")
+    return parser.parse_args()
+
+
+def dump(out_dir, name, data):
+    path = os.path.join(out_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    print(f"💾 {name} ({os.path.getsize(path) / 1024:.1f} KB)")
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    schedule = statsapi.get("schedule", {
+        "sportId": 17,
+        "startDate": args.date,
+        "endDate": args.date,
+        "leagueId": LEAGUE_ID,
+    })
+    games = [g for d in schedule.get("dates", []) for g in d.get("games", [])]
+    if not games:
+        print(f"⚠️ No hay juegos el {args.date}")
+        return
+    dump(args.out, "schedule.json", schedule)
+
+    for game in games:
+        game_pk = game["gamePk"]
+        dump(args.out, f"boxscore_{game_pk}.json", statsapi.get("game_boxscore", {"gamePk": game_pk}))
+
+    # Feeds: primero los juegos de Leones
+    games.sort(key=lambda g: LEONES_ID not in (
+        g["teams"]["home"]["team"]["id"], g["teams"]["away"]["team"]["id"]
+    ))
+    for game in games[:args.feeds]:
+        game_pk = game["gamePk"]
+        dump(args.out, f"feed_{game_pk}.json", statsapi.get("game", {"gamePk": game_pk}))
+        dump(args.out, f"linescore_{game_pk}.json", statsapi.get("game_linescore", {"gamePk": game_pk}))
+
+    print(f"✅ {len(games)} juegos grabados en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# benchmarks/replay.py
+"""
+Reproducción de fixtures de statsapi y armado de temporadas escaladas para
+los benchmarks.
+
+Los fixtures viven en benchmarks/fixtures/ con la misma forma que devuelve
+statsapi.get(): schedule.json, boxscore_<gamePk>.json, feed_<gamePk>.json y
+linescore_<gamePk>.json. `record_fixtures.py` los regenera desde la API real.
+"""
+
+import copy
+import json
+import os
+import random
+from datetime import date, timedelta
+
+from benchmarks.synthetic import LVBP_ABBREVIATIONS, round_robin_rounds
+from update_daily import parse_boxscore
+from utils.head_to_head import LVBP_TEAMS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# Temporada regular LVBP: 8 equipos x 63 juegos = 252 juegos
+GAMES_PER_SEASON = 252
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fixture_game_ids(prefix="boxscore"):
+    """gamePks con fixture grabado del tipo `prefix` (boxscore, feed, linescore)."""
+    ids = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith(prefix + "_") and name.endswith(".json"):
+            ids.append(int(name[len(prefix) + 1:-len(".json")]))
+    return ids
+
+
+class FixtureStatsAPI:
+    """Reemplazo de `statsapi` que responde `get()` desde los fixtures grabados."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.calls = 0
+        self._cache = {}
+
+    def _load(self, name):
+        if name not in self._cache:
+            with open(os.path.join(self.fixtures_dir, name), encoding="utf-8") as f:
+                self._cache[name] = json.load(f)
+        return copy.deepcopy(self._cache[name])
+
+    def _game_fixture(self, prefix, game_pk):
+        """Fixture del juego; si no fue grabado se usa uno existente (mismo tamaño)."""
+        name = f"{prefix}_{game_pk}.json"
+        if os.path.exists(os.path.join(self.fixtures_dir, name)):
+            return self._load(name)
+        candidates = sorted(n for n in os.listdir(self.fixtures_dir) if n.startswith(prefix + "_"))
+        if not candidates:
+            raise KeyError(f"No hay fixtures '{prefix}' en {self.fixtures_dir}")
+        return self._load(candidates[int(game_pk) % len(candidates)])
+
+    def _feed_fixture(self, game_pk):
+        """
+        Feed live del juego; si no fue grabado se arma con las jugadas de un feed
+        existente y el boxscore/linescore grabados del juego.
+        """
+        if os.path.exists(os.path.join(self.fixtures_dir, f"feed_{game_pk}.json")):
+            return self._load(f"feed_{game_pk}.json")
+        feed = self._game_fixture("feed", game_pk)
+        feed.setdefault("gameData", {}).setdefault("game", {})["pk"] = game_pk
+        feed.setdefault("liveData", {}).update({
+            "boxscore": self._game_fixture("boxscore", game_pk),
+            "linescore": self._game_fixture("linescore", game_pk),
+        })
+        return feed
+
+    def get(self, endpoint, params=None, **kwargs):
+        self.calls += 1
+        params = params or {}
+        if endpoint == "schedule":
+            return self._load("schedule.json")
+        if endpoint == "game_boxscore":
+            return self._game_fixture("boxscore", params["gamePk"])
+        if endpoint == "game_linescore":
+            return self._game_fixture("linescore", params["gamePk"])
+        if endpoint == "game":
+            return self._feed_fixture(params["gamePk"])
+        raise KeyError(f"Endpoint sin fixture: {endpoint}")
+
+
+def _boxscore_template(boxscore):
+    """Registros de parse_boxscore separados por lado (home/away) del fixture."""
+    player_records, batting_records, pitching_records = parse_boxscore(boxscore, None)
+    template = {}
+    for side in ("home", "away"):
+        team_id = boxscore["teams"][side]["team"]["id"]
+        template[side] = {
+            "players": [r for r in player_records if r["team_id"] == team_id],
+            "batting": [r for r in batting_records if r["team_id"] == team_id],
+            "pitching": [r for r in pitching_records if r["team_id"] == team_id],
+        }
+    return template
+
+
+def build_season_tables(scale=1, season=2025, seed=0):
+    """
+    Tablas en memoria para una temporada de `scale` x GAMES_PER_SEASON juegos.
+
+    Los marcadores son aleatorios y las líneas de boxscore/innings se clonan de
+    los fixtures, así el volumen por juego es el de un juego real.
+    """
+    rng = random.Random(seed)
+    templates = [_boxscore_template(load_fixture(f"boxscore_{gid}.json"))
+                 for gid in fixture_game_ids()]
+    n_games = int(GAMES_PER_SEASON * scale)
+
+    teams = [
+        {"id": tid, "name": name, "abbreviation": LVBP_ABBREVIATIONS[tid], "league_id": 135}
+        for tid, name in LVBP_TEAMS.items()
+    ]
+    games, innings, batting, pitching = [], [], [], []
+    players = {}
+
+    rounds = round_robin_rounds(LVBP_TEAMS)
+    day = date(season, 10, 15)
+    game_id = 9_000_000
+    while len(games) < n_games:
+        for home, away in rounds[(day.toordinal()) % len(rounds)]:
+            if len(games) >= n_games:
+                break
+            if rng.random() < 0.5:
+                home, away = away, home
+            game_id += 1
+            n_innings = 9 if rng.random() > 0.08 else rng.randint(10, 12)
+            home_runs = [rng.choice([0, 0, 0, 0, 1, 1, 2, 3]) for _ in range(n_innings)]
+            away_runs = [rng.choice([0, 0, 0, 0, 1, 1, 2, 3]) for _ in range(n_innings)]
+            if sum(home_runs) == sum(away_runs):
+                home_runs[-1] += 1
+            games.append({
+                "id": game_id,
+                "game_date": day.isoformat(),
+                "game_datetime": f"{day.isoformat()}T23:30:00Z",
+                "home_team_id": home,
+                "away_team_id": away,
+                "home_score": sum(home_runs),
+                "away_score": sum(away_runs),
+                "status": "Final",
+                "venue": f"Estadio {LVBP_TEAMS[home]}",
+                "season": season,
+                "game_type": "regular",
+                "game_type_code": "R",
+                "phase": "regular",
+                "series_description": "Regular Season",
+            })
+            for inning, (h, a) in enumerate(zip(home_runs, away_runs), start=1):
+                innings.append({"game_id": game_id, "inning": inning, "home_score": h, "away_score": a})
+
+            # Líneas de boxscore: se clonan las de un fixture con los equipos del juego
+            for side, team_id in (("home", home), ("away", away)):
+                template = templates[game_id % len(templates)][side]
+                for record in template["players"]:
+                    player_id = record["id"] * 10 + (team_id - 692)
+                    players[player_id] = dict(record, id=player_id, team_id=team_id)
+                for target, records in ((batting, template["batting"]), (pitching, template["pitching"])):
+                    for record in records:
+                        target.append(dict(
+                            record,
+                            game_id=game_id,
+                            team_id=team_id,
+                            player_id=record["player_id"] * 10 + (team_id - 692),
+                        ))
+        day += timedelta(days=1)
+
+    return {
+        "teams": teams,
+        "games": games,
+        "game_innings": innings,
+        "players": list(players.values()),
+        "batting_stats": batting,
+        "pitching_stats": pitching,
+    }
+
+
+def schedule_from_games(games, day):
+    """Respuesta de `schedule` de statsapi para una fecha, armada con filas de games."""
+    entries = [
+        {
+            "gamePk": g["id"],
+            "gameDate": g.get("game_datetime"),
+            "gameType": g.get("game_type_code") or "R",
+            "seriesDescription": g.get("series_description"),
+            "status": {"detailedState": g.get("status")},
+            "venue": {"name": g.get("venue")},
+            "teams": {
+                "home": {"team": {"id": g["home_team_id"]}, "score": g.get("home_score")},
+                "away": {"team": {"id": g["away_team_id"]}, "score": g.get("away_score")},
+            },
+        }
+        for g in games if g["game_date"] == day
+    ]
+    return {"dates": [{"date": day, "games": entries}] if entries else []}
+
+
+def fixture_transport(statsapi, db, games=None):
+    """
+    httpx.MockTransport que sirve statsapi desde `statsapi` (FixtureStatsAPI) y
+    PostgREST desde `db` (FakeSupabase), para el camino asíncrono de la ingesta.
+    Con `games` el schedule de cada fecha se arma con esas filas.
+    """
+    import httpx
+
+    def handler(request):
+        path = request.url.path
+        if request.url.host == "statsapi.mlb.com":
+            params = dict(request.url.params)
+            if path.endswith("/schedule") and games is not None:
+                return httpx.Response(200, json=schedule_from_games(games, params["startDate"]))
+            if path.endswith("/schedule"):
+                return httpx.Response(200, json=statsapi.get("schedule", params))
+            game_pk = int(path.split("/game/")[1].split("/")[0])
+            if path.endswith("/feed/live"):
+                endpoint = "game"
+            else:
+                endpoint = "game_boxscore" if path.endswith("/boxscore") else "game_linescore"
+            return httpx.Response(200, json=statsapi.get(endpoint, {"gamePk": game_pk}))
+
+        if request.method == "POST" and "/rest/v1/" in path:
+            table = path.split("/rest/v1/")[1]
+            db.table(table).upsert(json.loads(request.content)).execute()
+            return httpx.Response(201)
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,438 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks offline: ingesta diaria, backfill de ELO, loaders de la app, WPA e
+insights de IA contra un Supabase en memoria, fixtures de statsapi y un
+endpoint local de OpenAI.
+
+Uso:
+  python benchmarks/run_benchmarks.py                   # escalas 1, 10 y 100
+  python benchmarks/run_benchmarks.py --scales 1,10 --repeat 5
+  python benchmarks/run_benchmarks.py --compare benchmarks/results/20251115T020000.json
+  python benchmarks/run_benchmarks.py --scales "" --seasons 1,10,50   # datos sintéticos multi-temporada
+
+Los resultados se guardan en benchmarks/results/<timestamp>.json y, si existe
+una corrida anterior, se comparan contra la más reciente.
+
+Los benchmarks de insights además verifican el comportamiento y cortan la
+corrida con AssertionError si falla: 0 llamadas al modelo con snapshot,
+exactamente 1 sin él, y un hash de prompt estable que cambia con los datos.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+from benchmarks.replay import (  # noqa: E402
+    FixtureStatsAPI,
+    build_season_tables,
+    fixture_game_ids,
+    fixture_transport,
+    load_fixture,
+)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SEASON = 2025
+LEONES_ID = 695
+
+# Mismo umbral que el reporte de ingesta (utils/ingest_metrics.py)
+REGRESSION_THRESHOLD = 1.25
+
+# Latencia simulada del modelo en el endpoint local de OpenAI
+FAKE_OPENAI_LATENCY_S = 0.5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks offline RepubliCaraquistApp")
+    parser.add_argument("--scales", type=str, default="1,10,100", help="Escalas de temporada separadas por coma")
+    parser.add_argument("--seasons", type=str, default="",
+                        help="Temporadas sintéticas a generar (benchmarks/synthetic.py), separadas por coma")
+    parser.add_argument("--leagues", type=int, default=1, help="Ligas sintéticas (con --seasons)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por benchmark (se reporta la mediana)")
+    parser.add_argument("--only", type=str, default="", help="Benchmarks a correr, separados por coma")
+    parser.add_argument("--compare", type=str, default=None, help="Resultado previo contra el cual comparar")
+    parser.add_argument("--no-save", action="store_true", help="No guardar el resultado en benchmarks/results/")
+    return parser.parse_args()
+
+
+def _quiet_streamlit():
+    """Fuera de `streamlit run` st.cache_data avisa en cada llamada; silenciarlo."""
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+
+
+# ============================================================
+# BENCHMARKS (cada uno recibe las tablas base y retorna un callable)
+# ============================================================
+
+def bench_daily_ingest(tables):
+    """update_daily completo (sin reporte) contra la temporada cargada."""
+    import update_daily
+    from utils.schema import reset_schema_cache
+
+    def setup():
+        reset_schema_cache()
+        db = FakeSupabase(tables)
+        update_daily.supabase = db
+        update_daily.statsapi = FixtureStatsAPI()
+        update_daily.get_current_season = lambda: SEASON
+        return db
+
+    def run(db):
+        update_daily.update_yesterdays_games()
+        update_daily.update_todays_games()
+        update_daily.update_standings()
+        update_daily.update_elo_ratings(SEASON)
+        return db
+
+    return setup, run
+
+
+def bench_catch_up(tables):
+    """Catch-up asíncrono (update_daily.catch_up_games) de todas las fechas de la temporada."""
+    import update_daily
+    from utils.schema import reset_schema_cache
+
+    dates = sorted({g["game_date"] for g in tables["games"]})
+
+    def setup():
+        reset_schema_cache()
+        db = FakeSupabase({k: v for k, v in tables.items() if k in ("teams", "players")})
+        update_daily.supabase = db
+        update_daily.SUPABASE_URL = "http://supabase.local"
+        update_daily.SUPABASE_KEY = "benchmark"
+        return db
+
+    def run(db):
+        transport = fixture_transport(FixtureStatsAPI(), db, games=tables["games"])
+        update_daily.catch_up_games(dates[0], dates[-1], transport=transport)
+        return db
+
+    return setup, run
+
+
+def bench_elo_backfill(tables):
+    """backfill_elo.process_phase de la fase regular desde cero."""
+    import backfill_elo
+    from utils.schema import reset_schema_cache
+
+    def setup():
+        reset_schema_cache()
+        return FakeSupabase(tables)
+
+    def run(db):
+        backfill_elo.process_phase(db, SEASON, "regular", reset=True)
+        return db
+
+    return setup, run
+
+
+def _loader_bench(function_name, **kwargs):
+    def bench(tables):
+        import utils.supabase_client as client
+        from utils import cache
+
+        def setup():
+            db = FakeSupabase(tables)
+            client.init_supabase = lambda: db
+            # Limpiar todas las cachés: los loaders se llaman entre sí (p. ej. get_standings_timeline)
+            cache.clear_all()
+            return db
+
+        def run(db):
+            return getattr(client, function_name)(**kwargs)
+
+        return setup, run
+
+    bench.__doc__ = f"utils.supabase_client.{function_name} sin caché"
+    return bench
+
+
+_fake_openai = None
+
+
+def _openai_endpoint():
+    """Endpoint local de OpenAI (benchmarks/fake_openai.py), uno por proceso"""
+    global _fake_openai
+    if _fake_openai is None:
+        from benchmarks.fake_openai import FakeOpenAI
+
+        _fake_openai = FakeOpenAI(latency_s=FAKE_OPENAI_LATENCY_S).start()
+        os.environ["OPENAI_BASE_URL"] = _fake_openai.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    return _fake_openai
+
+
+def check_insights_prompt(inputs):
+    """El hash del prompt compilado es la llave de los snapshots: estable con los mismos datos y distinto si cambia un número"""
+    from utils.ai_insights import compile_insights_prompt
+
+    digest = compile_insights_prompt(**inputs)["hash"]
+    assert compile_insights_prompt(**inputs)["hash"] == digest, "El hash del prompt cambió con los mismos datos"
+
+    # El prompt solo lleva la fila de los Leones en los standings
+    standings = inputs["standings_df"].copy()
+    leones = standings["team_name"].str.contains("Leones", na=False)
+    standings.loc[leones, "wins"] += 1
+    changed = compile_insights_prompt(**dict(inputs, standings_df=standings))["hash"]
+    assert changed != digest, "El hash del prompt no cambió al cambiar las victorias de los Leones"
+
+
+def _insights_bench(snapshot):
+    def bench(tables):
+        import utils.supabase_client as client
+        from utils import ai_insights, cache
+
+        # Llamadas al modelo esperadas por corrida y contenido del snapshot
+        expected = {}
+
+        def setup():
+            fake = _openai_endpoint()
+            db = FakeSupabase(tables)
+            client.init_supabase = lambda: db
+            cache.clear_all()
+            # Al pulsar el botón los loaders de la Home ya están en caché
+            inputs = ai_insights.load_insight_inputs(SEASON)
+            check_insights_prompt(inputs)
+            expected["content"] = None
+            if snapshot:
+                _, row = ai_insights.generate_insight_snapshot(db, SEASON)
+                expected["content"] = row["content"]
+            expected["calls"] = fake.calls
+            return db
+
+        def run(db):
+            content, error = ai_insights.get_ai_insights(SEASON)
+            # Con snapshot no se llama al modelo; sin snapshot, exactamente una vez
+            calls = _openai_endpoint().calls - expected["calls"]
+            assert error is None, f"get_ai_insights falló: {error}"
+            assert calls == (0 if snapshot else 1), f"{calls} llamadas al modelo"
+            if snapshot:
+                assert content == expected["content"], "get_ai_insights no devolvió el snapshot"
+            return content
+
+        return setup, run
+
+    bench.__doc__ = (
+        "Botón de insights con snapshot de la ingesta (0 llamadas al modelo)" if snapshot
+        else f"Botón de insights sin snapshot (1 llamada al modelo local, {FAKE_OPENAI_LATENCY_S}s)"
+    )
+    return bench
+
+
+def bench_process_game_feed(tables):
+    """WPA de todos los juegos de Leones de la temporada (feed del fixture)."""
+    from utils.wpa import calculate_player_wpa, compute_feed_wpa, roster_from_boxscore
+
+    feed = load_fixture(f"feed_{fixture_game_ids('feed')[0]}.json")
+    box = feed["liveData"]["boxscore"]
+    n_feeds = sum(1 for g in tables["games"] if LEONES_ID in (g["home_team_id"], g["away_team_id"]))
+
+    def setup():
+        return None
+
+    def run(_):
+        for _ in range(n_feeds):
+            df_wpa, _, _ = compute_feed_wpa(feed, LEONES_ID)
+            calculate_player_wpa(df_wpa, roster_from_boxscore(box, LEONES_ID))
+        return n_feeds
+
+    return setup, run
+
+
+# ============================================================
+# BENCHMARKS MULTI-TEMPORADA (datos de benchmarks/synthetic.py)
+# ============================================================
+
+def bench_head_to_head(data):
+    """Head to Head de Leones sobre todas las temporadas generadas."""
+    import pandas as pd
+    from utils.head_to_head import head_to_head_records
+
+    def setup():
+        return None
+
+    def run(_):
+        games_df = pd.DataFrame([
+            g for g in data.tables["games"] if LEONES_ID in (g["home_team_id"], g["away_team_id"])
+        ])
+        return head_to_head_records(games_df, LEONES_ID)
+
+    return setup, run
+
+
+def bench_wpa_aggregation(data):
+    """WPA por jugador acumulado sobre todos los feeds generados."""
+    import pandas as pd
+    from utils.wpa import compute_feed_wpa
+
+    def setup():
+        return None
+
+    def run(_):
+        frames = [compute_feed_wpa(feed, LEONES_ID)[0] for feed in data.feeds.values()]
+        df_wpa = pd.concat(frames, ignore_index=True)
+        leones_bat = df_wpa[df_wpa["batter_is_leones"] == True]  # noqa: E712
+        return leones_bat.groupby(["batter_id", "batter"])["wpa"].sum()
+
+    return setup, run
+
+
+def bench_elo_replay(data):
+    """backfill_elo de todas las temporadas y fases desde cero."""
+    import backfill_elo
+    from utils.schema import reset_schema_cache
+
+    seasons = sorted({g["season"] for g in data.tables["games"]})
+
+    def setup():
+        reset_schema_cache()
+        return FakeSupabase(data.tables)
+
+    def run(db):
+        for season in seasons:
+            for phase in backfill_elo.VALID_PHASES:
+                backfill_elo.process_phase(db, season, phase, reset=True)
+        return db
+
+    return setup, run
+
+
+def _latest_season_loader(function_name, **kwargs):
+    """Loader de la app sobre la temporada más reciente de los datos sintéticos."""
+    def bench(data):
+        return _loader_bench(function_name, season=max(g["season"] for g in data.tables["games"]), **kwargs)(data.tables)
+
+    return bench
+
+
+SYNTHETIC_BENCHMARKS = {
+    "get_standings": _latest_season_loader("get_standings"),
+    "head_to_head": bench_head_to_head,
+    "wpa_aggregation": bench_wpa_aggregation,
+    "elo_replay": bench_elo_replay,
+}
+
+
+BENCHMARKS = {
+    "daily_ingest": bench_daily_ingest,
+    "catch_up": bench_catch_up,
+    "elo_backfill": bench_elo_backfill,
+    "get_standings": _loader_bench("get_standings", season=SEASON),
+    "get_leones_advanced_stats": _loader_bench("get_leones_advanced_stats", season=SEASON),
+    "get_batting_stats": _loader_bench("get_batting_stats", team_id=LEONES_ID, season=SEASON),
+    "process_game_feed": bench_process_game_feed,
+    "ai_insights_live": _insights_bench(snapshot=False),
+    "ai_insights_snapshot": _insights_bench(snapshot=True),
+}
+
+
+def run_benchmark(name, factory, tables, repeat):
+    setup, run = factory(tables)
+    times, calls = [], 0
+    for _ in range(repeat):
+        db = setup()
+        # Los scripts de ingesta imprimen progreso; no mezclarlo con la tabla de resultados
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            run(db)
+            times.append(time.perf_counter() - t0)
+        if isinstance(db, FakeSupabase):
+            calls = db.total_calls()
+    return {
+        "median_s": round(statistics.median(times), 4),
+        "min_s": round(min(times), 4),
+        "max_s": round(max(times), 4),
+        "supabase_calls": calls,
+    }
+
+
+def latest_result():
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith(".json"))
+    return os.path.join(RESULTS_DIR, files[-1]) if files else None
+
+
+def compare(current, previous):
+    """Lista de (benchmark, escala, antes, ahora, ratio) para cada medición en común."""
+    rows = []
+    for scale, benches in current["results"].items():
+        for name, result in benches.items():
+            before = previous.get("results", {}).get(scale, {}).get(name)
+            if before and before["median_s"] > 0:
+                rows.append((name, scale, before["median_s"], result["median_s"],
+                             round(result["median_s"] / before["median_s"], 2)))
+    return rows
+
+
+def main():
+    args = parse_args()
+    _quiet_streamlit()
+    scales = [float(s) if "." in s else int(s) for s in args.scales.split(",") if s.strip()]
+    season_counts = [int(s) for s in args.seasons.split(",") if s.strip()]
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+
+    output = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    for scale in scales:
+        tables = build_season_tables(scale, SEASON)
+        print(f"📦 Escala {scale}x: {len(tables['games'])} juegos, "
+              f"{len(tables['batting_stats'])} líneas de bateo")
+        key = f"{scale}x"
+        output["results"][key] = {}
+        for name in [b for b in (only or BENCHMARKS) if b in BENCHMARKS]:
+            result = run_benchmark(name, BENCHMARKS[name], tables, args.repeat)
+            output["results"][key][name] = result
+            print(f"   {name:<28} {result['median_s']:>9.4f}s  (min {result['min_s']:.4f}s, "
+                  f"{result['supabase_calls']} llamadas)")
+
+    for n_seasons in season_counts:
+        from benchmarks.synthetic import generate
+
+        data = generate(n_seasons, args.leagues, plays="team")
+        print(f"🧪 Sintético {n_seasons} temporadas x {args.leagues} liga(s): {len(data.tables['games'])} juegos, "
+              f"{len(data.tables['batting_stats'])} líneas de bateo, {len(data.feeds)} feeds")
+        key = f"seasons:{n_seasons}" + (f"x{args.leagues}" if args.leagues > 1 else "")
+        output["results"][key] = {}
+        for name in [b for b in (only or SYNTHETIC_BENCHMARKS) if b in SYNTHETIC_BENCHMARKS]:
+            result = run_benchmark(name, SYNTHETIC_BENCHMARKS[name], data, args.repeat)
+            output["results"][key][name] = result
+            print(f"   {name:<28} {result['median_s']:>9.4f}s  (min {result['min_s']:.4f}s, "
+                  f"{result['supabase_calls']} llamadas)")
+
+    previous_path = args.compare or latest_result()
+    if previous_path:
+        with open(previous_path, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"\n🔍 Comparación contra {os.path.relpath(previous_path, ROOT)}")
+        for name, scale, before, now, ratio in compare(output, previous):
+            flag = " ⚠️" if ratio > REGRESSION_THRESHOLD else (" ✅" if ratio < 1 / REGRESSION_THRESHOLD else "")
+            print(f"   {name:<28} {scale:>12}  {before:.4f}s → {now:.4f}s (x{ratio}){flag}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%dT%H%M%S") + ".json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"\n💾 Resultados guardados en {os.path.relpath(path, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
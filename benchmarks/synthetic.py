@@ -0,0 +1,681 @@
+# benchmarks/synthetic.py
+"""
+Generador de datos sintéticos multi-temporada para pruebas de escala.
+
+Simula juegos turno por turno (K, BB, hits, outs, corredores) con tasas
+parecidas a las de la LVBP y arma los registros con las mismas funciones de
+la ingesta: `build_game_record` para games y `parse_boxscore` para players,
+batting_stats y pitching_stats. Las jugadas salen en la forma de
+`liveData.plays.allPlays` del feed de statsapi, así que `compute_feed_wpa`
+las consume sin cambios.
+
+Uso:
+  python benchmarks/synthetic.py --seasons 50 --format parquet --out data/synthetic
+  python benchmarks/synthetic.py --seasons 5 --leagues 3 --plays team --format json --out /tmp/lvbp
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from update_daily import build_game_record, parse_boxscore  # noqa: E402
+from utils.game_facts import build_game_facts  # noqa: E402
+from utils.head_to_head import LEONES_ID, LVBP_TEAMS  # noqa: E402
+
+LEAGUE_ID = 135  # LVBP
+
+LVBP_ABBREVIATIONS = {
+    692: "ZUL", 693: "LAR", 694: "ANZ", 695: "CAR",
+    696: "MAG", 697: "MAR", 698: "LAG", 699: "ARA",
+}
+
+# Resultados por turno al bate (aprox. LVBP); el resto son outs en juego
+PA_OUTCOMES = [
+    ("Strikeout", 0.210),
+    ("Walk", 0.090),
+    ("Hit By Pitch", 0.010),
+    ("Single", 0.155),
+    ("Double", 0.045),
+    ("Triple", 0.005),
+    ("Home Run", 0.022),
+    ("Groundout", 0.210),
+    ("Flyout", 0.160),
+    ("Lineout", 0.055),
+    ("Pop Out", 0.038),
+]
+HITS = {"Single": 1, "Double": 2, "Triple": 3, "Home Run": 4}
+
+HITTERS_PER_TEAM = 13
+PITCHERS_PER_TEAM = 13
+ROTATION_SIZE = 5
+MAX_INNINGS = 20
+
+PHASE_CODES = {"regular": "R", "wildcard_playin": "D", "round_robin": "L", "final": "W"}
+
+
+# ============================================================
+# EQUIPOS Y ROSTERS
+# ============================================================
+
+def build_leagues(n_leagues=1, teams_per_league=8):
+    """{league_id: [(team_id, name, abbreviation)]}; la primera liga es la LVBP real."""
+    leagues = {
+        LEAGUE_ID: [(tid, name, LVBP_ABBREVIATIONS[tid]) for tid, name in sorted(LVBP_TEAMS.items())]
+    }
+    for n in range(1, n_leagues):
+        league_id = 1000 + n
+        leagues[league_id] = [
+            (10_000 + n * 100 + t, f"Equipo {n}-{t + 1}", f"L{n}{t + 1}")
+            for t in range(teams_per_league)
+        ]
+    return leagues
+
+
+def build_roster(rng, team_id, season_index):
+    """Bateadores y pitchers del equipo en la temporada (con talento individual)."""
+    base = 1_000_000 + season_index * 100_000 + (team_id % 100_000) * 40
+    hitters = [{
+        "id": base + slot,
+        "fullName": f"Bateador {team_id}-{season_index}-{slot + 1}",
+        "position": ["C", "1B", "2B", "3B", "SS", "LF", "CF", "RF", "DH", "C", "IF", "OF", "UT"][slot],
+        "talent": rng.gauss(1.0, 0.12),
+    } for slot in range(HITTERS_PER_TEAM)]
+    pitchers = [{
+        "id": base + HITTERS_PER_TEAM + slot,
+        "fullName": f"Lanzador {team_id}-{season_index}-{slot + 1}",
+        "position": "P",
+        "talent": rng.gauss(1.0, 0.10),
+    } for slot in range(PITCHERS_PER_TEAM)]
+    return {"team_id": team_id, "hitters": hitters, "pitchers": pitchers, "next_starter": 0}
+
+
+# ============================================================
+# SIMULACIÓN
+# ============================================================
+
+def _pick_outcome(rng, batter, pitcher):
+    """Resultado del turno; el talento mueve probabilidad de outs a hits/BB."""
+    edge = batter["talent"] / pitcher["talent"]
+    roll = rng.random()
+    acc = 0.0
+    for event, p in PA_OUTCOMES:
+        if event in HITS or event in ("Walk", "Hit By Pitch"):
+            p *= edge
+        elif event == "Strikeout":
+            p /= edge
+        acc += p
+        if roll < acc:
+            return event
+    return "Groundout"
+
+
+class _Line(dict):
+    """Acumulador de estadísticas de un jugador en el juego."""
+
+    def __missing__(self, key):
+        return 0
+
+
+class _TeamGame:
+    def __init__(self, rng, roster):
+        self.roster = roster
+        hitters = roster["hitters"]
+        # Alineación: los 9 regulares con alguna sustitución de la banca
+        self.lineup = [
+            hitters[9 + rng.randrange(HITTERS_PER_TEAM - 9)] if rng.random() < 0.12 else hitters[i]
+            for i in range(9)
+        ]
+        seen = set()
+        self.lineup = [h for h in self.lineup if not (h["id"] in seen or seen.add(h["id"]))]
+        while len(self.lineup) < 9:
+            self.lineup.append(next(h for h in hitters if h["id"] not in seen and not seen.add(h["id"])))
+        self.batter_index = 0
+        starter = roster["pitchers"][roster["next_starter"] % ROTATION_SIZE]
+        roster["next_starter"] += 1
+        self.bullpen = roster["pitchers"][ROTATION_SIZE:]
+        rng.shuffle(self.bullpen)
+        self.pitchers_used = [starter]
+        self.starter_innings = rng.choice([4, 5, 5, 6, 6, 6, 7, 7, 8])
+        self.batting = {}
+        self.pitching = {}
+
+    @property
+    def pitcher(self):
+        return self.pitchers_used[-1]
+
+    def maybe_change_pitcher(self, inning):
+        line = self.pitching.get(self.pitcher["id"], _Line())
+        if len(self.pitchers_used) == 1:
+            tired = inning > self.starter_innings or line["r"] >= 5
+        else:
+            tired = line["outs"] >= 3 or line["r"] >= 3
+        if tired and len(self.pitchers_used) <= len(self.bullpen):
+            self.pitchers_used.append(self.bullpen[len(self.pitchers_used) - 1])
+
+    def next_batter(self):
+        batter = self.lineup[self.batter_index % 9]
+        self.batter_index += 1
+        return batter
+
+
+def _advance(rng, bases, event, outs):
+    """Nuevo estado de bases y movimientos de corredores [(runner_id, start, end)]."""
+    first, second, third = bases
+    moves = []
+    if event in ("Walk", "Hit By Pitch"):
+        # Avance forzado
+        if first is not None:
+            if second is not None:
+                if third is not None:
+                    moves.append((third, "3B", "score"))
+                moves.append((second, "2B", "3B"))
+                third = second
+            moves.append((first, "1B", "2B"))
+            second = first
+        return [None, second, third], moves, "1B"
+    hit = HITS.get(event)
+    if hit == 4:
+        moves += [(r, b, "score") for r, b in ((third, "3B"), (second, "2B"), (first, "1B")) if r is not None]
+        return [None, None, None], moves, "score"
+    if hit == 3:
+        moves += [(r, b, "score") for r, b in ((third, "3B"), (second, "2B"), (first, "1B")) if r is not None]
+        return [None, None, None], moves, "3B"
+    if hit == 2:
+        moves += [(r, b, "score") for r, b in ((third, "3B"), (second, "2B")) if r is not None]
+        new_third = None
+        if first is not None:
+            if rng.random() < 0.4:
+                moves.append((first, "1B", "score"))
+            else:
+                moves.append((first, "1B", "3B"))
+                new_third = first
+        return [None, None, new_third], moves, "2B"
+    if hit == 1:
+        new_second = new_third = None
+        if third is not None:
+            moves.append((third, "3B", "score"))
+        if second is not None:
+            if rng.random() < 0.6:
+                moves.append((second, "2B", "score"))
+            else:
+                moves.append((second, "2B", "3B"))
+                new_third = second
+        if first is not None:
+            if new_third is None and rng.random() < 0.3:
+                moves.append((first, "1B", "3B"))
+                new_third = first
+            else:
+                moves.append((first, "1B", "2B"))
+                new_second = first
+        return [None, new_second, new_third], moves, "1B"
+    # Out en juego: elevado de sacrificio / rodado que impulsa desde tercera
+    if outs < 2 and third is not None and event in ("Flyout", "Groundout") and rng.random() < 0.45:
+        moves.append((third, "3B", "score"))
+        third = None
+    return [first, second, third], moves, None
+
+
+def _play(event, description, inning, half, outs, batter, pitcher, batting_team, pitching_team, moves,
+          batter_end, rbi, at_bat_index, home_score, away_score):
+    runners = [{
+        "movement": {"start": start, "end": end, "isOut": False},
+        "details": {"runner": {"id": runner_id}, "event": event, "isScoringEvent": end == "score"},
+    } for runner_id, start, end in moves]
+    runners.append({
+        "movement": {"start": None, "end": batter_end, "isOut": batter_end is None},
+        "details": {"runner": {"id": batter["id"]}, "event": event, "isScoringEvent": batter_end == "score"},
+    })
+    return {
+        "result": {"type": "atBat", "event": event, "eventType": event.lower().replace(" ", "_"),
+                   "description": description, "rbi": rbi, "awayScore": away_score, "homeScore": home_score},
+        "about": {"atBatIndex": at_bat_index, "halfInning": half, "isTopInning": half == "top",
+                  "inning": inning, "isComplete": True},
+        "count": {"outs": outs},
+        "matchup": {
+            "batter": {"id": batter["id"], "fullName": batter["fullName"], "parentTeamId": batting_team},
+            "pitcher": {"id": pitcher["id"], "fullName": pitcher["fullName"], "parentTeamId": pitching_team},
+        },
+        "runners": runners,
+    }
+
+
+def _simulate_half(rng, batting, fielding, inning, half, state, plays, walkoff_target=None):
+    """Simula media entrada; retorna carreras anotadas."""
+    outs = 0
+    runs = 0
+    bases = [None, None, None]
+    fielding.maybe_change_pitcher(inning)
+    pitcher = fielding.pitcher
+    pit_line = fielding.pitching.setdefault(pitcher["id"], _Line())
+    batting_team = batting.roster["team_id"]
+    pitching_team = fielding.roster["team_id"]
+
+    while outs < 3:
+        batter = batting.next_batter()
+        bat_line = batting.batting.setdefault(batter["id"], _Line())
+        event = _pick_outcome(rng, batter, pitcher)
+        bases, moves, batter_end = _advance(rng, bases, event, outs)
+        if batter_end in ("1B", "2B", "3B"):
+            bases[("1B", "2B", "3B").index(batter_end)] = batter["id"]
+        scored = [runner for runner, _, end in moves if end == "score"] + ([batter["id"]] if batter_end == "score" else [])
+
+        if batter_end is None:
+            outs += 1
+            pit_line["outs"] += 1
+        if event == "Strikeout":
+            bat_line["so"] += 1
+            pit_line["so"] += 1
+        elif event == "Walk":
+            bat_line["bb"] += 1
+            pit_line["bb"] += 1
+        elif event == "Hit By Pitch":
+            bat_line["hbp"] += 1
+            pit_line["hbp"] += 1
+        elif event in HITS:
+            bat_line["h"] += 1
+            pit_line["h"] += 1
+            if event == "Double":
+                bat_line["doubles"] += 1
+            elif event == "Triple":
+                bat_line["triples"] += 1
+            elif event == "Home Run":
+                bat_line["hr"] += 1
+                pit_line["hr"] += 1
+        sac_fly = event == "Flyout" and scored and batter_end is None
+        if sac_fly:
+            bat_line["sf"] += 1
+        elif event not in ("Walk", "Hit By Pitch"):
+            bat_line["ab"] += 1
+        bat_line["rbi"] += len(scored)
+        for runner_id in scored:
+            batting.batting.setdefault(runner_id, _Line())["r"] += 1
+        pit_line["r"] += len(scored)
+        pit_line["er"] += len(scored)
+        runs += len(scored)
+
+        if half == "top":
+            state["away"] += len(scored)
+        else:
+            state["home"] += len(scored)
+
+        if rng.random() < 0.01:
+            pit_line["wp"] += 1
+
+        plays.append(_play(
+            event, f"{batter['fullName']}: {event}", inning, half, outs, batter, pitcher,
+            batting_team, pitching_team, moves, batter_end, len(scored), len(plays),
+            state["home"], state["away"],
+        ))
+
+        # Robo de base tras llegar a primera
+        if outs < 3 and bases[0] is not None and bases[1] is None and rng.random() < 0.04:
+            runner = batting.batting.setdefault(bases[0], _Line())
+            if rng.random() < 0.72:
+                runner["sb"] += 1
+                bases = [None, bases[0], bases[2]]
+            else:
+                runner["cs"] += 1
+                bases = [None, bases[1], bases[2]]
+                outs += 1
+                pit_line["outs"] += 1
+
+        # Cambio de pitcher a mitad de entrada si el abridor se cae
+        if outs < 3 and pit_line["r"] >= 6 and len(fielding.pitchers_used) == 1:
+            fielding.starter_innings = 0
+            fielding.maybe_change_pitcher(inning)
+            pitcher = fielding.pitcher
+            pit_line = fielding.pitching.setdefault(pitcher["id"], _Line())
+
+        if walkoff_target is not None and state["home"] > walkoff_target:
+            break
+    return runs
+
+
+def simulate_game(rng, home_roster, away_roster, with_plays=False):
+    """Juego completo: marcador por entrada, líneas de bateo/pitcheo y jugadas."""
+    home, away = _TeamGame(rng, home_roster), _TeamGame(rng, away_roster)
+    state = {"home": 0, "away": 0}
+    innings, plays = [], []
+    inning = 1
+    while True:
+        away_runs = _simulate_half(rng, away, home, inning, "top", state, plays)
+        home_runs = None
+        if not (inning >= 9 and state["home"] > state["away"]):
+            walkoff = state["away"] if inning >= 9 else None
+            home_runs = _simulate_half(rng, home, away, inning, "bottom", state, plays, walkoff_target=walkoff)
+        innings.append((inning, home_runs, away_runs))
+        if inning >= 9 and state["home"] != state["away"]:
+            break
+        if inning >= MAX_INNINGS:
+            # Sin empates en la LVBP: se decide con una carrera de la casa
+            state["home"] += 1
+            innings[-1] = (inning, (home_runs or 0) + 1, away_runs)
+            break
+        inning += 1
+    return {
+        "home": home,
+        "away": away,
+        "home_score": state["home"],
+        "away_score": state["away"],
+        "innings": innings,
+        "plays": plays if with_plays else None,
+    }
+
+
+# ============================================================
+# FORMATO statsapi -> registros de la ingesta
+# ============================================================
+
+def _decisions(sim, side):
+    """{pitcher_id: {wins/losses/saves: 1}} del equipo con reglas simplificadas de anotación"""
+    team_game = sim[side]
+    used = team_game.pitchers_used
+    if not used:
+        return {}
+    other = "away" if side == "home" else "home"
+    won = sim[f"{side}_score"] > sim[f"{other}_score"]
+    lines = [team_game.pitching.get(p["id"], _Line()) for p in used]
+    if won:
+        # Ganado al abridor con 5+ innings; si no, al primer relevista
+        winner = used[0] if lines[0]["outs"] >= 15 or len(used) == 1 else used[1]
+        decisions = {winner["id"]: {"wins": 1}}
+        margin = sim[f"{side}_score"] - sim[f"{other}_score"]
+        if margin <= 3 and used[-1]["id"] != winner["id"]:
+            decisions[used[-1]["id"]] = {"saves": 1}
+        return decisions
+    # Perdido al que más carreras permitió
+    loser = max(zip(used, lines), key=lambda pair: pair[1]["r"])[0]
+    return {loser["id"]: {"losses": 1}}
+
+
+def _boxscore(sim, team_names):
+    teams = {}
+    for side in ("home", "away"):
+        team_game = sim[side]
+        team_id = team_game.roster["team_id"]
+        decisions = _decisions(sim, side)
+        players = {}
+        people = {p["id"]: p for p in team_game.roster["hitters"] + team_game.roster["pitchers"]}
+        for player_id, line in team_game.batting.items():
+            players[f"ID{player_id}"] = {
+                "person": {"id": player_id, "fullName": people[player_id]["fullName"]},
+                "position": {"abbreviation": people[player_id]["position"]},
+                "stats": {"batting": {
+                    "atBats": line["ab"], "runs": line["r"], "hits": line["h"], "doubles": line["doubles"],
+                    "triples": line["triples"], "homeRuns": line["hr"], "rbi": line["rbi"],
+                    "baseOnBalls": line["bb"], "strikeOuts": line["so"], "stolenBases": line["sb"],
+                    "caughtStealing": line["cs"], "hitByPitch": line["hbp"], "sacFlies": line["sf"],
+                    "sacBunts": line["sh"],
+                }},
+            }
+        for order, pitcher in enumerate(team_game.pitchers_used):
+            line = team_game.pitching.get(pitcher["id"], _Line())
+            players[f"ID{pitcher['id']}"] = {
+                "person": {"id": pitcher["id"], "fullName": pitcher["fullName"]},
+                "position": {"abbreviation": "P"},
+                "stats": {"pitching": {
+                    "inningsPitched": f"{line['outs'] // 3}.{line['outs'] % 3}",
+                    "hits": line["h"], "runs": line["r"], "earnedRuns": line["er"],
+                    "baseOnBalls": line["bb"], "strikeOuts": line["so"], "homeRuns": line["hr"],
+                    "hitBatsmen": line["hbp"], "wildPitches": line["wp"], "balks": 0,
+                    "gamesStarted": int(order == 0),
+                    **decisions.get(pitcher["id"], {}),
+                }},
+            }
+        teams[side] = {"team": {"id": team_id, "name": team_names[team_id]}, "players": players}
+    return {"teams": teams}
+
+
+def _schedule_game(game_pk, game_date, sim, home_id, away_id, team_names, phase):
+    return {
+        "gamePk": game_pk,
+        "gameType": PHASE_CODES[phase],
+        "gameDate": f"{game_date}T23:30:00Z",
+        "status": {"abstractGameState": "Final", "detailedState": "Final"},
+        "teams": {
+            "home": {"team": {"id": home_id, "name": team_names[home_id]}, "score": sim["home_score"]},
+            "away": {"team": {"id": away_id, "name": team_names[away_id]}, "score": sim["away_score"]},
+        },
+        "venue": {"name": f"Estadio {team_names[home_id]}"},
+        "seriesDescription": {"regular": "Regular Season", "wildcard_playin": "Wild Card",
+                              "round_robin": "Round Robin", "final": "Final"}[phase],
+    }
+
+
+def round_robin_rounds(team_ids):
+    """Jornadas de todos contra todos (método del círculo)."""
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = []
+    for _ in range(len(teams) - 1):
+        rounds.append([(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)
+                       if teams[i] is not None and teams[-1 - i] is not None])
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return rounds
+
+
+class SyntheticData:
+    """Tablas en memoria con la forma de Supabase (+ feeds opcionales por juego)."""
+
+    def __init__(self):
+        self.tables = {
+            "teams": [], "games": [], "game_innings": [], "players": [],
+            "batting_stats": [], "pitching_stats": [], "game_facts": [],
+        }
+        self.feeds = {}
+        self._players = {}
+
+    def add_game(self, schedule_game, game_date, season, sim, team_names, with_feed):
+        game_pk = schedule_game["gamePk"]
+        game_record = build_game_record(schedule_game, game_date, season)
+        self.tables["games"].append(game_record)
+        innings = [
+            {"game_id": game_pk, "inning": inning, "home_score": home_runs or 0, "away_score": away_runs}
+            for inning, home_runs, away_runs in sim["innings"]
+        ]
+        self.tables["game_innings"] += innings
+        box = _boxscore(sim, team_names)
+        player_records, batting_records, pitching_records = parse_boxscore(box, game_pk)
+        for record in player_records:
+            self._players[record["id"]] = record
+        self.tables["batting_stats"] += batting_records
+        self.tables["pitching_stats"] += pitching_records
+        self.tables["game_facts"] += build_game_facts(game_record, innings, pitching_records)
+        if with_feed:
+            home_id = schedule_game["teams"]["home"]["team"]["id"]
+            away_id = schedule_game["teams"]["away"]["team"]["id"]
+            self.feeds[game_pk] = {
+                "gamePk": game_pk,
+                "gameData": {"teams": {"home": {"id": home_id, "name": team_names[home_id]},
+                                       "away": {"id": away_id, "name": team_names[away_id]}}},
+                "liveData": {"plays": {"allPlays": sim["plays"]}, "boxscore": box},
+            }
+
+    def finish(self):
+        self.tables["players"] = list(self._players.values())
+        return self
+
+
+def generate(n_seasons=1, n_leagues=1, first_season=2025, games_per_team=63, plays="none",
+             team_id=LEONES_ID, seed=0):
+    """
+    Genera `n_seasons` temporadas (las más recientes terminan en `first_season`).
+
+    plays: "none", "team" (solo juegos de `team_id`) o "all" controla qué juegos
+    guardan feed con jugadas; con muchas temporadas "all" ocupa bastante memoria.
+    """
+    rng = random.Random(seed)
+    leagues = build_leagues(n_leagues)
+    team_names = {tid: name for teams in leagues.values() for tid, name, _ in teams}
+    data = SyntheticData()
+    for league_id, teams in leagues.items():
+        for tid, name, abbr in teams:
+            data.tables["teams"].append({"id": tid, "name": name, "abbreviation": abbr, "league_id": league_id})
+
+    game_pk = 5_000_000
+    for season_index, season in enumerate(range(first_season - n_seasons + 1, first_season + 1)):
+        for league_id, teams in leagues.items():
+            team_ids = [tid for tid, _, _ in teams]
+            rosters = {tid: build_roster(rng, tid, season_index) for tid in team_ids}
+            record = {tid: [0, 0] for tid in team_ids}
+            day = date(season, 10, 15)
+
+            def play(home_id, away_id, phase, game_day):
+                nonlocal game_pk
+                game_pk += 1
+                with_feed = plays == "all" or (plays == "team" and team_id in (home_id, away_id))
+                sim = simulate_game(rng, rosters[home_id], rosters[away_id], with_plays=with_feed)
+                game = _schedule_game(game_pk, game_day.isoformat(), sim, home_id, away_id, team_names, phase)
+                data.add_game(game, game_day.isoformat(), season, sim, team_names, with_feed)
+                return home_id if sim["home_score"] > sim["away_score"] else away_id
+
+            # Temporada regular
+            rounds = round_robin_rounds(team_ids)
+            total = len(team_ids) * games_per_team // 2
+            played = 0
+            while played < total:
+                for home_id, away_id in rounds[day.toordinal() % len(rounds)]:
+                    if played >= total:
+                        break
+                    if rng.random() < 0.5:
+                        home_id, away_id = away_id, home_id
+                    winner = play(home_id, away_id, "regular", day)
+                    loser = away_id if winner == home_id else home_id
+                    record[winner][0] += 1
+                    record[loser][1] += 1
+                    played += 1
+                day += timedelta(days=1)
+
+            ranking = sorted(team_ids, key=lambda t: (record[t][0] / max(1, sum(record[t])), rng.random()), reverse=True)
+            if len(ranking) < 6:
+                continue
+
+            # Play-in: 5to vs 6to por el último cupo
+            day += timedelta(days=1)
+            qualified = ranking[:4] + [play(ranking[4], ranking[5], "wildcard_playin", day)]
+
+            # Round robin: cada par se enfrenta 4 veces
+            rr_wins = {t: 0 for t in qualified}
+            for rep in range(4):
+                for rr_round in round_robin_rounds(qualified):
+                    day += timedelta(days=1)
+                    for home_id, away_id in rr_round:
+                        if rep % 2:
+                            home_id, away_id = away_id, home_id
+                        rr_wins[play(home_id, away_id, "round_robin", day)] += 1
+
+            # Final al mejor de 7
+            finalists = sorted(qualified, key=lambda t: (rr_wins[t], rng.random()), reverse=True)[:2]
+            series = {t: 0 for t in finalists}
+            game_number = 0
+            while max(series.values()) < 4:
+                day += timedelta(days=1)
+                home_id, away_id = finalists if game_number % 4 < 2 else finalists[::-1]
+                series[play(home_id, away_id, "final", day)] += 1
+                game_number += 1
+
+    return data.finish()
+
+
+# ============================================================
+# SALIDA
+# ============================================================
+
+def to_fake_supabase(data):
+    from benchmarks.fake_supabase import FakeSupabase
+
+    return FakeSupabase(data.tables)
+
+
+def plays_table(data):
+    """Jugadas aplanadas (una fila por turno) para formatos tabulares."""
+    rows = []
+    for game_pk, feed in data.feeds.items():
+        for play in feed["liveData"]["plays"]["allPlays"]:
+            about, matchup = play["about"], play["matchup"]
+            rows.append({
+                "game_id": game_pk,
+                "atbat_index": about["atBatIndex"],
+                "inning": about["inning"],
+                "half_inning": about["halfInning"],
+                "batter_id": matchup["batter"]["id"],
+                "pitcher_id": matchup["pitcher"]["id"],
+                "event": play["result"]["event"],
+                "rbi": play["result"]["rbi"],
+                "outs": play["count"]["outs"],
+                "home_score": play["result"]["homeScore"],
+                "away_score": play["result"]["awayScore"],
+            })
+    return rows
+
+
+def write_json(data, out_dir):
+    """Un archivo JSON por tabla y un feed por juego en feeds/."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, rows in data.tables.items():
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+    if data.feeds:
+        os.makedirs(os.path.join(out_dir, "feeds"), exist_ok=True)
+        for game_pk, feed in data.feeds.items():
+            with open(os.path.join(out_dir, "feeds", f"{game_pk}.json"), "w", encoding="utf-8") as f:
+                json.dump(feed, f, ensure_ascii=False)
+
+
+def write_parquet(data, out_dir):
+    """Parquet particionado por temporada (requiere pyarrow)."""
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    games = pd.DataFrame(data.tables["games"])
+    season_by_game = games.set_index("id")["season"]
+    tables = dict(data.tables)
+    if data.feeds:
+        tables["plays"] = plays_table(data)
+    for name, rows in tables.items():
+        df = pd.DataFrame(rows)
+        if df.empty:
+            continue
+        path = os.path.join(out_dir, name)
+        if "season" not in df.columns and "game_id" in df.columns:
+            df["season"] = df["game_id"].map(season_by_game)
+        if "season" in df.columns:
+            # Reemplazar particiones existentes en lugar de sumar archivos
+            df.to_parquet(path, partition_cols=["season"], index=False, existing_data_behavior="delete_matching")
+        else:
+            df.to_parquet(path + ".parquet", index=False)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos LVBP")
+    parser.add_argument("--seasons", type=int, default=1, help="Cantidad de temporadas")
+    parser.add_argument("--leagues", type=int, default=1, help="Ligas (la primera es la LVBP)")
+    parser.add_argument("--last-season", type=int, default=2025, help="Temporada más reciente")
+    parser.add_argument("--plays", choices=["none", "team", "all"], default="none", help="Juegos con feed de jugadas")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json")
+    parser.add_argument("--out", type=str, required=True, help="Directorio de salida")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    data = generate(args.seasons, args.leagues, args.last_season, plays=args.plays, seed=args.seed)
+    if args.format == "parquet":
+        write_parquet(data, args.out)
+    else:
+        write_json(data, args.out)
+    counts = ", ".join(f"{name}={len(rows)}" for name, rows in data.tables.items())
+    print(f"✅ {args.seasons} temporadas generadas en {args.out}: {counts}, feeds={len(data.feeds)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 # pages/Standings.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import sys
@@ -12,9 +11,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar funciones
 try:
-    from utils.supabase_client import get_standings, get_recent_games, init_supabase, get_available_seasons, get_current_season
+    from utils.supabase_client import get_standings, get_standings_timeline, get_recent_games, init_supabase, get_available_seasons, get_current_season
+    from utils.head_to_head import LVBP_TEAMS, head_to_head_records
 except:
-    from streamlit_app.utils.supabase_client import get_standings, get_recent_games, init_supabase, get_available_seasons, get_current_season
+    from streamlit_app.utils.supabase_client import get_standings, get_standings_timeline, get_recent_games, init_supabase, get_available_seasons, get_current_season
+    from streamlit_app.utils.head_to_head import LVBP_TEAMS, head_to_head_records
 
 ELO_PHASE_OPTIONS = {
     "regular": "Temporada Regular",
@@ -91,18 +92,6 @@ with col1:
     selected_season = season_options[selected_season_display]
     st.markdown(f"### Tabla de Posiciones - LVBP {selected_season_display}")
 
-# IDs de los 8 equipos LVBP
-LVBP_TEAMS = {
-    695: "Leones del Caracas",
-    698: "Tiburones de La Guaira", 
-    696: "Navegantes del Magallanes",
-    699: "Tigres de Aragua",
-    692: "Águilas del Zulia",
-    693: "Cardenales de Lara",
-    694: "Caribes de Anzoátegui",
-    697: "Bravos de Margarita"
-}
-
 # Obtener standings
 standings_df = get_standings(selected_season)
 
@@ -241,6 +230,9 @@ if not standings_df.empty:
             st.info("No hay datos de los Leones del Caracas para esta temporada")
     
     with tab2:
+        # plotly.express tarda en cargar: solo cuando se dibujan los gráficos
+        import plotly.express as px
+
         col1, col2 = st.columns(2)
         
         with col1:
@@ -314,6 +306,53 @@ if not standings_df.empty:
             )
         
         st.plotly_chart(fig_pct, use_container_width=True)
+        
+        # Evolución de posiciones (serie histórica de standings)
+        st.markdown("---")
+        st.markdown(f"#### 📈 Posición en el Tiempo - {selected_season_display}")
+        
+        try:
+            timeline = get_standings_timeline(selected_season)
+            positions_df = timeline.positions()
+        except Exception as e:
+            st.error(f"Error cargando la serie histórica: {str(e)}")
+            positions_df = pd.DataFrame()
+        
+        if not positions_df.empty:
+            fig_positions = px.line(
+                positions_df,
+                x='date',
+                y='position',
+                color='team_name',
+                line_shape='hv',
+                hover_data={'wins': True, 'losses': True, 'games_back': ':.1f', 'pct': ':.3f'},
+                labels={'date': 'Fecha', 'position': 'Posición', 'team_name': 'Equipo'}
+            )
+            fig_positions.update_layout(
+                height=400,
+                yaxis=dict(autorange='reversed', dtick=1),
+                legend_title_text=''
+            )
+            st.plotly_chart(fig_positions, use_container_width=True)
+            
+            # Tabla de posiciones a una fecha específica
+            as_of_date = st.date_input(
+                "📅 Ver tabla al",
+                value=timeline.last_date.date(),
+                min_value=timeline.first_date.date(),
+                max_value=timeline.last_date.date(),
+                key="standings_as_of_date"
+            )
+            as_of_df = timeline.as_of(as_of_date)
+            if not as_of_df.empty:
+                as_of_display = as_of_df[['team_name', 'wins', 'losses', 'pct', 'games_back', 'last_10', 'streak']].copy()
+                as_of_display.insert(0, '#', range(1, len(as_of_display) + 1))
+                as_of_display['pct'] = as_of_display['pct'].apply(lambda x: f'.{int(x*1000):03d}')
+                as_of_display['games_back'] = as_of_display['games_back'].apply(lambda x: '-' if x == 0 else f'{x:.1f}')
+                as_of_display.columns = ['#', 'Equipo', 'G', 'P', 'PCT', 'JD', 'Últimos 10', 'Racha']
+                st.dataframe(as_of_display, use_container_width=True, hide_index=True)
+        else:
+            st.info("No hay juegos finalizados para construir la serie histórica")
     
     with tab3:
         st.markdown(f"### 🆚 Récord Head to Head - Leones del Caracas ({selected_season_display})")
@@ -321,18 +360,6 @@ if not standings_df.empty:
         # Obtener juegos de los Leones
         supabase = init_supabase()
         
-        # IDs CORRECTOS de los equipos LVBP
-        LVBP_TEAMS = {
-            695: "Leones del Caracas",
-            698: "Tiburones de La Guaira", 
-            696: "Navegantes del Magallanes",
-            699: "Tigres de Aragua",
-            692: "Águilas del Zulia",
-            693: "Cardenales de Lara",
-            694: "Caribes de Anzoátegui",
-            697: "Bravos de Margarita"
-        }
-        
         LEONES_ID = 695
         
         try:
@@ -348,135 +375,7 @@ if not standings_df.empty:
                 games_df = pd.DataFrame(games_response.data)
                 
                 # Calcular récord contra cada equipo
-                h2h_data = []
-                
-                for team_id, team_name in LVBP_TEAMS.items():
-                    if team_id == LEONES_ID:
-                        continue  # Saltar Leones vs Leones
-                    
-                    # Filtrar juegos contra este equipo
-                    vs_team = games_df[
-                        ((games_df['home_team_id'] == LEONES_ID) & (games_df['away_team_id'] == team_id)) |
-                        ((games_df['away_team_id'] == LEONES_ID) & (games_df['home_team_id'] == team_id))
-                    ]
-                    
-                    if len(vs_team) == 0:
-                        # Nombre corto del equipo
-                        short_name = team_name.replace(' del ', ' ').replace(' de ', ' ')
-                        if 'Tiburones' in short_name:
-                            short_name = 'Tiburones'
-                        elif 'Navegantes' in short_name:
-                            short_name = 'Magallanes'
-                        elif 'Tigres' in short_name:
-                            short_name = 'Tigres'
-                        elif 'Águilas' in short_name:
-                            short_name = 'Águilas'
-                        elif 'Cardenales' in short_name:
-                            short_name = 'Cardenales'
-                        elif 'Caribes' in short_name:
-                            short_name = 'Caribes'
-                        elif 'Bravos' in short_name:
-                            short_name = 'Margarita'
-                        
-                        h2h_data.append({
-                            'Rival': short_name,
-                            'JJ': 0,
-                            'G': 0,
-                            'P': 0,
-                            'PCT': '.000',
-                            'Local': '0-0',
-                            'Visitante': '0-0',
-                            'CF': 0,
-                            'CP': 0,
-                            'DIF': 0,
-                            'Última': '-'
-                        })
-                        continue
-                    
-                    # Calcular estadísticas
-                    total_games = 0
-                    total_wins = 0
-                    total_losses = 0
-                    home_wins = 0
-                    home_losses = 0
-                    away_wins = 0
-                    away_losses = 0
-                    runs_for = 0
-                    runs_against = 0
-                    
-                    for _, game in vs_team.iterrows():
-                        total_games += 1
-                        
-                        if game['home_team_id'] == LEONES_ID:
-                            # Leones jugando de local
-                            runs_for += game['home_score'] or 0
-                            runs_against += game['away_score'] or 0
-                            
-                            if game['home_score'] > game['away_score']:
-                                total_wins += 1
-                                home_wins += 1
-                            else:
-                                total_losses += 1
-                                home_losses += 1
-                        else:
-                            # Leones jugando de visitante
-                            runs_for += game['away_score'] or 0
-                            runs_against += game['home_score'] or 0
-                            
-                            if game['away_score'] > game['home_score']:
-                                total_wins += 1
-                                away_wins += 1
-                            else:
-                                total_losses += 1
-                                away_losses += 1
-                    
-                    # Último juego
-                    last_game = vs_team.sort_values('game_date').iloc[-1]
-                    if last_game['home_team_id'] == LEONES_ID:
-                        last_result = 'V' if last_game['home_score'] > last_game['away_score'] else 'D'
-                        last_score = f"{last_game['home_score']}-{last_game['away_score']}"
-                    else:
-                        last_result = 'V' if last_game['away_score'] > last_game['home_score'] else 'D'
-                        last_score = f"{last_game['away_score']}-{last_game['home_score']}"
-                    
-                    try:
-                        last_date = pd.to_datetime(last_game['game_date']).strftime('%d/%m')
-                    except:
-                        last_date = ''
-                    
-                    # Calcular PCT
-                    pct = total_wins / total_games if total_games > 0 else 0
-                    
-                    # Nombre corto del equipo
-                    short_name = team_name.replace(' del ', ' ').replace(' de ', ' ')
-                    if 'Tiburones' in short_name:
-                        short_name = 'Tiburones'
-                    elif 'Navegantes' in short_name:
-                        short_name = 'Magallanes'
-                    elif 'Tigres' in short_name:
-                        short_name = 'Tigres'
-                    elif 'Águilas' in short_name:
-                        short_name = 'Águilas'
-                    elif 'Cardenales' in short_name:
-                        short_name = 'Cardenales'
-                    elif 'Caribes' in short_name:
-                        short_name = 'Caribes'
-                    elif 'Bravos' in short_name:
-                        short_name = 'Margarita'
-                    
-                    h2h_data.append({
-                        'Rival': short_name,
-                        'JJ': total_games,
-                        'G': total_wins,
-                        'P': total_losses,
-                        'PCT': f'.{int(pct*1000):03d}',
-                        'Local': f'{home_wins}-{home_losses}',
-                        'Visitante': f'{away_wins}-{away_losses}',
-                        'CF': runs_for,
-                        'CP': runs_against,
-                        'DIF': runs_for - runs_against,
-                        'Última': f'{last_result} {last_score} ({last_date})' if last_date else f'{last_result} {last_score}'
-                    })
+                h2h_data = head_to_head_records(games_df, LEONES_ID, LVBP_TEAMS)
                 
                 # Crear DataFrame y ordenar por PCT
                 h2h_df = pd.DataFrame(h2h_data)
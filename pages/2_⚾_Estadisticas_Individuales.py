@@ -1,9 +1,6 @@
 # pages/2_⚾_Estadisticas_Individuales.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
 import sys
 import os
 
@@ -14,19 +11,25 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from utils.supabase_client import (
         get_batting_stats,
+        get_batting_splits,
+        get_batter_matchups,
         get_pitching_stats,
         get_current_season,
         get_available_seasons,
         init_supabase
     )
+    from utils.plays import SPLITS
 except:
     from streamlit_app.utils.supabase_client import (
         get_batting_stats,
+        get_batting_splits,
+        get_batter_matchups,
         get_pitching_stats,
         get_current_season,
         get_available_seasons,
         init_supabase
     )
+    from streamlit_app.utils.plays import SPLITS
 
 st.set_page_config(page_title="Estadísticas Individuales - RepubliCaraquistApp", page_icon="⚾", layout="wide")
 
@@ -190,7 +193,9 @@ with tab1:
 
             st.markdown("---")
 
-            # Gráficos
+            # Gráficos (plotly.express se carga solo al dibujarlos)
+            import plotly.express as px
+
             st.markdown("#### 📈 Visualizaciones")
 
             viz_col1, viz_col2 = st.columns(2)
@@ -277,6 +282,23 @@ with tab1:
                 )
                 st.plotly_chart(fig_ops, use_container_width=True)
 
+            # Splits desde los turnos al bate (plate_appearances)
+            splits_df = get_batting_splits(team_id=695, season=selected_season)
+            if not splits_df.empty:
+                st.markdown("#### 🔀 Splits de Bateo")
+
+                selected_split = st.selectbox("Split", options=list(SPLITS.keys()))
+                split_view = splits_df[
+                    (splits_df['split'] == selected_split)
+                    & splits_df['player_id'].isin(batting_filtered['player_id'])
+                ]
+                split_cols = ['player_name', 'pa', 'ab', 'h', 'hr', 'bb', 'so', 'avg', 'obp', 'slg', 'ops']
+                st.dataframe(
+                    split_view[split_cols].sort_values('pa', ascending=False),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
         else:
             st.warning(f"No hay jugadores con al menos {min_ab} turnos al bate.")
 
@@ -413,7 +435,9 @@ with tab2:
 
             st.markdown("---")
 
-            # Gráficos
+            # Gráficos (plotly.express se carga solo al dibujarlos)
+            import plotly.express as px
+
             st.markdown("#### 📈 Visualizaciones")
 
             viz_col1, viz_col2 = st.columns(2)
@@ -633,6 +657,26 @@ with tab3:
 
         st.markdown("---")
 
+        # Duelos bateador-pitcher desde plate_appearances
+        st.markdown("#### 🎯 Bateador vs Pitcher")
+
+        batter_options = dict(zip(batting_df['player_name'], batting_df['player_id']))
+        matchup_batter = st.selectbox("Seleccionar bateador", options=list(batter_options.keys()))
+
+        if matchup_batter:
+            matchups_df = get_batter_matchups(batter_options[matchup_batter], season=selected_season)
+            if not matchups_df.empty:
+                matchup_cols = ['pitcher_name', 'pa', 'ab', 'h', 'hr', 'bb', 'so', 'avg', 'obp', 'slg', 'ops']
+                st.dataframe(
+                    matchups_df[matchup_cols],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("No hay turnos al bate registrados para este bateador en la temporada.")
+
+        st.markdown("---")
+
         # Análisis de equipo
         st.markdown("#### 🦁 Análisis General del Equipo")
 
@@ -1,11 +1,7 @@
 # pages/3_📈_Análisis_WPA.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
 from datetime import datetime
 import sys
 import os
@@ -15,9 +11,21 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar funciones de Supabase
 try:
-    from utils.supabase_client import init_supabase, get_available_seasons, get_current_season
+    from utils.supabase_client import (
+        init_supabase, get_available_seasons, get_current_season,
+        get_game_re24, get_player_leverage, get_player_re24, get_re_matrix
+    )
 except:
-    from streamlit_app.utils.supabase_client import init_supabase, get_available_seasons, get_current_season
+    from streamlit_app.utils.supabase_client import (
+        init_supabase, get_available_seasons, get_current_season,
+        get_game_re24, get_player_leverage, get_player_re24, get_re_matrix
+    )
+from utils.live import POLL_INTERVAL_S, get_live_game, get_live_tracker, inning_label
+from utils.resilience import get_json
+from utils.plays import parse_plays
+from utils.run_expectancy import calculate_player_re24
+from utils.win_expectancy import annotate_plays, load_tables
+from utils.wpa import WP_MODEL_VERSION, calculate_player_wpa, compute_feed_wpa, roster_from_boxscore
 
 # Configuración de la página
 st.set_page_config(
@@ -35,13 +43,6 @@ LEONES_RED = "#CE1141"
 # FUNCIONES DE CÁLCULO WPA
 # ========================================
 
-def calculate_wp(inning: int, diff: int) -> float:
-    """Calcula Win Probability simple basado en inning y diferencial"""
-    leverage = min(inning / 9.0, 1.0)
-    wp = 1.0 / (1.0 + np.exp(-0.75 * diff))
-    return max(0.0, min(1.0, wp + 0.25 * leverage * (wp - 0.5)))
-
-
 @st.cache_data(ttl=300)
 def get_leones_games_from_supabase(season: int) -> pd.DataFrame:
     """Obtiene todos los juegos de Leones desde Supabase"""
@@ -70,93 +71,22 @@ def process_game_feed(game_pk: int) -> tuple:
     """Procesa el feed del juego desde la API de MLB y calcula WPA"""
     try:
         url = f"https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
-        response = requests.get(url, timeout=30)
-        feed = response.json()
+        feed = get_json(url)
     except Exception as e:
         return pd.DataFrame(), False, str(e)
 
-    # Identificar si Leones es local o visitante
-    try:
-        home_id = feed["gameData"]["teams"]["home"]["id"]
-        leones_is_home = (home_id == TEAM_ID)
-
-        home_name = feed["gameData"]["teams"]["home"]["name"]
-        away_name = feed["gameData"]["teams"]["away"]["name"]
-    except:
-        return pd.DataFrame(), False, "Error en datos del juego"
-
-    # Procesar jugadas
-    all_plays = feed.get("liveData", {}).get("plays", {}).get("allPlays", [])
-
-    if not all_plays:
-        return pd.DataFrame(), leones_is_home, "No hay jugadas disponibles"
-
-    wpa_rows = []
-    prev_wp = 0.5
-    home_score = away_score = 0
-
-    for idx, play in enumerate(all_plays):
-        about = play.get("about", {})
-        result = play.get("result", {})
-        matchup = play.get("matchup", {})
-
-        inning = about.get("inning", 1)
-        half = about.get("halfInning", "top")
+    df_wpa, leones_is_home, error = compute_feed_wpa(feed, TEAM_ID)
 
-        # Calcular carreras anotadas
-        runs = sum(1 for runner in play.get("runners", [])
-                   if runner.get("movement", {}).get("end") == "score")
+    # Leverage index de cada jugada (tablas precalculadas de win expectancy)
+    tables = load_tables()
+    if tables is not None and not df_wpa.empty:
+        pa = pd.DataFrame(parse_plays(feed, game_pk)[0])
+        if not pa.empty:
+            # Las jugadas de corredores (robos, wild pitch...) no son turnos: quedan sin LI
+            li = annotate_plays(pa, tables).set_index('at_bat_index')['li']
+            df_wpa['li'] = df_wpa['atbat_index'].map(li)
 
-        # Actualizar score
-        if half == "bottom":
-            home_score += runs
-        else:
-            away_score += runs
-
-        # Perspectiva Leones
-        leones_score = home_score if leones_is_home else away_score
-        opp_score = away_score if leones_is_home else home_score
-
-        # Calcular WPA
-        diff = leones_score - opp_score
-        wp_after = calculate_wp(inning, diff)
-        wpa = wp_after - prev_wp
-
-        # Determinar si el bateador/pitcher es de Leones
-        batter_team = matchup.get("batter", {}).get("parentTeamId")
-        pitcher_team = matchup.get("pitcher", {}).get("parentTeamId")
-
-        wpa_rows.append({
-            "atbat_index": idx,
-            "inning": inning,
-            "halfInning": half,
-            "batter_id": matchup.get("batter", {}).get("id"),
-            "batter": matchup.get("batter", {}).get("fullName", "Desconocido"),
-            "pitcher_id": matchup.get("pitcher", {}).get("id"),
-            "pitcher": matchup.get("pitcher", {}).get("fullName", "Desconocido"),
-            "eventType": result.get("event", ""),
-            "description": result.get("description", ""),
-            "leones_before": leones_score - (runs if half == ("bottom" if leones_is_home else "top") else 0),
-            "opp_before": opp_score - (runs if half != ("bottom" if leones_is_home else "top") else 0),
-            "leones_after": leones_score,
-            "opp_after": opp_score,
-            "wp_before": prev_wp,
-            "wp_after": wp_after,
-            "wpa": wpa,
-            "batter_is_leones": batter_team == TEAM_ID if batter_team else None,
-            "pitcher_is_leones": pitcher_team == TEAM_ID if pitcher_team else None
-        })
-
-        prev_wp = wp_after
-
-    # Ajustar WPA final
-    if wpa_rows:
-        final_diff = wpa_rows[-1]["leones_after"] - wpa_rows[-1]["opp_after"]
-        final_wp = 1.0 if final_diff > 0 else 0.0
-        wpa_rows[-1]["wp_after"] = final_wp
-        wpa_rows[-1]["wpa"] = final_wp - wpa_rows[-1]["wp_before"]
-
-    return pd.DataFrame(wpa_rows), leones_is_home, None
+    return df_wpa, leones_is_home, error
 
 
 @st.cache_data(ttl=600)
@@ -164,45 +94,11 @@ def get_game_roster(game_pk: int) -> set:
     """Obtiene los IDs de jugadores de Leones que participaron en el juego"""
     try:
         url = f"https://statsapi.mlb.com/api/v1/game/{game_pk}/boxscore"
-        response = requests.get(url, timeout=30)
-        box = response.json()
-
-        players = set()
-
-        for side in ["home", "away"]:
-            team_data = box.get("teams", {}).get(side, {})
-            if team_data.get("team", {}).get("id") == TEAM_ID:
-                for player_id, player_data in team_data.get("players", {}).items():
-                    players.add(player_data.get("person", {}).get("id"))
-
-        return players
+        return roster_from_boxscore(get_json(url), TEAM_ID)
     except:
         return set()
 
 
-def calculate_player_wpa(df_wpa: pd.DataFrame, roster_ids: set) -> pd.DataFrame:
-    """Calcula WPA total por jugador"""
-    # WPA como bateador
-    wpa_bat = df_wpa.groupby(["batter_id", "batter"])["wpa"].sum().reset_index()
-    wpa_bat.columns = ["player_id", "player", "wpa_bat"]
-
-    # WPA como pitcher (invertido - bueno para el pitcher si el bateador hace negativo)
-    wpa_pit = df_wpa.groupby(["pitcher_id", "pitcher"])["wpa"].sum().reset_index()
-    wpa_pit.columns = ["player_id", "player", "wpa_pit"]
-
-    # Combinar
-    wpa_total = pd.merge(wpa_bat, wpa_pit, on=["player_id", "player"], how="outer").fillna(0)
-
-    # Filtrar solo jugadores de Leones si tenemos el roster
-    if roster_ids:
-        wpa_total = wpa_total[wpa_total["player_id"].isin(roster_ids)]
-
-    wpa_total["WPA_total"] = wpa_total["wpa_bat"] + wpa_total["wpa_pit"]
-    wpa_total = wpa_total.sort_values("WPA_total", ascending=False)
-
-    return wpa_total
-
-
 # ========================================
 # FUNCIONES DE VISUALIZACIÓN
 # ========================================
@@ -511,6 +407,61 @@ with st.sidebar:
         Un jugador con alto WPA fue decisivo en la victoria, mientras que WPA negativo indica jugadas que costaron el juego.
         """)
 
+    with st.expander("ℹ️ ¿Qué es RE24?"):
+        st.markdown("""
+        **RE24** mide las carreras que agregó cada turno según el estado de bases y outs (24 estados).
+
+        - Usa las carreras esperadas de la temporada desde cada estado hasta el final del inning
+        - A diferencia del WPA, no depende del marcador ni del inning
+        """)
+
+    # Modo en vivo si los Leones están jugando ahora
+    live_game = get_live_game(TEAM_ID)
+    live_mode = False
+    if live_game:
+        st.markdown("---")
+        live_mode = st.toggle("🔴 Juego en vivo", value=True)
+
+if live_mode:
+    @st.fragment(run_every=POLL_INTERVAL_S)
+    def live_wpa_panel(game_pk):
+        """WPA del juego en curso; cada refresco aplica solo las jugadas nuevas"""
+        tracker = get_live_tracker(game_pk, TEAM_ID)
+        try:
+            tracker.poll()
+        except Exception as e:
+            st.warning(f"⚠️ No se pudo actualizar el juego en vivo: {str(e)[:80]}")
+
+        df_live = tracker.frame()
+        if df_live.empty:
+            st.info("Esperando las primeras jugadas del juego...")
+            return
+
+        teams = tracker.feed.get("gameData", {}).get("teams", {})
+        matchup = f"{teams.get('away', {}).get('name', '')} @ {teams.get('home', {}).get('name', '')}"
+        last = df_live.iloc[-1]
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Marcador Leones", f"{int(last['leones_after'])}-{int(last['opp_after'])}",
+                      "Final" if tracker.is_final else inning_label(tracker.linescore()))
+        with col2:
+            st.metric("WP Leones", f"{last['wp_after']:.1%}", f"{last['wpa']:+.1%} última jugada")
+        with col3:
+            st.metric("Jugadas", len(df_live))
+
+        st.plotly_chart(create_wp_evolution_chart(df_live, {'matchup': f"🔴 En vivo - {matchup}"}),
+                        use_container_width=True)
+
+        st.markdown("#### Últimas jugadas")
+        recent = df_live.tail(5).iloc[::-1][['inning', 'halfInning', 'batter', 'description', 'wpa']]
+        st.dataframe(recent, hide_index=True, use_container_width=True)
+
+    # El panel en vivo va arriba; el análisis de juegos terminados sigue debajo
+    st.markdown("### 🔴 En vivo")
+    live_wpa_panel(live_game['gamePk'])
+    st.markdown("---")
+
 # Obtener juegos de Supabase
 df_games = get_leones_games_from_supabase(selected_season)
 
@@ -611,6 +562,15 @@ if analyze_btn or 'last_game_pk' not in st.session_state or st.session_state.las
         # Calcular WPA por jugador
         wpa_total = calculate_player_wpa(df_wpa, roster_ids)
 
+        # RE24 del juego (turnos guardados en plate_appearances)
+        game_re24 = get_game_re24(game_pk, selected_season)
+        if not game_re24.empty and not wpa_total.empty:
+            player_re24 = calculate_player_re24(game_re24, roster_ids or None, roster_ids or None)
+            wpa_total = wpa_total.merge(
+                player_re24[['player_id', 'RE24_total']].rename(columns={'RE24_total': 'RE24'}),
+                on='player_id', how='left'
+            )
+
         # Guardar en session state
         st.session_state.df_wpa = df_wpa
         st.session_state.wpa_total = wpa_total
@@ -658,11 +618,13 @@ if 'df_wpa' in st.session_state and not st.session_state.df_wpa.empty:
     st.markdown("---")
 
     # Tabs de visualización
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📈 Evolución WP",
         "📊 Por Inning",
         "🦸 Héroes/Villanos",
-        "📋 Detalle Jugadas"
+        "📋 Detalle Jugadas",
+        "🏃 RE24 Temporada",
+        "🎚️ Leverage y Clutch"
     ])
 
     with tab1:
@@ -689,6 +651,15 @@ if 'df_wpa' in st.session_state and not st.session_state.df_wpa.empty:
             bottom_plays.columns = ['Inning', 'Bateador', 'Resultado', 'WPA']
             st.dataframe(bottom_plays, use_container_width=True, hide_index=True)
 
+        # Momentos de mayor leverage
+        if 'li' in df_wpa.columns:
+            st.markdown("#### 🎚️ Momentos de Mayor Presión (LI)")
+            high_li = df_wpa.nlargest(5, 'li')[['inning', 'batter', 'pitcher', 'eventType', 'li', 'wpa']].copy()
+            high_li['li'] = high_li['li'].apply(lambda x: f"{x:.2f}")
+            high_li['wpa'] = high_li['wpa'].apply(lambda x: f"{x:+.3f}")
+            high_li.columns = ['Inning', 'Bateador', 'Pitcher', 'Resultado', 'LI', 'WPA']
+            st.dataframe(high_li, use_container_width=True, hide_index=True)
+
     with tab2:
         col1, col2 = st.columns(2)
 
@@ -739,8 +710,14 @@ if 'df_wpa' in st.session_state and not st.session_state.df_wpa.empty:
             display_wpa['wpa_pit'] = display_wpa['wpa_pit'].apply(lambda x: f"{x:+.3f}" if x != 0 else "0.000")
             display_wpa['WPA_total'] = display_wpa['WPA_total'].apply(lambda x: f"{x:+.3f}" if x != 0 else "0.000")
 
-            display_wpa = display_wpa[['player', 'wpa_bat', 'wpa_pit', 'WPA_total']]
-            display_wpa.columns = ['Jugador', 'WPA Bateo', 'WPA Pitcheo', 'WPA Total']
+            display_cols = ['player', 'wpa_bat', 'wpa_pit', 'WPA_total']
+            display_names = ['Jugador', 'WPA Bateo', 'WPA Pitcheo', 'WPA Total']
+            if 'RE24' in display_wpa.columns:
+                display_wpa['RE24'] = display_wpa['RE24'].apply(lambda x: f"{x:+.2f}" if pd.notna(x) else "-")
+                display_cols.append('RE24')
+                display_names.append('RE24')
+            display_wpa = display_wpa[display_cols]
+            display_wpa.columns = display_names
 
             st.dataframe(display_wpa, use_container_width=True, hide_index=True)
         else:
@@ -789,24 +766,84 @@ if 'df_wpa' in st.session_state and not st.session_state.df_wpa.empty:
 
         # Mostrar tabla
         display_cols = ['inning', 'halfInning', 'batter', 'pitcher', 'eventType', 'wpa', 'wp_after']
+        display_names = ['Inn', '', 'Bateador', 'Pitcher', 'Evento', 'WPA', 'WP']
+        if 'li' in df_filtered.columns:
+            display_cols.append('li')
+            display_names.append('LI')
         df_display = df_filtered[display_cols].copy()
         df_display['wpa'] = df_display['wpa'].apply(lambda x: f"{x:+.3f}")
         df_display['wp_after'] = df_display['wp_after'].apply(lambda x: f"{x:.1%}")
+        if 'li' in df_display.columns:
+            df_display['li'] = df_display['li'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "-")
         df_display['halfInning'] = df_display['halfInning'].map({'top': '▲', 'bottom': '▼'})
-        df_display.columns = ['Inn', '', 'Bateador', 'Pitcher', 'Evento', 'WPA', 'WP']
+        df_display.columns = display_names
 
         st.dataframe(df_display, use_container_width=True, hide_index=True, height=400)
 
         st.caption(f"Mostrando {len(df_filtered)} de {len(df_wpa)} jugadas")
 
+    with tab5:
+        season_re24 = get_player_re24(TEAM_ID, selected_season)
+
+        if not season_re24.empty:
+            col1, col2 = st.columns([1, 2])
+
+            with col1:
+                st.markdown("#### 🎲 Carreras Esperadas")
+                st.dataframe(get_re_matrix(selected_season).to_frame(), use_container_width=True)
+                st.caption("Carreras esperadas hasta el final del inning por corredores (filas) y outs")
+
+            with col2:
+                st.markdown(f"#### 🏆 RE24 Leones {selected_season_display}")
+                display_re24 = season_re24.head(20)[['player_name', 'pa', 're24_bat', 'bf', 're24_pit', 'RE24_total']].copy()
+                for col in ['re24_bat', 're24_pit', 'RE24_total']:
+                    display_re24[col] = display_re24[col].apply(lambda x: f"{x:+.2f}")
+                display_re24.columns = ['Jugador', 'PA', 'RE24 Bateo', 'BF', 'RE24 Pitcheo', 'RE24 Total']
+                st.dataframe(display_re24, use_container_width=True, hide_index=True)
+        else:
+            st.info("No hay turnos al bate guardados para calcular RE24 en esta temporada")
+
+    with tab6:
+        season_leverage = get_player_leverage(TEAM_ID, selected_season)
+
+        if not season_leverage.empty:
+            st.markdown(f"#### 🎚️ Leverage y Clutch Leones {selected_season_display}")
+            st.caption("pLI: leverage promedio de sus turnos · gmLI: leverage al entrar del bullpen · "
+                       "Clutch: WPA/pLI − WPA/LI (positivo = rindió más bajo presión) · "
+                       f"WPA del modelo v{WP_MODEL_VERSION}")
+
+            for role, title in [('Bateador', '🏏 Bateadores'), ('Pitcher', '⚾ Lanzadores')]:
+                role_df = season_leverage[season_leverage['role'] == role]
+                if role_df.empty:
+                    continue
+                st.markdown(f"##### {title}")
+                cols = ['player_name', 'pa', 'pli', 'wpa', 'wpa_li', 'clutch']
+                names = ['Jugador', 'PA' if role == 'Bateador' else 'BF', 'pLI', 'WPA', 'WPA/LI', 'Clutch']
+                if role == 'Pitcher':
+                    cols.insert(3, 'gmli')
+                    names.insert(3, 'gmLI')
+                display_lev = role_df[cols].copy()
+                for col in ['pli', 'gmli']:
+                    if col in display_lev.columns:
+                        display_lev[col] = display_lev[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "-")
+                for col in ['wpa', 'wpa_li', 'clutch']:
+                    display_lev[col] = display_lev[col].apply(lambda x: f"{x:+.2f}")
+                display_lev.columns = names
+                st.dataframe(display_lev, use_container_width=True, hide_index=True)
+        elif load_tables() is None:
+            st.info("Las tablas de win expectancy no están construidas "
+                    "(scripts/build_win_expectancy.py)")
+        else:
+            st.info("No hay turnos al bate guardados para calcular leverage en esta temporada")
+
 else:
     st.info("👆 Selecciona un juego y presiona **Analizar** para ver el análisis WPA")
 
 # Footer
 st.markdown("---")
-st.markdown("""
+st.markdown(f"""
 <div style='text-align: center; color: #666;'>
     <p>📈 Análisis WPA | Datos: MLB Stats API</p>
-    <p>Win Probability calculado con modelo simplificado basado en inning y diferencial</p>
+    <p>Win Probability calculado con modelo simplificado basado en inning y diferencial (v{WP_MODEL_VERSION})</p>
 </div>
 """, unsafe_allow_html=True)
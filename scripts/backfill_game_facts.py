@@ -0,0 +1,74 @@
+"""
+Backfill de game_facts usando juegos, game_innings y pitching_stats ya
+guardados en Supabase.
+
+Uso:
+  python scripts/backfill_game_facts.py --season 2025
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_version import bump
+from utils.db import create_supabase_client
+from utils.game_facts import FINAL_STATUSES, build_game_facts
+from utils.snapshots import fetch_all, fetch_table_rows
+
+# Filas por upsert
+CHUNK = 500
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill de game_facts por temporada")
+    parser.add_argument("--season", type=int, required=True, help="Temporada (ej: 2025)")
+    return parser.parse_args()
+
+
+def build_season_facts(supabase, season):
+    """Filas de game_facts de todos los juegos finalizados de la temporada."""
+    games = fetch_all(
+        lambda: supabase.table("games").select("*").eq("season", season).in_("status", FINAL_STATUSES).order("id")
+    )
+    game_ids = [g["id"] for g in games]
+    innings = fetch_table_rows(supabase, "game_innings", season, game_ids=game_ids)
+    pitching = fetch_table_rows(supabase, "pitching_stats", season, game_ids=game_ids)
+
+    innings_by_game, pitching_by_game = {}, {}
+    for row in innings:
+        innings_by_game.setdefault(row["game_id"], []).append(row)
+    for row in pitching:
+        pitching_by_game.setdefault(row["game_id"], []).append(row)
+
+    facts = []
+    without_innings = 0
+    for game in games:
+        if game["id"] not in innings_by_game:
+            without_innings += 1
+        facts += build_game_facts(game, innings_by_game.get(game["id"], []), pitching_by_game.get(game["id"]))
+    return games, facts, without_innings
+
+
+def main():
+    args = parse_args()
+    supabase = create_supabase_client()
+
+    print(f"Iniciando backfill de game_facts para temporada {args.season}")
+    games, facts, without_innings = build_season_facts(supabase, args.season)
+
+    for i in range(0, len(facts), CHUNK):
+        supabase.table("game_facts").upsert(facts[i:i + CHUNK]).execute()
+
+    print(f"juegos={len(games)} filas={len(facts)} sin_innings={without_innings}")
+    if without_innings:
+        print("Los juegos sin innings se pueden completar con update_daily.py --start-date/--end-date")
+
+    # Invalida los cachés de la app para la temporada
+    version = bump(supabase, [args.season])
+    print(f"Versión de datos {args.season}: {version}")
+    print("Backfill game_facts finalizado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Construye las tablas de win expectancy y leverage index con el historial de
+plate_appearances y las guarda en un .npz que la app carga al arrancar.
+Con --upload además lo sube a Supabase Storage, de donde lo baja la app
+(el job nocturno lo corre así).
+
+Uso:
+  python scripts/build_win_expectancy.py --seasons 2022 2023 2024 2025
+  python scripts/build_win_expectancy.py --seasons 2025 --out data/win_expectancy.npz
+  python scripts/build_win_expectancy.py --upload   # últimas HISTORY_SEASONS temporadas
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import create_supabase_client, get_current_season
+from utils.game_facts import FINAL_STATUSES
+from utils.snapshots import fetch_all
+from utils.win_expectancy import TABLES_PATH, WE_COLUMNS, build_tables, upload_tables
+
+# Temporadas del historial si no se pasa --seasons
+HISTORY_SEASONS = 4
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tablas de win expectancy y leverage index")
+    parser.add_argument("--seasons", type=int, nargs="+", help="Temporadas del historial (ej: 2024 2025)")
+    parser.add_argument("--out", type=str, default=TABLES_PATH, help="Ruta del .npz")
+    parser.add_argument("--upload", action="store_true", help="Subir el .npz a Supabase Storage")
+    return parser.parse_args()
+
+
+def load_history(supabase, seasons):
+    """(turnos, {game_id: ganó el home club}) de los juegos finalizados de las temporadas"""
+    frames, home_won = [], {}
+    for season in seasons:
+        games = fetch_all(
+            lambda: supabase.table("games").select("id,home_score,away_score")
+                .eq("season", season).in_("status", FINAL_STATUSES).order("id")
+        )
+        home_won.update({
+            g["id"]: g["home_score"] > g["away_score"]
+            for g in games if g["home_score"] is not None and g["away_score"] is not None
+        })
+        rows = fetch_all(
+            lambda: supabase.table("plate_appearances").select(",".join(WE_COLUMNS))
+                .eq("season", season).order("game_id").order("at_bat_index")
+        )
+        print(f"  {season}: {len(games)} juegos, {len(rows)} turnos")
+        frames.append(pd.DataFrame(rows, columns=WE_COLUMNS))
+    return pd.concat(frames, ignore_index=True), home_won
+
+
+def main():
+    args = parse_args()
+    supabase = create_supabase_client()
+    current = get_current_season()
+    seasons = args.seasons or list(range(current - HISTORY_SEASONS + 1, current + 1))
+
+    print(f"Leyendo historial: {', '.join(str(s) for s in seasons)}")
+    pa, home_won = load_history(supabase, seasons)
+    if pa.empty:
+        print("⚠️ No hay turnos guardados; ejecuta la ingesta primero")
+        return
+
+    start = time.perf_counter()
+    tables = build_tables(pa, home_won, seasons=seasons)
+    tables.save(args.out)
+    print(f"✅ Tablas construidas en {time.perf_counter() - start:.2f}s: {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.0f} KB, {int((tables.counts > 0).sum())} estados con datos)")
+
+    if args.upload:
+        upload_tables(supabase, args.out)
+        print("☁️ Tablas subidas a Supabase Storage")
+
+
+if __name__ == "__main__":
+    main()
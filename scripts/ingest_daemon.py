@@ -0,0 +1,241 @@
+# scripts/ingest_daemon.py
+"""
+Ingesta continua durante el día: vigila el schedule de hoy e ingiere cada
+juego a los pocos minutos de quedar Final.
+
+Por cada ciclo con juegos recién finalizados:
+  stats del juego -> standings -> ELO (idempotente, solo juegos nuevos)
+  -> versión de datos (la app invalida sus cachés y el juego aparece en la
+  página de WPA, que se calcula desde el feed al abrirlo) -> insights de IA
+  de la nueva versión (con OPENAI_API_KEY).
+
+Entre polls duerme según el estado del día: poco mientras hay juegos en
+curso, hasta cerca del primer juego si aún no empiezan, y hasta el día
+siguiente cuando todos terminaron. El job diario queda como red de
+seguridad (dead letters, juegos corregidos después).
+
+Uso:
+  python scripts/ingest_daemon.py
+  python scripts/ingest_daemon.py --once          # un solo ciclo (cron)
+  python scripts/ingest_daemon.py --live-interval 60 --persist-run
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import update_daily as daily
+from utils.ingest_metrics import execute, persist_report, start_run
+from utils.resilience import DeadLetters
+
+JOB = "ingest_daemon"
+
+# Segundos entre polls con juegos en curso
+LIVE_INTERVAL_S = 120
+# Margen antes del primer juego programado
+PREGAME_MARGIN_S = 10 * 60
+# Espera máxima entre polls (un juego pospuesto o reprogramado se detecta igual)
+MAX_IDLE_S = 3 * 60 * 60
+# Cada cuánto se reintentan los dead letters
+DEAD_LETTER_INTERVAL_S = 60 * 60
+
+FINAL_STATES = {"Final", "Game Over", "Completed Early"}
+
+stop_event = threading.Event()
+
+
+def fetch_schedule(day):
+    """Juegos de la fecha como [(fecha, game)]"""
+    schedule = daily.statsapi_get("schedule", {
+        "sportId": 17,
+        "startDate": day,
+        "endDate": day,
+        "leagueId": daily.LEAGUE_ID
+    })
+    return [(date.get("date"), game) for date in schedule.get("dates", []) for game in date.get("games", [])]
+
+
+def is_final(game):
+    return game.get("status", {}).get("detailedState") in FINAL_STATES
+
+
+def already_ingested(game_ids):
+    """gamePks que ya tienen stats en la base (p. ej. de una corrida anterior del daemon)"""
+    if not game_ids:
+        return set()
+    response = execute(daily.supabase.table("batting_stats") \
+        .select("game_id") \
+        .in_("game_id", list(game_ids)))
+    return {row["game_id"] for row in response.data or []}
+
+
+def game_start(game):
+    try:
+        return datetime.fromisoformat(game.get("gameDate", "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def next_sleep(games, now, live_interval=LIVE_INTERVAL_S):
+    """Segundos hasta el próximo poll según el estado de los juegos del día."""
+    pending = [game for _, game in games if not is_final(game)]
+    if not pending:
+        # Todo terminó: hasta poco después de medianoche (schedule del día siguiente)
+        local_now = datetime.now()
+        tomorrow = (local_now + timedelta(days=1)).replace(hour=0, minute=5, second=0, microsecond=0)
+        return min(MAX_IDLE_S, max(live_interval, (tomorrow - local_now).total_seconds()))
+
+    if any(game.get("status", {}).get("abstractGameState") == "Live" for game in pending):
+        return live_interval
+
+    starts = [start for start in (game_start(game) for game in pending) if start]
+    if not starts:
+        return live_interval
+    until_first = (min(starts) - now).total_seconds() - PREGAME_MARGIN_S
+    # Juego retrasado (ya pasó la hora pero no empieza): se sigue con el intervalo en vivo
+    return min(MAX_IDLE_S, max(live_interval, until_first))
+
+
+class IngestDaemon:
+    """Estado del daemon entre ciclos: qué juegos ya se ingirieron."""
+
+    def __init__(self, snapshot_dir=None, persist_run=False, live_interval=LIVE_INTERVAL_S):
+        self.snapshot_dir = snapshot_dir
+        self.persist_run = persist_run
+        self.live_interval = live_interval
+        self.ingested = set()
+        self.checked = set()
+        self.last_dead_letter_retry = 0.0
+
+    def _days(self):
+        """Hoy y ayer: un juego nocturno puede terminar después de medianoche"""
+        now = datetime.now()
+        return [(now - timedelta(days=1)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')]
+
+    def run_cycle(self):
+        """Un poll del schedule; ingiere los juegos recién finalizados. Retorna los segundos a dormir."""
+        report = start_run(JOB)
+        daily.dead_letters = DeadLetters(daily.supabase, JOB, execute=execute)
+        season = daily.get_current_season()
+        new_games = []
+
+        try:
+            if time.monotonic() - self.last_dead_letter_retry >= DEAD_LETTER_INTERVAL_S:
+                with report.stage("retry_dead_letters"):
+                    daily.retry_dead_letters()
+                self.last_dead_letter_retry = time.monotonic()
+
+            with report.stage("poll_schedule"):
+                games = []
+                for day in self._days():
+                    games.extend(fetch_schedule(day))
+
+            finals = {game["gamePk"] for _, game in games if is_final(game)}
+            # Al arrancar (o con juegos nuevos) se consulta la base una sola vez por juego
+            unchecked = finals - self.checked - self.ingested
+            if unchecked:
+                self.ingested |= already_ingested(unchecked)
+                self.checked |= unchecked
+
+            new_games = [(date, game) for date, game in games
+                         if game["gamePk"] in finals and game["gamePk"] not in self.ingested]
+
+            # Registro de juegos (estado, marcador) en cada poll: la app ve el estado en curso
+            with report.stage("update_games"):
+                for date, game in games:
+                    try:
+                        daily.upsert_game_record(daily.supabase, daily.build_game_record(game, date, season))
+                    except Exception as e:
+                        report.record_failure(e, context=f"game {game['gamePk']}")
+
+            if new_games:
+                print(f"🏁 {len(new_games)} juego(s) finalizados: {', '.join(str(g['gamePk']) for _, g in new_games)}")
+                with report.stage("update_game_stats"):
+                    for date, game in new_games:
+                        before = len(report.dead_letters)
+                        daily.update_game_stats(game["gamePk"], daily.build_game_record(game, date, season))
+                        # Si falló queda como dead letter; no se reintenta en cada poll
+                        self.ingested.add(game["gamePk"])
+                        if len(report.dead_letters) > before:
+                            print(f"⚠️ Juego {game['gamePk']} quedó pendiente para reintento")
+
+                with report.stage("update_standings"):
+                    daily.update_standings()
+                with report.stage("update_elo_ratings"):
+                    daily.update_elo_ratings(season)
+                with report.stage("publish_data_version"):
+                    version = daily.publish_data_version(season)
+                with report.stage("publish_ai_insights"):
+                    daily.publish_ai_insights(season, version, self.snapshot_dir)
+                if self.snapshot_dir:
+                    with report.stage("export_snapshots"):
+                        daily.export_snapshots(season, self.snapshot_dir, version)
+        except Exception as e:
+            # Un ciclo fallido no tumba el daemon: se reintenta en el próximo poll
+            report.record_failure(e, context="cycle")
+            print(f"❌ Error en el ciclo: {str(e)[:100]}")
+            return self.live_interval
+        finally:
+            report.finish()
+            # Solo se persisten los ciclos que ingirieron algo (los polls vacíos no aportan)
+            if self.persist_run and new_games:
+                persist_report(daily.supabase, report)
+
+        return next_sleep(games, datetime.now(timezone.utc), self.live_interval)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingesta continua LVBP")
+    parser.add_argument("--once", action="store_true", help="Un solo ciclo y salir")
+    parser.add_argument(
+        "--live-interval",
+        type=int,
+        default=LIVE_INTERVAL_S,
+        help="Segundos entre polls mientras hay juegos en curso",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=str,
+        default=os.environ.get("SNAPSHOT_DIR"),
+        help="Directorio donde exportar los snapshots Parquet tras cada ingesta",
+    )
+    parser.add_argument(
+        "--persist-run",
+        action="store_true",
+        default=os.environ.get("INGEST_PERSIST_RUNS", "").lower() in ("1", "true", "yes"),
+        help="Guardar en ingest_runs los ciclos que ingirieron juegos",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if daily.supabase is None:
+        print("❌ Faltan SUPABASE_URL / SUPABASE_KEY")
+        sys.exit(1)
+
+    # SIGTERM/SIGINT despiertan el sleep y terminan después del ciclo en curso
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    daemon = IngestDaemon(args.snapshot_dir, args.persist_run, args.live_interval)
+    print(f"🛰️ Daemon de ingesta iniciado (temporada {daily.get_current_season()})")
+
+    while not stop_event.is_set():
+        sleep_s = daemon.run_cycle()
+        if args.once:
+            break
+        wake = datetime.now() + timedelta(seconds=sleep_s)
+        print(f"💤 Próximo poll a las {wake.strftime('%H:%M:%S')} ({sleep_s / 60:.0f} min)")
+        stop_event.wait(sleep_s)
+
+    print("👋 Daemon detenido")
+
+
+if __name__ == "__main__":
+    main()
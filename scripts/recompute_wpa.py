@@ -0,0 +1,102 @@
+"""
+Recalcula WP/WPA de todos los turnos guardados (plate_appearances) con el
+modelo actual (utils.wpa.WP_MODEL_VERSION), sin volver a bajar feeds.
+
+Cada temporada se procesa en una sola pasada vectorizada y se escribe con
+upserts masivos; al final se publica una versión de datos nueva para que la
+app invalide sus cachés.
+
+Uso:
+  python scripts/recompute_wpa.py --seasons 2024 2025
+  python scripts/recompute_wpa.py --seasons 2025 --force     # aunque ya estén en la versión actual
+  python scripts/recompute_wpa.py --seasons 2025 --dry-run
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.async_ingest import BULK_CHUNK
+from utils.data_version import bump
+from utils.db import create_supabase_client
+from utils.schema import PLATE_APPEARANCES_OPTIONAL_COLUMNS, probe_columns
+from utils.snapshots import fetch_all
+from utils.wpa import WP_MODEL_VERSION, play_wpa_records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recalcula el WPA guardado con el modelo actual")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True, help="Temporadas (ej: 2024 2025)")
+    parser.add_argument("--force", action="store_true", help="Reescribir también los turnos ya en la versión actual")
+    parser.add_argument("--dry-run", action="store_true", help="Solo calcular y reportar, sin escribir")
+    return parser.parse_args()
+
+
+def recompute_season(rows, force=False):
+    """
+    (filas a escribir, cambio máximo de WPA) de los turnos de una temporada.
+
+    Se recalculan todos los turnos (el WP antes de cada uno depende del
+    anterior) y se escriben los que no estaban en la versión actual, o todos
+    con `force`. Las filas conservan sus columnas y tipos originales.
+    """
+    recomputed = play_wpa_records(rows)
+    to_write, max_change = [], 0.0
+    for old, new in zip(rows, recomputed):
+        if old.get("wpa") is not None:
+            max_change = max(max_change, abs(new["wpa"] - old["wpa"]))
+        if force or old.get("wp_model_version") != WP_MODEL_VERSION:
+            new.pop("updated_at", None)
+            to_write.append(new)
+    return to_write, max_change
+
+
+def main():
+    args = parse_args()
+    supabase = create_supabase_client()
+
+    existing = probe_columns(supabase, "plate_appearances", PLATE_APPEARANCES_OPTIONAL_COLUMNS)
+    if len(existing) < len(PLATE_APPEARANCES_OPTIONAL_COLUMNS):
+        raise RuntimeError("plate_appearances no tiene las columnas de WPA: aplica scripts/sql/wpa_model.sql")
+
+    print(f"Recalculando WPA con el modelo v{WP_MODEL_VERSION}")
+    updated_seasons = []
+    for season in args.seasons:
+        start = time.perf_counter()
+        # Filas completas: el upsert de PostgREST inserta la fila antes de
+        # resolver el conflicto, así que necesita las columnas NOT NULL
+        pa_rows = fetch_all(
+            lambda: supabase.table("plate_appearances").select("*")
+                .eq("season", season).order("game_id").order("at_bat_index")
+        )
+        fetched = time.perf_counter()
+        rows, max_change = recompute_season(pa_rows, force=args.force)
+        total = len(pa_rows)
+        computed = time.perf_counter()
+
+        if rows and not args.dry_run:
+            for i in range(0, len(rows), BULK_CHUNK):
+                supabase.table("plate_appearances").upsert(rows[i:i + BULK_CHUNK]).execute()
+            updated_seasons.append(season)
+
+        print(
+            f"  {season}: {total} turnos, {len(rows)} a escribir, cambio máx. WPA {max_change:.3f} "
+            f"(lectura {fetched - start:.1f}s, cálculo {computed - fetched:.2f}s, "
+            f"escritura {time.perf_counter() - computed:.1f}s)"
+        )
+
+    if args.dry_run:
+        print("Dry run: no se escribió nada")
+        return
+
+    # Invalida los cachés de la app para las temporadas reescritas
+    if updated_seasons:
+        version = bump(supabase, updated_seasons)
+        print(f"Versión de datos {', '.join(str(s) for s in updated_seasons)}: {version}")
+    print("Recálculo de WPA finalizado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Corrige los turnos ya guardados (plate_appearances) sin volver a bajar feeds:
+
+- late_close se recalcula con la regla corregida (antes cualquier turno del
+  7mo en adelante con el bateador arriba quedaba como late & close).
+- Las jugadas de corredores (robos, outs en las bases, wild pitch...) que se
+  guardaron como turnos se borran; sus outs y carreras pasan al turno
+  anterior de la misma media entrada, igual que en utils.plays.parse_plays.
+- Si la tabla tiene las columnas de WPA, se recalcula el WP de los turnos
+  afectados por los cambios.
+
+Al final se publica una versión de datos nueva para que la app invalide sus
+cachés.
+
+Uso:
+  python scripts/repair_plate_appearances.py --seasons 2024 2025
+  python scripts/repair_plate_appearances.py --seasons 2025 --dry-run
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.async_ingest import BULK_CHUNK
+from utils.data_version import bump
+from utils.db import create_supabase_client
+from utils.plays import RUNNER_EVENTS, late_close, runners_on
+from utils.schema import PLATE_APPEARANCES_OPTIONAL_COLUMNS, probe_columns
+from utils.snapshots import fetch_all
+from utils.wpa import play_wpa_records
+
+REPAIRED_COLUMNS = ["late_close", "outs_after", "runs_scored", "wp_before", "wp_after", "wpa"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Corrige late_close y las jugadas de corredores guardadas como turnos")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True, help="Temporadas (ej: 2024 2025)")
+    parser.add_argument("--dry-run", action="store_true", help="Solo calcular y reportar, sin escribir")
+    return parser.parse_args()
+
+
+def repair_season(rows, with_wpa=False):
+    """
+    (filas a escribir, {game_id: [at_bat_index a borrar]}) de los turnos de una
+    temporada, ordenados por juego y turno.
+    """
+    kept, removed = [], defaultdict(list)
+    for row in rows:
+        if row.get("event_type") in RUNNER_EVENTS:
+            previous = kept[-1] if kept else None
+            if previous and (previous["game_id"], previous["inning"], previous["half_inning"]) == \
+                    (row["game_id"], row["inning"], row["half_inning"]):
+                previous["outs_after"] = row["outs_after"]
+                previous["runs_scored"] += row["runs_scored"]
+            removed[row["game_id"]].append(row["at_bat_index"])
+            continue
+        row = dict(row)
+        row["late_close"] = late_close(row["inning"], row["bat_score"], row["fld_score"], runners_on(row["base_state"]))
+        kept.append(row)
+
+    if with_wpa:
+        kept = play_wpa_records(kept)
+
+    originals = {(r["game_id"], r["at_bat_index"]): r for r in rows}
+    to_write = []
+    for row in kept:
+        original = originals[(row["game_id"], row["at_bat_index"])]
+        if any(row.get(c) != original.get(c) for c in REPAIRED_COLUMNS if c in original):
+            row.pop("updated_at", None)
+            to_write.append(row)
+    return to_write, removed
+
+
+def main():
+    args = parse_args()
+    supabase = create_supabase_client()
+    with_wpa = len(probe_columns(supabase, "plate_appearances", PLATE_APPEARANCES_OPTIONAL_COLUMNS)) == \
+        len(PLATE_APPEARANCES_OPTIONAL_COLUMNS)
+
+    print(f"Corrigiendo plate_appearances{' (con WPA)' if with_wpa else ''}")
+    updated_seasons = []
+    for season in args.seasons:
+        start = time.perf_counter()
+        # Filas completas: el upsert de PostgREST necesita las columnas NOT NULL
+        pa_rows = fetch_all(
+            lambda: supabase.table("plate_appearances").select("*")
+                .eq("season", season).order("game_id").order("at_bat_index")
+        )
+        rows, removed = repair_season(pa_rows, with_wpa)
+        n_removed = sum(len(indexes) for indexes in removed.values())
+
+        if (rows or removed) and not args.dry_run:
+            for i in range(0, len(rows), BULK_CHUNK):
+                supabase.table("plate_appearances").upsert(rows[i:i + BULK_CHUNK]).execute()
+            for game_id, indexes in removed.items():
+                supabase.table("plate_appearances").delete() \
+                    .eq("game_id", game_id) \
+                    .in_("at_bat_index", indexes) \
+                    .execute()
+            updated_seasons.append(season)
+
+        print(
+            f"  {season}: {len(pa_rows)} turnos, {len(rows)} corregidos, "
+            f"{n_removed} jugadas de corredores borradas ({time.perf_counter() - start:.1f}s)"
+        )
+
+    if args.dry_run:
+        print("Dry run: no se escribió nada")
+        return
+
+    # Invalida los cachés de la app para las temporadas corregidas
+    if updated_seasons:
+        version = bump(supabase, updated_seasons)
+        print(f"Versión de datos {', '.join(str(s) for s in updated_seasons)}: {version}")
+    print("Corrección de plate_appearances finalizada")
+
+
+if __name__ == "__main__":
+    main()
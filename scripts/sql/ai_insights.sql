@@ -0,0 +1,21 @@
+-- scripts/sql/ai_insights.sql
+-- Insights de IA precalculados por la ingesta nocturna, uno por prompt.
+-- prompt_hash (utils.ai_insights.prompt_hash) cubre modelo, parámetros y
+-- datos del prompt: la app arma el mismo prompt y, si el hash existe, sirve
+-- el contenido sin llamar a OpenAI
+
+create table if not exists public.ai_insights (
+  season integer not null,
+  prompt_hash text not null,
+  data_version bigint,
+  model text not null,
+  content text not null,
+  generated_at timestamptz not null default now(),
+  primary key (season, prompt_hash)
+);
+
+create index if not exists idx_ai_insights_season_version
+  on public.ai_insights (season, data_version);
+
+-- Tokens estimados del prompt compilado (utils.ai_insights.compile_insights_prompt)
+alter table public.ai_insights add column if not exists prompt_tokens integer;
@@ -0,0 +1,9 @@
+-- scripts/sql/data_version.sql
+-- Versión de los datos por temporada: la ingesta la incrementa y la app
+-- la usa como llave de caché
+
+create table if not exists public.data_version (
+  season integer primary key,
+  version bigint not null,
+  updated_at timestamptz not null default now()
+);
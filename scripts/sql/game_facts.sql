@@ -0,0 +1,38 @@
+-- scripts/sql/game_facts.sql
+-- Hechos derivados de cada juego, una fila por equipo. Los calcula la
+-- ingesta (utils/game_facts.py) desde el juego y su linescore; los splits
+-- del tab de Leones son conteos sobre esta tabla
+
+create table if not exists public.game_facts (
+  game_id bigint not null references public.games (id) on delete cascade,
+  team_id integer not null,
+  opponent_id integer not null,
+  season integer not null,
+  game_date date,
+  is_home boolean not null,
+  won boolean not null,
+  runs integer not null,
+  runs_allowed integer not null,
+  innings integer not null default 9,
+  extra_innings boolean not null default false,
+  one_run boolean not null default false,
+  shutout boolean not null default false,
+  walkoff boolean not null default false,
+  night_game boolean not null default false,
+  diff_after_5 integer,
+  diff_after_7 integer,
+  max_lead integer,
+  max_deficit integer,
+  starter_decision boolean,
+  save boolean,
+  updated_at timestamptz not null default now(),
+  constraint game_facts_pkey primary key (game_id, team_id)
+);
+
+-- Tablas creadas antes de agregar las decisiones de pitcheo
+alter table public.game_facts add column if not exists starter_decision boolean;
+alter table public.game_facts add column if not exists save boolean;
+
+-- Lectura de la app: todos los juegos de un equipo en la temporada
+create index if not exists idx_game_facts_season_team
+  on public.game_facts (season, team_id);
@@ -0,0 +1,27 @@
+-- scripts/sql/game_innings.sql
+-- Carreras, hits y errores por inning de cada juego (linescore de statsapi).
+-- La llena update_daily.py junto con el boxscore; la leen los splits
+-- avanzados (remontadas, terreneadas, estado al 5to y 7mo inning)
+
+create table if not exists public.game_innings (
+  game_id bigint not null references public.games (id) on delete cascade,
+  inning integer not null,
+  home_score integer not null default 0,
+  away_score integer not null default 0,
+  home_hits integer not null default 0,
+  away_hits integer not null default 0,
+  home_errors integer not null default 0,
+  away_errors integer not null default 0,
+  updated_at timestamptz not null default now(),
+  constraint game_innings_pkey primary key (game_id, inning)
+);
+
+-- Instalaciones donde la tabla ya existía solo con las carreras
+alter table public.game_innings add column if not exists home_hits integer not null default 0;
+alter table public.game_innings add column if not exists away_hits integer not null default 0;
+alter table public.game_innings add column if not exists home_errors integer not null default 0;
+alter table public.game_innings add column if not exists away_errors integer not null default 0;
+alter table public.game_innings add column if not exists updated_at timestamptz not null default now();
+
+-- La llave primaria (game_id, inning) ya indexa las lecturas por juego
+-- (`game_id in (...)`), tanto de los splits como del export de snapshots
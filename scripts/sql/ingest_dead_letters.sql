@@ -0,0 +1,17 @@
+-- scripts/sql/ingest_dead_letters.sql
+-- Juegos y fechas que fallaron en la ingesta, para reintentarlos en la próxima corrida
+
+create table if not exists public.ingest_dead_letters (
+  kind text not null,
+  key text not null,
+  job text not null,
+  context text,
+  error text,
+  attempts integer not null default 1,
+  first_failed_at timestamptz not null default now(),
+  last_failed_at timestamptz not null default now(),
+  constraint ingest_dead_letters_pkey primary key (kind, key)
+);
+
+create index if not exists idx_ingest_dead_letters_last_failed_at
+  on public.ingest_dead_letters (last_failed_at);
@@ -0,0 +1,21 @@
+-- scripts/sql/ingest_runs.sql
+-- Historial de corridas del job de ingesta (reporte de instrumentación)
+
+create table if not exists public.ingest_runs (
+  id bigserial primary key,
+  job text not null,
+  started_at timestamptz not null,
+  finished_at timestamptz,
+  status text not null,
+  duration_s numeric(10,3),
+  statsapi_calls integer not null default 0,
+  supabase_calls integer not null default 0,
+  bytes_transferred bigint not null default 0,
+  retries integer not null default 0,
+  failures integer not null default 0,
+  report jsonb not null,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists idx_ingest_runs_job_started_at
+  on public.ingest_runs (job, started_at desc);
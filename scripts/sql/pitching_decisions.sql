@@ -0,0 +1,15 @@
+-- scripts/sql/pitching_decisions.sql
+-- Decisiones de pitcheo por juego (del boxscore): ganado, perdido, salvado,
+-- hold, salvado desperdiciado y apertura. get_pitching_stats las suma por
+-- pitcher; game_facts las usa para los splits de abridores/relevistas
+
+alter table public.pitching_stats add column if not exists w smallint not null default 0;
+alter table public.pitching_stats add column if not exists l smallint not null default 0;
+alter table public.pitching_stats add column if not exists sv smallint not null default 0;
+alter table public.pitching_stats add column if not exists hld smallint not null default 0;
+alter table public.pitching_stats add column if not exists bs smallint not null default 0;
+alter table public.pitching_stats add column if not exists gs smallint not null default 0;
+
+-- Lecturas por equipo (get_pitching_stats) y por juego (game_facts)
+create index if not exists idx_pitching_stats_team_id
+  on public.pitching_stats (team_id);
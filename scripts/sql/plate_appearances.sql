@@ -0,0 +1,73 @@
+-- scripts/sql/plate_appearances.sql
+-- Un registro por turno al bate (y opcionalmente por lanzamiento) desde el
+-- feed live de cada juego (utils/plays.py). Los splits de bateo y los duelos
+-- bateador-pitcher se agregan sobre estas tablas
+
+create table if not exists public.plate_appearances (
+  game_id bigint not null references public.games (id) on delete cascade,
+  season integer,
+  at_bat_index integer not null,
+  inning integer not null,
+  half_inning text not null,
+  batter_id bigint,
+  batter_team_id integer,
+  pitcher_id bigint,
+  pitcher_team_id integer,
+  bat_side text,
+  pitch_hand text,
+  balls integer,
+  strikes integer,
+  outs_before integer not null default 0,
+  outs_after integer not null default 0,
+  base_state smallint not null default 0,
+  risp boolean not null default false,
+  bat_score integer not null default 0,
+  fld_score integer not null default 0,
+  late_close boolean not null default false,
+  event text,
+  event_type text,
+  is_ab boolean not null default false,
+  is_hit boolean not null default false,
+  total_bases integer not null default 0,
+  is_walk boolean not null default false,
+  is_strikeout boolean not null default false,
+  is_hbp boolean not null default false,
+  is_sac_fly boolean not null default false,
+  rbi integer not null default 0,
+  runs_scored integer not null default 0,
+  updated_at timestamptz not null default now(),
+  constraint plate_appearances_pkey primary key (game_id, at_bat_index)
+);
+
+-- Splits: turnos de los bateadores de un equipo en la temporada
+create index if not exists idx_plate_appearances_season_team
+  on public.plate_appearances (season, batter_team_id);
+
+-- Duelos bateador-pitcher
+create index if not exists idx_plate_appearances_batter_pitcher
+  on public.plate_appearances (batter_id, pitcher_id);
+
+create index if not exists idx_plate_appearances_pitcher
+  on public.plate_appearances (pitcher_id);
+
+-- Lanzamientos (solo con update_daily.py --pitches / INGEST_PITCHES)
+create table if not exists public.pitches (
+  game_id bigint not null references public.games (id) on delete cascade,
+  season integer,
+  at_bat_index integer not null,
+  pitch_number integer not null,
+  batter_id bigint,
+  pitcher_id bigint,
+  pitch_type text,
+  call_code text,
+  is_strike boolean,
+  is_in_play boolean,
+  balls integer,
+  strikes integer,
+  start_speed real,
+  zone integer,
+  constraint pitches_pkey primary key (game_id, at_bat_index, pitch_number)
+);
+
+create index if not exists idx_pitches_pitcher
+  on public.pitches (pitcher_id);
@@ -0,0 +1,13 @@
+-- scripts/sql/wpa_model.sql
+-- WP/WPA de cada turno (perspectiva del home club) con la versión del
+-- modelo que lo calculó (utils.wpa.WP_MODEL_VERSION). Al cambiar el modelo,
+-- scripts/recompute_wpa.py regenera las temporadas en un solo paso
+
+alter table public.plate_appearances add column if not exists wp_before real;
+alter table public.plate_appearances add column if not exists wp_after real;
+alter table public.plate_appearances add column if not exists wpa real;
+alter table public.plate_appearances add column if not exists wp_model_version integer;
+
+-- Turnos pendientes de recalcular (versión distinta a la actual)
+create index if not exists idx_plate_appearances_season_wp_model
+  on public.plate_appearances (season, wp_model_version);
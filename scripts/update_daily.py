@@ -1,18 +1,40 @@
 # scripts/update_daily.py
+import argparse
+import asyncio
 import os
-import sys
 from datetime import datetime, timedelta
-from supabase import create_client
 import statsapi
-from utils.elo import BASE_ELO, HOME_ADVANTAGE, K_BY_PHASE, update_elo
+from utils import elo
+from utils.db import create_supabase_client, get_current_season, season_for_date
+from utils.schema import shape_game_record, shape_pitching_record, shape_plate_appearance_records
+from utils.async_ingest import BULK_CHUNK, DEFAULT_CONCURRENCY, AsyncIngestClient, dedupe
+from utils.data_version import bump, new_version, write_marker
+from utils.game_facts import build_game_facts
+from utils.plays import parse_plays
+from utils.wpa import play_wpa_records
+from utils.resilience import STATSAPI_HOST, DeadLetters, call_with_retry
+from utils.ingest_metrics import (
+    execute,
+    get_report,
+    load_previous_report,
+    persist_report,
+    record_statsapi_call,
+    start_run,
+)
 
 # Configuración
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
 LEAGUE_ID = 135  # LVBP
 
-# Inicializar Supabase
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Inicializar Supabase (None si faltan credenciales, p. ej. al importar desde benchmarks)
+supabase = create_supabase_client() if SUPABASE_URL and SUPABASE_KEY else None
+
+# Fallos a reintentar en la próxima corrida (se crea en main)
+dead_letters = None
+
+# Guardar también cada lanzamiento en pitches (--pitches); los turnos siempre se guardan
+ingest_pitches = os.environ.get("INGEST_PITCHES", "").lower() in ("1", "true", "yes")
 
 PHASE_BY_GAME_TYPE = {
     "R": "regular",
@@ -24,6 +46,24 @@ PHASE_BY_GAME_TYPE = {
 ELO_PHASES = ["regular", "wildcard_playin", "round_robin", "final"]
 
 
+def statsapi_get(endpoint, params):
+    """statsapi.get con reintentos y circuit breaker, instrumentado en el reporte de la corrida."""
+    report = get_report()
+    result = call_with_retry(
+        lambda: statsapi.get(endpoint, params),
+        STATSAPI_HOST,
+        on_retry=lambda e, attempt: report.record_retry("statsapi"),
+    )
+    return record_statsapi_call(result)
+
+
+def add_dead_letter(kind, key, error, context=None):
+    """Deja el juego/fecha pendiente para reintentarlo en la próxima corrida."""
+    get_report().record_dead_letter(kind, key)
+    if dead_letters is not None:
+        dead_letters.add(kind, key, error, context)
+
+
 def map_phase(game_type_code):
     """Mapea gameType de MLB a fase interna."""
     if not game_type_code:
@@ -56,57 +96,26 @@ def build_game_record(game, game_date, season):
 
 
 def upsert_game_record(supabase_client, game_record):
-    """Upsert de games con fallback seguro cuando faltan columnas nuevas."""
-    try:
-        supabase_client.table("games").upsert(game_record).execute()
-        return
-    except Exception as e:
-        message = str(e).lower()
-
-    has_missing_column_hint = any(
-        hint in message for hint in ["does not exist", "could not find the", "schema cache"]
-    )
-    touches_new_columns = any(
-        col in message for col in ["game_type_code", "phase", "series_description"]
-    )
-    if not (has_missing_column_hint and touches_new_columns):
-        raise
-
-    fallback_record = dict(game_record)
-    fallback_record.pop("game_type_code", None)
-    fallback_record.pop("phase", None)
-    fallback_record.pop("series_description", None)
-    supabase_client.table("games").upsert(fallback_record).execute()
-
-def get_current_season():
-    """Determina la temporada actual"""
-    now = datetime.now()
-    month = now.month
-    year = now.year
-
-    # La temporada 2025-2026 se guarda como 2025 (año de inicio)
-    if month >= 10:  # Oct-Dic: temporada en curso
-        return year
-    elif month <= 2:  # Ene-Feb: continuación de temporada anterior
-        return year - 1
-    else:
-        # Fuera de temporada (Mar-Sep): la última temporada fue año anterior
-        return year - 1
+    """Upsert de games con el payload adaptado a las columnas que existen."""
+    payload = shape_game_record(supabase_client, game_record)
+    execute(supabase_client.table("games").upsert(payload))
 
 def update_yesterdays_games():
     """Actualiza los juegos de ayer"""
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    season = get_current_season()
-    
-    print(f"📅 Actualizando juegos del {yesterday}")
+    update_games_for_date(yesterday, get_current_season())
+
+def update_games_for_date(day, season):
+    """Actualiza los juegos de una fecha y las stats de los finalizados"""
+    print(f"📅 Actualizando juegos del {day}")
     print(f"🏆 Temporada: {season}")
     
     try:
-        # Obtener juegos de ayer
-        schedule = statsapi.get("schedule", {
+        # Obtener juegos de la fecha
+        schedule = statsapi_get("schedule", {
             "sportId": 17,
-            "startDate": yesterday,
-            "endDate": yesterday,
+            "startDate": day,
+            "endDate": day,
             "leagueId": LEAGUE_ID
         })
         
@@ -127,114 +136,345 @@ def update_yesterdays_games():
                     
                     # Si el juego está finalizado, obtener estadísticas
                     if game.get("status",{}).get("detailedState") == "Final":
-                        stats_count = update_game_stats(game_id)
+                        # Etapa anidada: su tiempo también cuenta dentro de update_yesterdays_games
+                        with get_report().stage("update_game_stats"):
+                            stats_count = update_game_stats(game_id, game_record)
                         stats_updated += stats_count
                         
                 except Exception as e:
+                    get_report().record_failure(e, context=f"game {game_id}")
+                    add_dead_letter("schedule", day, e, context=f"game {game_id}")
                     print(f"⚠️ Error actualizando juego {game_id}: {str(e)[:100]}")
         
         print(f"✅ {games_updated} juegos actualizados")
         print(f"📊 {stats_updated} registros de estadísticas actualizados")
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        sys.exit(1)
+        # Sin schedule no hay juegos: la fecha se reintenta en la próxima corrida
+        get_report().record_failure(e, context=f"schedule {day}")
+        add_dead_letter("schedule", day, e)
+        print(f"❌ Error obteniendo juegos del {day}: {str(e)[:100]}")
+
+# Nota del boxscore -> columna de decisión: "(W, 3-1)", "(L, 0-2)", "(S, 4)", "(H, 2)", "(BS, 1)"
+DECISION_NOTES = {"W": "w", "L": "l", "S": "sv", "SV": "sv", "H": "hld", "HLD": "hld", "BS": "bs"}
+
+def parse_decisions(pit, is_starter):
+    """Decisiones del pitcher en el juego (w, l, sv, hld, bs, gs) desde su línea del boxscore."""
+    decisions = {
+        "w": pit.get("wins", 0),
+        "l": pit.get("losses", 0),
+        "sv": pit.get("saves", 0),
+        "hld": pit.get("holds", 0),
+        "bs": pit.get("blownSaves", 0),
+        "gs": pit.get("gamesStarted", int(is_starter)),
+    }
+    # Algunos boxscores solo traen la nota; una nota puede tener varias decisiones ("(BS, 2)(W, 1-0)")
+    for part in pit.get("note", "").replace(")", "(").split("("):
+        column = DECISION_NOTES.get(part.split(",")[0].strip().upper())
+        if column:
+            decisions[column] = max(decisions[column], 1)
+    return decisions
+
+def parse_boxscore(boxscore, game_id):
+    """Convierte el boxscore de statsapi en registros de players, batting_stats y pitching_stats."""
+    player_records = []
+    batting_records = []
+    pitching_records = []
+
+    for side in ["home", "away"]:
+        team_data = boxscore.get("teams", {}).get(side, {})
+        team_id = team_data.get("team", {}).get("id")
+        # El primer pitcher de la lista es el abridor (si falta gamesStarted)
+        starter_id = (team_data.get("pitchers") or [None])[0]
+        
+        for player_id_str, player_data in team_data.get("players", {}).items():
+            player_id = player_data.get("person", {}).get("id")
+            
+            player_records.append({
+                'id': player_id,
+                'full_name': player_data.get("person", {}).get("fullName"),
+                'team_id': team_id,
+                'jersey_number': player_data.get("jerseyNumber"),
+                'position': player_data.get("position", {}).get("abbreviation")
+            })
+            
+            # Estadísticas de bateo
+            if "batting" in player_data.get("stats", {}):
+                bat = player_data["stats"]["batting"]
+                batting_records.append({
+                    "game_id": game_id,
+                    "player_id": player_id,
+                    "team_id": team_id,
+                    "ab": bat.get("atBats", 0),
+                    "r": bat.get("runs", 0),
+                    "h": bat.get("hits", 0),
+                    "doubles": bat.get("doubles", 0),
+                    "triples": bat.get("triples", 0),
+                    "hr": bat.get("homeRuns", 0),
+                    "rbi": bat.get("rbi", 0),
+                    "bb": bat.get("baseOnBalls", 0),
+                    "so": bat.get("strikeOuts", 0),
+                    "sb": bat.get("stolenBases", 0),
+                    "cs": bat.get("caughtStealing", 0),
+                    "hbp": bat.get("hitByPitch", 0),
+                    "sf": bat.get("sacFlies", 0),
+                    "sh": bat.get("sacBunts", 0)
+                })
+            
+            # Estadísticas de pitcheo
+            if "pitching" in player_data.get("stats", {}):
+                pit = player_data["stats"]["pitching"]
+                ip_string = pit.get("inningsPitched", "0.0")
+                
+                # Convertir innings a decimal
+                ip_parts = ip_string.split('.')
+                ip_decimal = float(ip_parts[0]) + (float(ip_parts[1])/3 if len(ip_parts) > 1 else 0)
+                
+                pitching_records.append({
+                    "game_id": game_id,
+                    "player_id": player_id,
+                    "team_id": team_id,
+                    "ip_string": ip_string,
+                    "ip_decimal": round(ip_decimal, 2),
+                    "h": pit.get("hits", 0),
+                    "r": pit.get("runs", 0),
+                    "er": pit.get("earnedRuns", 0),
+                    "bb": pit.get("baseOnBalls", 0),
+                    "so": pit.get("strikeOuts", 0),
+                    "hr": pit.get("homeRuns", 0),
+                    "hbp": pit.get("hitBatsmen", 0),
+                    "wp": pit.get("wildPitches", 0),
+                    "bk": pit.get("balks", 0),
+                    **parse_decisions(pit, player_id == starter_id)
+                })
+
+    return player_records, batting_records, pitching_records
+
+def parse_linescore(linescore, game_id):
+    """Convierte el linescore de statsapi en registros de game_innings (uno por inning)."""
+    inning_records = []
+    for inning in linescore.get("innings", []):
+        home = inning.get("home", {})
+        away = inning.get("away", {})
+        inning_records.append({
+            "game_id": game_id,
+            "inning": inning.get("num"),
+            # La baja no jugada (home ganando o terreneada) cuenta como 0
+            "home_score": home.get("runs") or 0,
+            "away_score": away.get("runs") or 0,
+            "home_hits": home.get("hits") or 0,
+            "away_hits": away.get("hits") or 0,
+            "home_errors": home.get("errors") or 0,
+            "away_errors": away.get("errors") or 0,
+        })
+    return inning_records
+
+def parse_feed(feed, game_id, season=None):
+    """Todos los registros del juego desde su feed live (boxscore, linescore y jugadas)."""
+    live_data = feed.get("liveData", {})
+    player_records, batting_records, pitching_records = parse_boxscore(live_data.get("boxscore", {}), game_id)
+    inning_records = parse_linescore(live_data.get("linescore", {}), game_id)
+    season = season or feed.get("gameData", {}).get("game", {}).get("season")
+    pa_records, pitch_records = parse_plays(feed, game_id, season, with_pitches=ingest_pitches)
+    # WP/WPA del modelo actual (WP_MODEL_VERSION); scripts/recompute_wpa.py lo regenera
+    pa_records = play_wpa_records(pa_records)
+    return {
+        "players": player_records,
+        "batting_stats": batting_records,
+        "pitching_stats": pitching_records,
+        "game_innings": inning_records,
+        "plate_appearances": pa_records,
+        "pitches": pitch_records,
+    }
 
-def update_game_stats(game_id):
-    """Actualiza estadísticas de un juego específico"""
+def get_game_record(game_id):
+    """Registro del juego ya guardado en games (None si no existe)"""
+    response = execute(supabase.table('games').select('*').eq('id', game_id).limit(1))
+    return response.data[0] if response.data else None
+
+def update_game_stats(game_id, game_record=None):
+    """Actualiza estadísticas, innings, turnos y game_facts de un juego (un solo request: el feed)"""
     stats_count = 0
+    last_error = None
     
     try:
-        boxscore = statsapi.get("game_boxscore", {"gamePk": game_id})
+        if game_record is None:
+            game_record = get_game_record(game_id)
+        # El feed trae boxscore, linescore y jugadas: un request por juego
+        feed = statsapi_get("game", {"gamePk": game_id})
+        records = parse_feed(feed, game_id, (game_record or {}).get("season"))
+        player_records = records["players"]
+        batting_records = records["batting_stats"]
+        pitching_records = records["pitching_stats"]
+        inning_records = records["game_innings"]
         
-        # Procesar estadísticas de bateo y pitcheo
-        for side in ["home", "away"]:
-            team_data = boxscore.get("teams", {}).get(side, {})
-            team_id = team_data.get("team", {}).get("id")
-            
-            for player_id_str, player_data in team_data.get("players", {}).items():
-                player_id = player_data.get("person", {}).get("id")
-                
-                # Verificar/insertar jugador
-                player_record = {
-                    'id': player_id,
-                    'full_name': player_data.get("person", {}).get("fullName"),
-                    'team_id': team_id,
-                    'jersey_number': player_data.get("jerseyNumber"),
-                    'position': player_data.get("position", {}).get("abbreviation")
-                }
-                
+        # Verificar/insertar jugadores
+        for player_record in player_records:
+            try:
+                execute(supabase.table('players').upsert(player_record))
+            except Exception as e:
+                last_error = e
+                get_report().record_failure(e, context=f"player {player_record['id']}")
+        
+        pitching_payload = [shape_pitching_record(supabase, record) for record in pitching_records]
+        for table_name, table_records in [('batting_stats', batting_records), ('pitching_stats', pitching_payload)]:
+            for record in table_records:
                 try:
-                    supabase.table('players').upsert(player_record).execute()
-                except:
-                    pass  # El jugador ya existe
-                
-                # Estadísticas de bateo
-                if "batting" in player_data.get("stats", {}):
-                    bat = player_data["stats"]["batting"]
-                    batting_record = {
-                        "game_id": game_id,
-                        "player_id": player_id,
-                        "team_id": team_id,
-                        "ab": bat.get("atBats", 0),
-                        "r": bat.get("runs", 0),
-                        "h": bat.get("hits", 0),
-                        "doubles": bat.get("doubles", 0),
-                        "triples": bat.get("triples", 0),
-                        "hr": bat.get("homeRuns", 0),
-                        "rbi": bat.get("rbi", 0),
-                        "bb": bat.get("baseOnBalls", 0),
-                        "so": bat.get("strikeOuts", 0),
-                        "sb": bat.get("stolenBases", 0),
-                        "cs": bat.get("caughtStealing", 0),
-                        "hbp": bat.get("hitByPitch", 0),
-                        "sf": bat.get("sacFlies", 0),
-                        "sh": bat.get("sacBunts", 0)
-                    }
-                    
-                    try:
-                        supabase.table('batting_stats').upsert(batting_record).execute()
-                        stats_count += 1
-                    except:
-                        pass
-                
-                # Estadísticas de pitcheo
-                if "pitching" in player_data.get("stats", {}):
-                    pit = player_data["stats"]["pitching"]
-                    ip_string = pit.get("inningsPitched", "0.0")
-                    
-                    # Convertir innings a decimal
-                    ip_parts = ip_string.split('.')
-                    ip_decimal = float(ip_parts[0]) + (float(ip_parts[1])/3 if len(ip_parts) > 1 else 0)
-                    
-                    pitching_record = {
-                        "game_id": game_id,
-                        "player_id": player_id,
-                        "team_id": team_id,
-                        "ip_string": ip_string,
-                        "ip_decimal": round(ip_decimal, 2),
-                        "h": pit.get("hits", 0),
-                        "r": pit.get("runs", 0),
-                        "er": pit.get("earnedRuns", 0),
-                        "bb": pit.get("baseOnBalls", 0),
-                        "so": pit.get("strikeOuts", 0),
-                        "hr": pit.get("homeRuns", 0),
-                        "hbp": pit.get("hitBatsmen", 0),
-                        "wp": pit.get("wildPitches", 0),
-                        "bk": pit.get("balks", 0)
-                    }
-                    
-                    try:
-                        supabase.table('pitching_stats').upsert(pitching_record).execute()
-                        stats_count += 1
-                    except:
-                        pass
+                    execute(supabase.table(table_name).upsert(record))
+                    stats_count += 1
+                except Exception as e:
+                    last_error = e
+                    get_report().record_failure(e, context=f"{table_name} {game_id}/{record['player_id']}")
+
+        # Hechos derivados del juego (una fila por equipo)
+        records["game_facts"] = build_game_facts(game_record, inning_records, pitching_records) if game_record else []
+
+        records["plate_appearances"] = shape_plate_appearance_records(supabase, records["plate_appearances"])
+
+        # Innings, turnos, lanzamientos y hechos: un upsert masivo por tabla
+        for table_name in ('game_innings', 'plate_appearances', 'pitches', 'game_facts'):
+            rows = records[table_name]
+            for i in range(0, len(rows), BULK_CHUNK):
+                try:
+                    execute(supabase.table(table_name).upsert(rows[i:i + BULK_CHUNK]))
+                except Exception as e:
+                    last_error = e
+                    get_report().record_failure(e, context=f"{table_name} {game_id}")
                     
     except Exception as e:
+        last_error = e
+        get_report().record_failure(e, context=f"boxscore {game_id}")
         print(f"⚠️ Error actualizando stats del juego {game_id}: {str(e)[:100]}")
+
+    # Los reintentos ya se agotaron: el juego completo queda para la próxima corrida
+    if last_error is not None:
+        add_dead_letter("game_stats", game_id, last_error)
     
     return stats_count
 
+def retry_dead_letters():
+    """Reintenta los juegos y fechas que fallaron en corridas anteriores."""
+    pending = dead_letters.pending() if dead_letters is not None else []
+    if not pending:
+        return
+
+    print(f"📮 Reintentando {len(pending)} pendientes de corridas anteriores")
+    report = get_report()
+    for item in pending:
+        before = len(report.dead_letters)
+        if item["kind"] == "schedule":
+            update_games_for_date(item["key"], season_for_date(item["key"]))
+        elif item["kind"] == "game_stats":
+            update_game_stats(int(item["key"]))
+        else:
+            continue
+        # Sin dead letters nuevos en el reintento: resuelto
+        if len(report.dead_letters) == before:
+            dead_letters.resolve(item["kind"], item["key"])
+
+async def ingest_games_async(client, dates):
+    """Ingesta asíncrona de los juegos de varias fechas; retorna (juegos, registros de stats)."""
+    report = get_report()
+
+    # 1. Schedules de todas las fechas en paralelo
+    schedules = await asyncio.gather(*(
+        client.statsapi_get("schedule", {
+            "sportId": 17,
+            "startDate": day,
+            "endDate": day,
+            "leagueId": LEAGUE_ID
+        })
+        for day in dates
+    ), return_exceptions=True)
+
+    game_records = []
+    final_ids = []
+    for day, schedule in zip(dates, schedules):
+        if isinstance(schedule, Exception):
+            report.record_failure(schedule, context=f"schedule {day}")
+            add_dead_letter("schedule", day, schedule)
+            print(f"⚠️ Error obteniendo schedule del {day}: {str(schedule)[:100]}")
+            continue
+        for date in schedule.get("dates", []):
+            for game in date.get("games", []):
+                game_records.append(build_game_record(game, date.get("date"), season_for_date(date.get("date"))))
+                if game.get("status", {}).get("detailedState") == "Final":
+                    final_ids.append(game.get("gamePk"))
+
+    # 2. Feeds de los juegos finalizados en paralelo; cada feed se parsea al
+    #    llegar para no tener todos en memoria a la vez
+    final_ids = list(dict.fromkeys(final_ids))
+    records_by_id = {record["id"]: record for record in game_records}
+
+    async def fetch_records(game_id):
+        feed = await client.statsapi_get("game", {"gamePk": game_id})
+        return parse_feed(feed, game_id, records_by_id[game_id].get("season"))
+
+    parsed = await asyncio.gather(*(fetch_records(game_id) for game_id in final_ids), return_exceptions=True)
+
+    tables = {name: [] for name in (
+        "players", "batting_stats", "pitching_stats", "game_innings", "plate_appearances", "pitches", "game_facts"
+    )}
+    parsed_ids = []
+    for game_id, records in zip(final_ids, parsed):
+        if isinstance(records, Exception):
+            report.record_failure(records, context=f"feed {game_id}")
+            add_dead_letter("game_stats", game_id, records)
+            print(f"⚠️ Error obteniendo el feed del juego {game_id}: {str(records)[:100]}")
+            continue
+        parsed_ids.append(game_id)
+        records["game_facts"] = build_game_facts(
+            records_by_id[game_id], records["game_innings"], records["pitching_stats"]
+        )
+        for name, rows in records.items():
+            tables[name] += rows
+
+    # 3. Upserts masivos: games y players antes que las stats (llaves foráneas)
+    async def bulk_upsert(table, rows, key_columns, kind, keys):
+        try:
+            return await client.upsert(table, dedupe(rows, key_columns))
+        except Exception as e:
+            report.record_failure(e, context=f"bulk {table}")
+            print(f"⚠️ Error escribiendo {table}: {str(e)[:100]}")
+            for key in keys:
+                add_dead_letter(kind, key, e, context=f"bulk {table}")
+            return 0
+
+    games_written = await bulk_upsert(
+        "games", [shape_game_record(supabase, r) for r in game_records], ["id"], "schedule", dates
+    )
+    await bulk_upsert("players", tables["players"], ["id"], "game_stats", parsed_ids)
+    batting_written, pitching_written, *_ = await asyncio.gather(
+        bulk_upsert("batting_stats", tables["batting_stats"], ["game_id", "player_id"], "game_stats", parsed_ids),
+        bulk_upsert("pitching_stats", [shape_pitching_record(supabase, r) for r in tables["pitching_stats"]],
+                    ["game_id", "player_id"], "game_stats", parsed_ids),
+        bulk_upsert("game_innings", tables["game_innings"], ["game_id", "inning"], "game_stats", parsed_ids),
+        bulk_upsert("plate_appearances",
+                    shape_plate_appearance_records(supabase, tables["plate_appearances"]),
+                    ["game_id", "at_bat_index"], "game_stats", parsed_ids),
+        bulk_upsert("pitches", tables["pitches"], ["game_id", "at_bat_index", "pitch_number"],
+                    "game_stats", parsed_ids),
+        bulk_upsert("game_facts", tables["game_facts"], ["game_id", "team_id"], "game_stats", parsed_ids),
+    )
+    return games_written, batting_written + pitching_written
+
+def catch_up_games(start_date, end_date, concurrency=DEFAULT_CONCURRENCY, transport=None):
+    """Ingesta de un rango de fechas (p. ej. tras una caída) con requests solapadas."""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    dates = [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end - start).days + 1)]
+
+    print(f"📅 Catch-up del {start_date} al {end_date} ({len(dates)} días, concurrencia {concurrency})")
+
+    async def run():
+        async with AsyncIngestClient(SUPABASE_URL, SUPABASE_KEY, concurrency, transport=transport) as client:
+            return await ingest_games_async(client, dates)
+
+    games_updated, stats_updated = asyncio.run(run())
+    print(f"✅ {games_updated} juegos actualizados")
+    print(f"📊 {stats_updated} registros de estadísticas actualizados")
+    return games_updated, stats_updated
+
 def update_todays_games():
     """Actualiza los juegos de hoy (para el schedule)"""
     today = datetime.now().strftime('%Y-%m-%d')
@@ -244,7 +484,7 @@ def update_todays_games():
     
     try:
         # Obtener juegos de hoy
-        schedule = statsapi.get("schedule", {
+        schedule = statsapi_get("schedule", {
             "sportId": 17,
             "startDate": today,
             "endDate": today,
@@ -264,11 +504,13 @@ def update_todays_games():
                     upsert_game_record(supabase, game_record)
                     games_scheduled += 1
                 except Exception as e:
+                    get_report().record_failure(e, context=f"game {game_id}")
                     print(f"⚠️ Error con juego {game_id}: {str(e)[:50]}")
         
         print(f"📋 {games_scheduled} juegos en el schedule de hoy")
         
     except Exception as e:
+        get_report().record_failure(e)
         print(f"⚠️ Error actualizando schedule: {str(e)[:100]}")
 
 def update_standings():
@@ -278,21 +520,19 @@ def update_standings():
     
     try:
         # Obtener todos los juegos finalizados de la temporada
-        games = supabase.table('games') \
+        games = execute(supabase.table('games') \
             .select('*') \
             .eq('season', season) \
-            .eq('status', 'Final') \
-            .execute()
+            .eq('status', 'Final'))
         
         if not games.data:
             print("⚠️ No hay juegos finalizados para calcular standings")
             return
         
         # Obtener equipos de LVBP
-        teams = supabase.table('teams') \
+        teams = execute(supabase.table('teams') \
             .select('*') \
-            .eq('league_id', LEAGUE_ID) \
-            .execute()
+            .eq('league_id', LEAGUE_ID))
         
         standings_data = []
         
@@ -346,161 +586,206 @@ def update_standings():
             
             # Upsert standings
             for team_standing in standings_data:
-                supabase.table('standings').upsert(team_standing).execute()
+                execute(supabase.table('standings').upsert(team_standing))
             
             print(f"✅ Standings actualizados para {len(standings_data)} equipos")
         
     except Exception as e:
+        get_report().record_failure(e)
         print(f"❌ Error actualizando standings: {str(e)}")
 
-def get_phase_games_for_elo(season, phase):
-    """Obtiene juegos finalizados por fase para procesar ELO."""
-    base_query = supabase.table('games') \
-        .select('id, game_datetime, game_date, home_team_id, away_team_id, home_score, away_score') \
-        .eq('season', season) \
-        .eq('status', 'Final')
-
-    try:
-        response = base_query.eq('phase', phase).order('game_datetime', desc=False).execute()
-        return response.data or []
-    except Exception:
-        # Compatibilidad retro cuando la columna phase aún no existe.
-        response = base_query.eq('game_type', phase).order('game_datetime', desc=False).execute()
-        return response.data or []
-
-
 def update_elo_ratings(season):
     """Actualiza ELO por fase de forma idempotente."""
     print(f"📈 Actualizando ELO por fase para temporada {season}")
 
     for phase in ELO_PHASES:
-        processed_count = 0
-        skipped_count = 0
-
         try:
-            games = get_phase_games_for_elo(season, phase)
-            if not games:
-                print(f"📌 {phase}: processed_count=0 skipped_count=0")
-                continue
-
-            log_response = supabase.table('elo_game_log') \
-                .select('game_id') \
-                .eq('season', season) \
-                .eq('phase', phase) \
-                .execute()
-            processed_ids = {row['game_id'] for row in (log_response.data or [])}
-
-            ratings_response = supabase.table('elo_ratings') \
-                .select('*') \
-                .eq('season', season) \
-                .eq('phase', phase) \
-                .execute()
-            ratings_map = {row['team_id']: row for row in (ratings_response.data or [])}
-
-            for game in games:
-                game_id = game.get('id')
-                if game_id in processed_ids:
-                    skipped_count += 1
-                    continue
-
-                home_team_id = game.get('home_team_id')
-                away_team_id = game.get('away_team_id')
-                home_score = game.get('home_score')
-                away_score = game.get('away_score')
-                game_datetime = game.get('game_datetime') or game.get('game_date')
-
-                if None in [home_team_id, away_team_id, home_score, away_score]:
-                    skipped_count += 1
-                    continue
-
-                home_row = ratings_map.get(home_team_id, {})
-                away_row = ratings_map.get(away_team_id, {})
-                home_elo = float(home_row.get('elo', BASE_ELO))
-                away_elo = float(away_row.get('elo', BASE_ELO))
-                home_games_played = int(home_row.get('games_played', 0))
-                away_games_played = int(away_row.get('games_played', 0))
-
-                home_win = home_score > away_score
-                k_value = K_BY_PHASE.get(phase, K_BY_PHASE['unknown'])
-                new_home_elo, new_away_elo = update_elo(
-                    r_home=home_elo,
-                    r_away=away_elo,
-                    home_win=home_win,
-                    k=k_value,
-                    home_advantage=HOME_ADVANTAGE
-                )
-
-                now_iso = datetime.now().isoformat()
-                home_payload = {
-                    'season': season,
-                    'phase': phase,
-                    'team_id': home_team_id,
-                    'elo': round(new_home_elo, 2),
-                    'games_played': home_games_played + 1,
-                    'last_game_id': game_id,
-                    'game_datetime': game_datetime,
-                    'updated_at': now_iso
-                }
-                away_payload = {
-                    'season': season,
-                    'phase': phase,
-                    'team_id': away_team_id,
-                    'elo': round(new_away_elo, 2),
-                    'games_played': away_games_played + 1,
-                    'last_game_id': game_id,
-                    'game_datetime': game_datetime,
-                    'updated_at': now_iso
-                }
-
-                supabase.table('elo_ratings').upsert(home_payload).execute()
-                supabase.table('elo_ratings').upsert(away_payload).execute()
-                supabase.table('elo_game_log').insert({
-                    'season': season,
-                    'phase': phase,
-                    'game_id': game_id,
-                    'game_datetime': game_datetime,
-                    'home_team_id': home_team_id,
-                    'away_team_id': away_team_id,
-                    'home_score': home_score,
-                    'away_score': away_score,
-                    'home_elo_before': round(home_elo, 2),
-                    'away_elo_before': round(away_elo, 2),
-                    'home_elo_after': round(new_home_elo, 2),
-                    'away_elo_after': round(new_away_elo, 2),
-                    'k_value': k_value,
-                    'home_advantage': HOME_ADVANTAGE,
-                    'updated_at': now_iso
-                }).execute()
-
-                ratings_map[home_team_id] = home_payload
-                ratings_map[away_team_id] = away_payload
-                processed_ids.add(game_id)
-                processed_count += 1
-
+            _, processed_count, skipped_count = elo.process_phase(supabase, season, phase, execute=execute)
             print(f"📌 {phase}: processed_count={processed_count} skipped_count={skipped_count}")
         except Exception as e:
+            get_report().record_failure(e, context=f"elo {phase}")
             print(f"⚠️ Error actualizando ELO en fase {phase}: {str(e)}")
 
 
+def publish_data_version(season):
+    """Incrementa la versión de datos de la temporada: la app invalida sus cachés."""
+    try:
+        version = bump(supabase, [season], execute=execute)
+        print(f"🔖 Versión de datos {season}: {version}")
+        return version
+    except Exception as e:
+        get_report().record_failure(e, context="data_version")
+        print(f"⚠️ Error publicando versión de datos: {str(e)[:100]}")
+        return None
+
+
+def publish_ai_insights(season, version=None, snapshot_dir=None):
+    """Genera el insight de IA de la versión publicada: la app lo sirve sin esperar a OpenAI."""
+    if not os.environ.get("OPENAI_API_KEY"):
+        print("ℹ️ Sin OPENAI_API_KEY: se omiten los insights de IA")
+        return
+    # Los loaders y el SDK de OpenAI solo se cargan si hay que generar
+    from utils.ai_insights import generate_insight_snapshot
+
+    try:
+        status, row = generate_insight_snapshot(supabase, season, version, snapshot_dir, execute=execute)
+        if status == "generated":
+            print(f"🧠 Insights de IA generados (prompt {row['prompt_hash'][:12]}, ~{row['prompt_tokens']} tokens)")
+        elif status == "existing":
+            print(f"🧠 Insights de IA sin cambios (prompt {row['prompt_hash'][:12]})")
+        else:
+            print("ℹ️ Sin datos para generar insights de IA")
+    except Exception as e:
+        get_report().record_failure(e, context="ai_insights")
+        print(f"⚠️ Error generando insights de IA: {str(e)[:100]}")
+
+
+def export_snapshots(season, snapshot_dir, version=None):
+    """Exporta snapshots Parquet de la temporada para el modo de lectura local de la app."""
+    # pandas/pyarrow solo se cargan si hay que exportar
+    from utils.snapshots import export_season
+
+    print(f"🗂️ Exportando snapshots Parquet de temporada {season} en {snapshot_dir}")
+
+    try:
+        counts = export_season(supabase, season, snapshot_dir, execute=execute)
+        # El marcador va al final: la app solo cambia de versión con los archivos completos
+        write_marker({season: version or new_version()}, snapshot_dir)
+        print("✅ Snapshots: " + ", ".join(f"{table}={rows}" for table, rows in counts.items()))
+    except Exception as e:
+        get_report().record_failure(e, context="snapshots")
+        print(f"⚠️ Error exportando snapshots: {str(e)[:100]}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Actualización diaria LVBP")
+    parser.add_argument(
+        "--report-path",
+        type=str,
+        default=os.environ.get("INGEST_REPORT_PATH"),
+        help="Ruta donde escribir el reporte JSON de la corrida",
+    )
+    parser.add_argument(
+        "--persist-run",
+        action="store_true",
+        default=os.environ.get("INGEST_PERSIST_RUNS", "").lower() in ("1", "true", "yes"),
+        help="Guardar el reporte en la tabla ingest_runs",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=str,
+        default=os.environ.get("SNAPSHOT_DIR"),
+        help="Directorio donde exportar los snapshots Parquet (se omite si no se indica)",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        default=None,
+        help="Catch-up: primera fecha a ingerir (YYYY-MM-DD); reemplaza la ingesta de ayer",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        default=None,
+        help="Catch-up: última fecha a ingerir (por defecto ayer)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Requests simultáneas en el catch-up asíncrono",
+    )
+    parser.add_argument(
+        "--pitches",
+        action="store_true",
+        default=ingest_pitches,
+        help="Guardar también cada lanzamiento en la tabla pitches (INGEST_PITCHES)",
+    )
+    return parser.parse_args()
+
+
+def emit_report(report, args):
+    """Imprime el reporte JSON, lo compara con la corrida anterior y lo persiste."""
+    report.finish()
+    if args.persist_run:
+        report.compare_with(load_previous_report(supabase, report.job))
+
+    print("📈 Reporte de la corrida:")
+    print(report.to_json())
+
+    for regression in report.regressions:
+        print(
+            f"⚠️ Regresión en {regression['stage']}: "
+            f"{regression['previous_s']:.2f}s → {regression['current_s']:.2f}s (x{regression['ratio']})"
+        )
+
+    if args.report_path:
+        report.write(args.report_path)
+
+    summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+    if summary_path:
+        with open(summary_path, "a", encoding="utf-8") as f:
+            f.write(report.to_markdown() + "\n")
+
+    if args.persist_run:
+        persist_report(supabase, report)
+
+
 def main():
+    global dead_letters, ingest_pitches
+    args = parse_args()
+    ingest_pitches = args.pitches
+    report = start_run("update_daily")
+    dead_letters = DeadLetters(supabase, report.job, execute=execute)
+
     print("🚀 Iniciando actualización diaria LVBP")
     print(f"📅 Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print(f"🏆 Temporada: {get_current_season()}")
     print("="*50)
     
-    # 1. Actualizar juegos de ayer
-    update_yesterdays_games()
-    
-    # 2. Actualizar schedule de hoy
-    update_todays_games()
-    
-    # 3. Actualizar standings
-    update_standings()
-
-    # 4. Actualizar ELO por fase
-    update_elo_ratings(get_current_season())
+    try:
+        # 0. Reintentar lo que falló en corridas anteriores
+        with report.stage("retry_dead_letters"):
+            retry_dead_letters()
+
+        # 1. Actualizar juegos de ayer (incluye update_game_stats por juego),
+        #    o un rango de fechas con el camino asíncrono
+        if args.start_date:
+            end_date = args.end_date or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            with report.stage("catch_up_games"):
+                catch_up_games(args.start_date, end_date, args.concurrency)
+        else:
+            with report.stage("update_yesterdays_games"):
+                update_yesterdays_games()
+        
+        # 2. Actualizar schedule de hoy
+        with report.stage("update_todays_games"):
+            update_todays_games()
+        
+        # 3. Actualizar standings
+        with report.stage("update_standings"):
+            update_standings()
+
+        # 4. Actualizar ELO por fase
+        with report.stage("update_elo_ratings"):
+            update_elo_ratings(get_current_season())
+
+        # 5. Publicar versión de datos (invalida los cachés de la app)
+        with report.stage("publish_data_version"):
+            version = publish_data_version(get_current_season())
+
+        # 6. Insights de IA de la nueva versión (la app los sirve sin llamar a OpenAI)
+        with report.stage("publish_ai_insights"):
+            publish_ai_insights(get_current_season(), version, args.snapshot_dir)
+
+        # 7. Snapshots Parquet para lectura local
+        if args.snapshot_dir:
+            with report.stage("export_snapshots"):
+                export_snapshots(get_current_season(), args.snapshot_dir, version)
+    finally:
+        print("="*50)
+        emit_report(report, args)
     
-    print("="*50)
     print("✅ Actualización completada exitosamente")
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+# scripts/warm_cache.py
+"""
+Precarga los datos de la temporada actual en los cachés de la app.
+
+Con DATA_SOURCE=parquet/arrow deja listos los archivos Arrow compartidos por
+todos los procesos del host, y con CACHE_BACKEND=disk (mismo CACHE_DIR que la
+app) también los resultados de los loaders; úsalo después de la ingesta nocturna.
+
+Uso:
+  python scripts/warm_cache.py
+  python scripts/warm_cache.py --season 2025
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import cache, snapshots
+from utils.warmup import MAX_WORKERS, warm_up
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precarga de cachés de la app")
+    parser.add_argument("--season", type=int, default=None, help="Temporada (por defecto la actual)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Loaders en paralelo")
+    return parser.parse_args()
+
+
+def warn_in_process_backend():
+    """Avisa si la precarga no va a llegar a la app (caché en la memoria de este proceso)"""
+    if cache.get_backend().name == "disk":
+        return
+    # Bajo `streamlit run` el backend por defecto es st.cache_data, en la memoria del servidor
+    print("⚠️ El caché de los loaders vive en la memoria de cada proceso: la app no verá estos "
+          "resultados. Usa CACHE_BACKEND=disk aquí y en la app (mismo CACHE_DIR).")
+    if snapshots.use_snapshots():
+        print("   Solo se comparten los archivos Arrow de DATA_SOURCE=" + snapshots.data_source())
+
+
+def main():
+    args = parse_args()
+    warn_in_process_backend()
+    start = time.perf_counter()
+    results = warm_up(args.season, max_workers=args.workers)
+
+    for name, result in sorted(results.items()):
+        if isinstance(result, str):
+            print(f"⚠️ {name}: {result}")
+        else:
+            print(f"✅ {name}: {result:.2f}s")
+    print(f"🔥 Precarga completada en {time.perf_counter() - start:.2f}s")
+
+    if any(isinstance(result, str) for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
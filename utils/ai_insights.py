@@ -2,13 +2,260 @@
 """
 Módulo de Insights con IA para RepubliCaraquistApp.
 Genera datos curiosos y análisis usando OpenAI API.
+
+compile_insights_prompt() arma un prompt compacto y determinístico (secciones
+CSV, filas en orden de relevancia, presupuesto de tokens) cuyo hash sirve de
+llave: mismos números, mismo prompt y mismo hash.
+
+La ingesta nocturna genera el insight de cada versión de datos
+(`generate_insight_snapshot`) y lo guarda en la tabla ai_insights (y en disco
+junto a los snapshots Parquet) con el hash del prompt. La app arma el mismo
+prompt con los mismos loaders y, si hay un snapshot con ese hash, lo muestra
+al instante; solo sin snapshot llama a OpenAI en vivo.
+
+OPENAI_BASE_URL apunta el cliente a otro endpoint compatible (p. ej.
+benchmarks/fake_openai.py para probar sin la API real).
 """
 
+import csv
+import hashlib
+import io
+import json
+import math
 import os
-import streamlit as st
-from openai import OpenAI
+import sys
+from datetime import datetime, timezone
+
 import pandas as pd
 
+from utils import cache
+
+LEONES_ID = 695
+
+MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+MAX_TOKENS = 800
+TEMPERATURE = 0.7
+SYSTEM_PROMPT = "Eres un analista deportivo experto en béisbol venezolano, especializado en la LVBP y los Leones del Caracas."
+
+INSIGHTS_TABLE = "ai_insights"
+
+
+# Presupuesto del prompt completo (instrucciones + datos), en tokens estimados
+PROMPT_TOKEN_BUDGET = 550
+# Caracteres por token aproximados (español y CSV). Sin tokenizador: la
+# ingesta y la app recortan igual en cualquier entorno y el hash coincide
+CHARS_PER_TOKEN = 3.5
+
+PROMPT_HEADER = """Analiza como experto en béisbol venezolano (LVBP) a los Leones del Caracas.
+
+Regla fija: los Leones juegan de locales en el Estadio Monumental Simón Bolívar, en Caracas, Venezuela (el Monumental); nunca menciones otro estadio como su sede.
+
+Genera entre 3 y 4 datos curiosos, insights estadísticos o análisis basados en los datos de abajo:
+- Tono cercano, apasionado y profesional; conciso pero informativo
+- Comparaciones históricas o contexto cuando sea relevante
+- Tendencias positivas y áreas claras de mejora; jugadores destacados por nombre
+- Emojis de béisbol ocasionalmente ⚾🦁; coherencia geográfica e histórica con la LVBP
+
+Datos actuales (secciones CSV, filas en orden de relevancia):"""
+
+PROMPT_FOOTER = """Genera los insights en formato markdown con bullet points.
+Cada insight debe ser breve (1-2 oraciones) pero interesante."""
+
+# Estadísticas avanzadas de Leones en orden de relevancia: (llave, etiqueta)
+ADVANCED_FACTS = [
+    ("one_run", "por 1 carrera"),
+    ("extra_inning", "extra innings"),
+    ("shutouts", "blanqueos propinados"),
+    ("total_games", "juegos"),
+    ("oct", "octubre"),
+    ("nov", "noviembre"),
+    ("dec", "diciembre"),
+]
+# Ya están en la sección de standings; solo se agregan si esa no está
+STANDINGS_FACTS = [
+    ("record", "récord"),
+    ("streak", "racha"),
+    ("home_record", "casa"),
+    ("away_record", "visitante"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokens aproximados del texto"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _missing(value) -> bool:
+    try:
+        return value is None or bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _fmt(value, spec=""):
+    """Valor con formato determinístico ('' si falta)"""
+    if _missing(value):
+        return ""
+    if spec.endswith("d"):
+        return format(int(value), spec)
+    if spec.endswith("f"):
+        return format(float(value), spec)
+    return str(value)
+
+
+def _records(df: pd.DataFrame, columns) -> list:
+    """Filas como dicts con solo `columns` (las que falten quedan en None)"""
+    values = [df[c].tolist() if c in df.columns else [None] * len(df) for c in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _ranked(df: pd.DataFrame, column, ascending, columns, limit):
+    """
+    Primeras `limit` filas por `column` (faltantes al final) con desempate por
+    nombre. Las tablas son de pocas filas: se ordenan en Python, sin pandas.
+    """
+    sign = 1 if ascending else -1
+    records = _records(df, columns)
+    records.sort(key=lambda r: (
+        _missing(r[column]),
+        0 if _missing(r[column]) else sign * r[column],
+        str(r['player_name']),
+    ))
+    return records[:limit]
+
+
+# Cada sección: (título, columnas, filas en orden de relevancia, mínimo de filas)
+
+def _standings_section(standings_df):
+    columns = ['team_name', 'wins', 'losses', 'pct', 'streak', 'run_diff', 'runs_for', 'runs_against',
+               'home_record', 'away_record', 'last_10']
+    for position, leo in enumerate(_records(standings_df, columns), start=1):
+        if 'leones' not in str(leo['team_name']).lower():
+            continue
+        row = [
+            position,
+            f"{_fmt(leo['wins'], 'd')}-{_fmt(leo['losses'], 'd')}",
+            _fmt(leo['pct'], '.3f'),
+            _fmt(leo['streak']),
+            _fmt(leo['run_diff'], '+d'),
+            _fmt(leo['runs_for'], 'd'),
+            _fmt(leo['runs_against'], 'd'),
+            _fmt(leo['home_record']),
+            _fmt(leo['away_record']),
+            _fmt(leo['last_10']),
+        ]
+        columns = ["posición", "récord", "pct", "racha", "dif", "rf", "ra", "casa", "visitante", "últimos 10"]
+        return "Standings Leones", columns, [row], 1
+    return None
+
+
+def _games_section(recent_games, limit=5):
+    columns = ['game_date', 'id', 'home_team_id', 'home_score', 'away_score', 'home_team', 'away_team']
+    games = _records(recent_games, columns)
+    # Más reciente primero (orden estable para dobles jornadas sin id)
+    games.sort(key=lambda g: (_fmt(g['game_date']), 0 if _missing(g['id']) else g['id']), reverse=True)
+
+    rows = []
+    for game in games[:limit]:
+        is_home = game['home_team_id'] == LEONES_ID
+        leones_score = game['home_score'] if is_home else game['away_score']
+        opp_score = game['away_score'] if is_home else game['home_score']
+        rival_team = game['away_team'] if is_home else game['home_team']
+        rival = rival_team.get('name', 'Rival') if isinstance(rival_team, dict) else "Rival"
+        rows.append([
+            _fmt(game['game_date']),
+            "G" if leones_score > opp_score else "P",
+            rival,
+            f"{_fmt(leones_score, 'd')}-{_fmt(opp_score, 'd')}",
+            "C" if is_home else "V",
+        ])
+    columns = ["fecha", "resultado", "rival", "marcador", "sede"]
+    return "Últimos juegos (G=ganado, P=perdido; sede C=casa, V=visitante)", columns, rows, 2
+
+
+def _batting_section(batting_stats, limit=5):
+    rows = [
+        [b['player_name'], _fmt(b['avg'], '.3f'), _fmt(b['ops'], '.3f'), _fmt(b['hr'], 'd'), _fmt(b['rbi'], 'd')]
+        for b in _ranked(batting_stats, 'ops', False, ['player_name', 'avg', 'ops', 'hr', 'rbi'], limit)
+    ]
+    return "Líderes de bateo (por OPS)", ["jugador", "avg", "ops", "hr", "rbi"], rows, 2
+
+
+def _pitching_section(pitching_stats, limit=5):
+    rows = [
+        [p['player_name'], _fmt(p['era'], '.2f'), _fmt(p['whip'], '.2f'), _fmt(p['so'], 'd'), _fmt(p['ip'], '.1f')]
+        for p in _ranked(pitching_stats, 'era', True, ['player_name', 'era', 'whip', 'so', 'ip'], limit)
+    ]
+    return "Líderes de pitcheo (por ERA)", ["jugador", "era", "whip", "k", "ip"], rows, 2
+
+
+def _advanced_section(advanced_stats, with_standings):
+    facts = ADVANCED_FACTS if with_standings else STANDINGS_FACTS + ADVANCED_FACTS
+    rows = [[label, _fmt(advanced_stats[key])] for key, label in facts if key in advanced_stats]
+    return "Estadísticas avanzadas Leones", ["métrica", "valor"], rows, 3
+
+
+def _render(sections) -> str:
+    parts = [PROMPT_HEADER]
+    for title, columns, rows, _ in sections:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+        parts.append(f"## {title}\n{out.getvalue().rstrip()}")
+    parts.append(PROMPT_FOOTER)
+    return "\n\n".join(parts)
+
+
+def compile_insights_prompt(
+    standings_df: pd.DataFrame = None,
+    recent_games: pd.DataFrame = None,
+    batting_stats: pd.DataFrame = None,
+    pitching_stats: pd.DataFrame = None,
+    advanced_stats: dict = None,
+    budget: int = PROMPT_TOKEN_BUDGET
+) -> dict:
+    """
+    Compila los datos en un prompt compacto y determinístico: secciones CSV
+    con las filas en orden de relevancia y valores con formato fijo. Si pasa
+    del presupuesto se descartan las últimas filas de las secciones menos
+    prioritarias (hasta su mínimo).
+
+    Returns:
+        dict: prompt, tokens (estimados), hash (prompt_hash, llave de caché y
+              de snapshots) y filas por sección
+    """
+    sections = []
+    if standings_df is not None and not standings_df.empty:
+        sections.append(_standings_section(standings_df))
+    if recent_games is not None and not recent_games.empty:
+        sections.append(_games_section(recent_games))
+    if batting_stats is not None and not batting_stats.empty:
+        sections.append(_batting_section(batting_stats))
+    if pitching_stats is not None and not pitching_stats.empty:
+        sections.append(_pitching_section(pitching_stats))
+    # Las secciones vienen en orden de prioridad; se quitan las vacías
+    sections = [s for s in sections if s is not None and s[2]]
+    if advanced_stats:
+        with_standings = bool(sections) and sections[0][0] == "Standings Leones"
+        sections.append(_advanced_section(advanced_stats, with_standings))
+        sections = [s for s in sections if s[2]]
+
+    prompt = _render(sections)
+    while estimate_tokens(prompt) > budget:
+        trimmable = [s for s in sections if len(s[2]) > s[3]]
+        if not trimmable:
+            break
+        trimmable[-1][2].pop()
+        prompt = _render(sections)
+
+    return {
+        "prompt": prompt,
+        "tokens": estimate_tokens(prompt),
+        "hash": prompt_hash(prompt),
+        "sections": {title: len(rows) for title, _, rows, _ in sections},
+    }
+
 
 def build_insights_prompt(
     standings_df: pd.DataFrame = None,
@@ -17,205 +264,267 @@ def build_insights_prompt(
     pitching_stats: pd.DataFrame = None,
     advanced_stats: dict = None
 ) -> str:
-    """
-    Construye un prompt estructurado para generar insights basados en datos reales.
+    """Prompt para OpenAI (ver compile_insights_prompt)"""
+    return compile_insights_prompt(
+        standings_df=standings_df,
+        recent_games=recent_games,
+        batting_stats=batting_stats,
+        pitching_stats=pitching_stats,
+        advanced_stats=advanced_stats
+    )["prompt"]
 
-    Args:
-        standings_df: DataFrame con standings de la liga
-        recent_games: DataFrame con juegos recientes
-        batting_stats: DataFrame con estadísticas de bateo
-        pitching_stats: DataFrame con estadísticas de pitcheo
-        advanced_stats: Dict con estadísticas avanzadas de Leones
 
-    Returns:
-        str: Prompt estructurado para OpenAI
+def load_insight_inputs(season=None) -> dict:
+    """
+    Datos del prompt con los mismos loaders y argumentos que la Home: la app y
+    la ingesta arman el mismo prompt (y el mismo hash) sobre la misma versión
+    de datos. Dentro de la app son aciertos del caché de la Home.
     """
-    prompt_parts = []
+    from utils.supabase_client import (
+        get_batting_stats,
+        get_leones_advanced_stats,
+        get_pitching_stats,
+        get_recent_games,
+        get_standings,
+    )
 
-    prompt_parts.append("""Eres un analista deportivo experto en béisbol venezolano (LVBP),
-especializado en los Leones del Caracas.
+    standings_df = get_standings(season)
+    if not standings_df.empty:
+        # Mismo orden que la Home (por PCT)
+        standings_df = standings_df.sort_values('pct', ascending=False).reset_index(drop=True)
 
-IMPORTANTE (regla fija):
-- Los Leones del Caracas juegan como locales en el Estadio Monumental Simón Bolívar, en Caracas, Venezuela (puedes llamarlo el Monumental).
-- Nunca menciones otros estadios como sede local (ej. Foro Sol u otros).
+    return {
+        "standings_df": standings_df,
+        "recent_games": get_recent_games(team_id=LEONES_ID, limit=10),
+        "batting_stats": get_batting_stats(team_id=LEONES_ID, limit=10, season=season),
+        "pitching_stats": get_pitching_stats(team_id=LEONES_ID, limit=10, season=season),
+        "advanced_stats": get_leones_advanced_stats(season),
+    }
 
-Genera entre 3 y 4 datos curiosos, insights estadísticos
-o análisis interesantes basados en los siguientes datos actuales.
 
-Instrucciones:
-- Usa un tono cercano, apasionado y profesional
-- Incluye comparaciones históricas o contexto cuando sea relevante
-- Destaca tendencias positivas y áreas claras de mejora
-- Menciona jugadores destacados por nombre
-- Sé conciso pero informativo
-- Usa emojis relacionados con béisbol ocasionalmente ⚾🦁
-- Mantén coherencia geográfica e histórica con la LVBP y el Caracas
+def _has_data(inputs: dict) -> bool:
+    return any(
+        value is not None and len(value) > 0
+        for value in inputs.values()
+    )
 
-Datos actuales:
-""")
 
-    # Standings
-    if standings_df is not None and not standings_df.empty:
-        leones = standings_df[standings_df['team_name'].str.contains('Leones', case=False, na=False)]
-        if not leones.empty:
-            leo = leones.iloc[0]
-            position = standings_df.index.get_loc(leones.index[0]) + 1
-            prompt_parts.append(f"""
-## Posición en Standings
-- Posición actual: {position}° lugar
-- Récord: {leo.get('wins', 0)}-{leo.get('losses', 0)} ({leo.get('pct', 0):.3f})
-- Racha: {leo.get('streak', 'N/A')}
-- Diferencial de carreras: {leo.get('run_diff', 0):+d} (RF: {leo.get('runs_for', 0)}, RA: {leo.get('runs_against', 0)})
-- Récord casa: {leo.get('home_record', 'N/A')}
-- Récord visitante: {leo.get('away_record', 'N/A')}
-- Últimos 10: {leo.get('last_10', 'N/A')}
-""")
-
-    # Juegos recientes
-    if recent_games is not None and not recent_games.empty:
-        games_info = []
-        for _, game in recent_games.head(5).iterrows():
-            is_home = game.get('home_team_id') == 695
-            leones_score = game['home_score'] if is_home else game['away_score']
-            opp_score = game['away_score'] if is_home else game['home_score']
-            result = "Victoria" if leones_score > opp_score else "Derrota"
-
-            if isinstance(game.get('away_team'), dict):
-                rival = game['home_team'].get('name', 'Rival') if not is_home else game['away_team'].get('name', 'Rival')
-            else:
-                rival = "Rival"
-
-            games_info.append(f"  - {result} vs {rival}: {leones_score}-{opp_score}")
-
-        prompt_parts.append(f"""
-## Últimos 5 juegos
-{chr(10).join(games_info)}
-""")
-
-    # Estadísticas de bateo
-    if batting_stats is not None and not batting_stats.empty:
-        top_batters = batting_stats.head(5)
-        batters_info = []
-        for _, b in top_batters.iterrows():
-            batters_info.append(f"  - {b['player_name']}: AVG {b['avg']:.3f}, OPS {b['ops']:.3f}, HR {b.get('hr', 0)}, RBI {b.get('rbi', 0)}")
+def prompt_hash(prompt: str) -> str:
+    """Hash estable de todo lo que determina la respuesta: modelo, parámetros y prompt"""
+    payload = json.dumps(
+        {
+            "model": MODEL,
+            "system": SYSTEM_PROMPT,
+            "prompt": prompt,
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        prompt_parts.append(f"""
-## Líderes de Bateo (por OPS)
-{chr(10).join(batters_info)}
-""")
 
-    # Estadísticas de pitcheo
-    if pitching_stats is not None and not pitching_stats.empty:
-        top_pitchers = pitching_stats.sort_values('era', ascending=True).head(5)
-        pitchers_info = []
-        for _, p in top_pitchers.iterrows():
-            pitchers_info.append(f"  - {p['player_name']}: ERA {p['era']:.2f}, WHIP {p['whip']:.2f}, K {p.get('so', 0)}, IP {p.get('ip', 0):.1f}")
+# ============================================================
+# OPENAI
+# ============================================================
 
-        prompt_parts.append(f"""
-## Líderes de Pitcheo (por ERA)
-{chr(10).join(pitchers_info)}
-""")
+def get_api_key():
+    """API key de OpenAI: variable de entorno o st.secrets dentro de la app"""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    # Streamlit solo se consulta si el proceso ya lo cargó (la app)
+    streamlit = sys.modules.get("streamlit")
+    if not api_key and streamlit is not None:
+        try:
+            api_key = streamlit.secrets.get("OPENAI_API_KEY")
+        except Exception:
+            pass
+    return api_key
+
+
+def complete(prompt: str, api_key: str) -> str:
+    """Llama al modelo y retorna el texto; los errores del SDK se propagan"""
+    # Import diferido: el SDK solo se carga al generar insights
+    from openai import OpenAI
+
+    client = OpenAI(api_key=api_key, base_url=os.environ.get("OPENAI_BASE_URL") or None)
+
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        max_tokens=MAX_TOKENS,
+        temperature=TEMPERATURE
+    )
 
-    # Estadísticas avanzadas
-    if advanced_stats:
-        prompt_parts.append(f"""
-## Estadísticas Avanzadas Leones
-- Juegos totales: {advanced_stats.get('total_games', 'N/A')}
-- Récord general: {advanced_stats.get('record', 'N/A')}
-- En casa: {advanced_stats.get('home_record', 'N/A')}
-- De visitante: {advanced_stats.get('away_record', 'N/A')}
-- Juegos por 1 carrera: {advanced_stats.get('one_run', 'N/A')}
-- Extra innings: {advanced_stats.get('extra_inning', 'N/A')}
-- Blanqueos propinados: {advanced_stats.get('shutouts', 'N/A')}
-- Racha actual: {advanced_stats.get('streak', 'N/A')}
-- Octubre: {advanced_stats.get('oct', 'N/A')}
-- Noviembre: {advanced_stats.get('nov', 'N/A')}
-- Diciembre: {advanced_stats.get('dec', 'N/A')}
-""")
-
-    prompt_parts.append("""
-Genera los insights en formato markdown con bullet points.
-Cada insight debe ser breve (1-2 oraciones) pero interesante.""")
-
-    return "\n".join(prompt_parts)
-
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def get_ai_insights(
-    standings_df: pd.DataFrame = None,
-    recent_games: pd.DataFrame = None,
-    batting_stats: pd.DataFrame = None,
-    pitching_stats: pd.DataFrame = None,
-    advanced_stats: dict = None
-) -> tuple[str, str]:
+    return response.choices[0].message.content.strip()
+
+
+def _error_message(e: Exception) -> str:
+    error_msg = str(e)
+    if "api_key" in error_msg.lower() or "authentication" in error_msg.lower():
+        return "Error de autenticación con OpenAI. Verifica tu API key."
+    elif "rate" in error_msg.lower():
+        return "Límite de llamadas a la API alcanzado. Intenta más tarde."
+    else:
+        return f"Error al generar insights: {error_msg}"
+
+
+@cache.memoize(max_entries=16)
+def _live_insights(prompt: str) -> str:
+    # El prompt compilado es determinístico: mismos números, misma llave.
+    # Solo se cachean las respuestas exitosas (las excepciones no quedan en el caché)
+    return complete(prompt, get_api_key())
+
+
+# ============================================================
+# SNAPSHOTS (ingesta nocturna)
+# ============================================================
+
+def _execute(query):
+    return query.execute()
+
+
+def insight_path(season, digest, snapshot_dir=None):
+    """<snapshot_dir>/ai_insights/season=<temporada>/<hash>.json"""
+    from utils.snapshots import SNAPSHOT_DIR
+
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, INSIGHTS_TABLE, f"season={season}", f"{digest}.json")
+
+
+def write_insight_file(row: dict, snapshot_dir=None):
+    """Guarda el snapshot en disco (escritura atómica) para el modo de lectura local"""
+    path = insight_path(row["season"], row["prompt_hash"], snapshot_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(row, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_insight_file(season, digest, snapshot_dir=None):
+    """Snapshot guardado en disco, o None"""
+    try:
+        with open(insight_path(season, digest, snapshot_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def fetch_insight(supabase, season, digest, execute=_execute):
+    """Fila de ai_insights con ese prompt, o None (también si la tabla aún no existe)"""
+    try:
+        response = execute(
+            supabase.table(INSIGHTS_TABLE)
+            .select("*")
+            .eq("season", season)
+            .eq("prompt_hash", digest)
+            .limit(1)
+        )
+    except Exception:
+        return None
+    return response.data[0] if response.data else None
+
+
+def get_insight_snapshot(season, digest):
+    """Snapshot del prompt: de disco con DATA_SOURCE=parquet, de Supabase si no"""
+    from utils import snapshots
+
+    if snapshots.data_source() == "parquet":
+        return read_insight_file(season, digest)
+
+    from utils.supabase_client import init_supabase
+
+    return fetch_insight(init_supabase(), season, digest)
+
+
+def generate_insight_snapshot(supabase, season, version=None, snapshot_dir=None, execute=_execute):
     """
-    Genera insights usando OpenAI API.
+    Genera y guarda el insight de la temporada sobre la versión de datos recién
+    publicada. Si ya existe un snapshot con el mismo prompt (los datos no
+    cambiaron) no se llama al modelo.
+
+    Los datos se leen con los loaders de la app (utils.supabase_client, con su
+    propio cliente); `supabase` se usa para la tabla ai_insights.
+
+    Returns:
+        tuple: (estado, fila) con estado "generated", "existing" o "no_data"
+    """
+    from utils import data_version
+
+    # Los loaders deben ver la versión recién publicada, no la del último poll
+    data_version.reset()
+    inputs = load_insight_inputs(season)
+    if not _has_data(inputs):
+        return "no_data", None
+
+    compiled = compile_insights_prompt(**inputs)
+
+    status, row = "existing", fetch_insight(supabase, season, compiled["hash"], execute)
+    if row is None:
+        api_key = get_api_key()
+        if not api_key:
+            raise RuntimeError("Falta OPENAI_API_KEY para generar los insights")
+        row = {
+            "season": season,
+            "prompt_hash": compiled["hash"],
+            "prompt_tokens": compiled["tokens"],
+            "data_version": version,
+            "model": MODEL,
+            "content": complete(compiled["prompt"], api_key),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        execute(supabase.table(INSIGHTS_TABLE).upsert(row))
+        status = "generated"
+
+    if snapshot_dir:
+        write_insight_file(row, snapshot_dir)
+    return status, row
+
+
+# ============================================================
+# APP
+# ============================================================
+
+def get_ai_insights(season=None) -> tuple[str, str]:
+    """
+    Insights de la temporada: el snapshot de la ingesta si existe para el
+    prompt actual; si no, se generan en vivo con OpenAI.
 
     Returns:
         tuple: (insights_text, error_message)
                Si hay error, insights_text será None y error_message contendrá el mensaje.
                Si es exitoso, error_message será None.
     """
-    # Verificar API key
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        try:
-            api_key = st.secrets.get("OPENAI_API_KEY")
-        except:
-            pass
+    from utils.db import get_current_season
 
-    if not api_key:
-        return None, "No se encontró la API key de OpenAI. Configura OPENAI_API_KEY en las variables de entorno."
+    season = season or get_current_season()
 
     # Verificar que hay datos
-    has_data = any([
-        standings_df is not None and not standings_df.empty,
-        recent_games is not None and not recent_games.empty,
-        batting_stats is not None and not batting_stats.empty,
-        pitching_stats is not None and not pitching_stats.empty,
-        advanced_stats is not None and len(advanced_stats) > 0
-    ])
-
-    if not has_data:
+    inputs = load_insight_inputs(season)
+    if not _has_data(inputs):
         return None, "No hay datos disponibles para generar insights."
 
-    # Construir prompt
-    prompt = build_insights_prompt(
-        standings_df=standings_df,
-        recent_games=recent_games,
-        batting_stats=batting_stats,
-        pitching_stats=pitching_stats,
-        advanced_stats=advanced_stats
-    )
+    compiled = compile_insights_prompt(**inputs)
 
-    # Llamar a OpenAI
-    try:
-        client = OpenAI(api_key=api_key)
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Eres un analista deportivo experto en béisbol venezolano, especializado en la LVBP y los Leones del Caracas."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
+    # Snapshot de la ingesta nocturna: sin esperar al modelo
+    snapshot = get_insight_snapshot(season, compiled["hash"])
+    if snapshot:
+        return snapshot["content"], None
 
-        insights = response.choices[0].message.content.strip()
-        return insights, None
+    # Verificar API key
+    if not get_api_key():
+        return None, "No se encontró la API key de OpenAI. Configura OPENAI_API_KEY en las variables de entorno."
 
+    try:
+        return _live_insights(compiled["prompt"]), None
     except Exception as e:
-        error_msg = str(e)
-        if "api_key" in error_msg.lower() or "authentication" in error_msg.lower():
-            return None, "Error de autenticación con OpenAI. Verifica tu API key."
-        elif "rate" in error_msg.lower():
-            return None, "Límite de llamadas a la API alcanzado. Intenta más tarde."
-        else:
-            return None, f"Error al generar insights: {error_msg}"
+        return None, _error_message(e)
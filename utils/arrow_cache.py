@@ -0,0 +1,104 @@
+# utils/arrow_cache.py
+"""
+Caché de tablas por temporada en archivos Arrow IPC memory-mapped.
+
+Cada tabla se materializa una sola vez por (tabla, temporada, versión) en
+`<ARROW_CACHE_DIR>/<tabla>/season=<temporada>/<versión>.arrow` y se abre con
+memory map: todas las sesiones de Streamlit y todos los procesos del host
+leen las mismas páginas del page cache del sistema operativo, sin copiar
+ni deserializar la tabla (a diferencia de st.cache_data, que hace pickle por
+llamada). Lo que sí se copia es la vista que cada lectura pasa a pandas
+(utils/snapshots.py), que por eso se recorta en Arrow antes de convertir.
+"""
+
+import os
+import tempfile
+import threading
+import uuid
+
+import pyarrow as pa
+
+ARROW_CACHE_DIR = os.environ.get(
+    "ARROW_CACHE_DIR", os.path.join(tempfile.gettempdir(), "republicaraquist_arrow")
+)
+
+# Tablas abiertas en este proceso: (tabla, temporada) -> (versión, pa.Table)
+_open_tables = {}
+# Un lock por (tabla, temporada): construir una tabla no bloquea a las demás.
+# `_lock` solo protege los diccionarios y nunca se toma durante un build
+_key_locks = {}
+_lock = threading.Lock()
+
+
+def bundle_path(table, season, version, cache_dir=None):
+    return os.path.join(cache_dir or ARROW_CACHE_DIR, table, f"season={season}", f"{version}.arrow")
+
+
+def write_ipc(arrow_table, path):
+    """Escribe el archivo IPC de forma atómica (otro proceso puede estar leyendo)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+    os.replace(tmp_path, path)
+
+
+def open_ipc(path) -> pa.Table:
+    """Abre el archivo memory-mapped; las columnas apuntan al mapa (zero-copy)."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _remove_old_versions(table, season, keep, cache_dir=None):
+    """Borra versiones viejas; en POSIX los procesos que las tengan abiertas siguen leyendo."""
+    directory = os.path.dirname(bundle_path(table, season, keep, cache_dir))
+    for name in os.listdir(directory):
+        if name.endswith(".arrow") and name != f"{keep}.arrow":
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def get_table(table, season, version, build, cache_dir=None) -> pa.Table:
+    """
+    Tabla Arrow memory-mapped de (tabla, temporada, versión).
+
+    `build()` se llama solo si ningún proceso la materializó todavía y debe
+    retornar un pa.Table (o un DataFrame de pandas).
+    """
+    key = (table, str(season))
+    version = str(version)
+    with _lock:
+        cached = _open_tables.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Otro hilo pudo abrirla mientras esperábamos
+        cached = _open_tables.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        path = bundle_path(table, season, version, cache_dir)
+        if not os.path.exists(path):
+            built = build()
+            if not isinstance(built, pa.Table):
+                built = pa.Table.from_pandas(built, preserve_index=False)
+            write_ipc(built, path)
+            _remove_old_versions(table, season, version, cache_dir)
+
+        arrow_table = open_ipc(path)
+        with _lock:
+            _open_tables[key] = (version, arrow_table)
+        return arrow_table
+
+
+def clear(cache_dir=None):
+    """Olvida las tablas abiertas en este proceso y borra los archivos del caché."""
+    import shutil
+
+    with _lock:
+        _open_tables.clear()
+    shutil.rmtree(cache_dir or ARROW_CACHE_DIR, ignore_errors=True)
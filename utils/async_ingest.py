@@ -0,0 +1,109 @@
+# utils/async_ingest.py
+"""
+Cliente asíncrono de la ingesta: statsapi y PostgREST de Supabase sobre un
+solo httpx.AsyncClient con HTTP/2 y pool de conexiones compartido.
+
+Las requests de todos los juegos se solapan con un límite de concurrencia
+(semáforo) y las escrituras se hacen como upserts masivos por tabla en lugar
+de una request por fila. Las llamadas quedan registradas en el reporte de la
+corrida igual que en el camino síncrono, con los mismos reintentos y circuit
+breaker (utils/resilience.py).
+"""
+
+import asyncio
+import importlib.util
+
+import httpx
+
+from utils.ingest_metrics import get_report, record_statsapi_call
+from utils.resilience import STATSAPI_HOST, SUPABASE_HOST, async_call_with_retry
+
+STATSAPI_BASE = "https://statsapi.mlb.com/api"
+
+# Endpoints de statsapi.get() usados por la ingesta -> ruta REST
+STATSAPI_PATHS = {
+    "schedule": "/v1/schedule",
+    "game": "/v1.1/game/{gamePk}/feed/live",
+    "game_boxscore": "/v1/game/{gamePk}/boxscore",
+    "game_linescore": "/v1/game/{gamePk}/linescore",
+}
+
+DEFAULT_CONCURRENCY = 8
+
+# Filas por request en los upserts masivos
+BULK_CHUNK = 500
+
+# HTTP/2 requiere el paquete h2; sin él httpx usa HTTP/1.1 con keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def dedupe(rows, key_columns):
+    """Una fila por llave (gana la última): PostgREST rechaza un upsert que toca dos veces la misma fila."""
+    unique = {}
+    for row in rows:
+        unique[tuple(row.get(c) for c in key_columns)] = row
+    return list(unique.values())
+
+
+class AsyncIngestClient:
+    """Cliente HTTP compartido para statsapi y PostgREST con concurrencia limitada."""
+
+    def __init__(self, supabase_url, supabase_key, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=30, transport=None):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rest_url = f"{supabase_url.rstrip('/')}/rest/v1"
+        self._headers = {"apikey": supabase_key, "Authorization": f"Bearer {supabase_key}"}
+        self.http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE and transport is None,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+
+    @staticmethod
+    def _on_retry(service):
+        return lambda error, attempt: get_report().record_retry(service)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http.aclose()
+
+    async def statsapi_get(self, endpoint, params):
+        """Equivalente asíncrono de statsapi.get(endpoint, params)"""
+        params = dict(params)
+        path = STATSAPI_PATHS[endpoint]
+        if "{gamePk}" in path:
+            path = path.format(gamePk=params.pop("gamePk"))
+
+        async def fetch():
+            async with self._semaphore:
+                response = await self.http.get(STATSAPI_BASE + path, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        result = await async_call_with_retry(fetch, STATSAPI_HOST, on_retry=self._on_retry("statsapi"))
+        return record_statsapi_call(result)
+
+    async def upsert(self, table, rows, on_conflict=None):
+        """Upsert masivo en PostgREST; retorna las filas escritas."""
+        params = {"on_conflict": on_conflict} if on_conflict else None
+        headers = dict(self._headers, Prefer="resolution=merge-duplicates,return=minimal")
+
+        async def write(chunk):
+            async with self._semaphore:
+                response = await self.http.post(
+                    f"{self._rest_url}/{table}", params=params, json=chunk, headers=headers
+                )
+            get_report().record_call("supabase", len(response.request.content))
+            response.raise_for_status()
+            return len(chunk)
+
+        async def write_with_retry(chunk):
+            return await async_call_with_retry(
+                lambda: write(chunk), SUPABASE_HOST, on_retry=self._on_retry("supabase")
+            )
+
+        chunks = [rows[i:i + BULK_CHUNK] for i in range(0, len(rows), BULK_CHUNK)]
+        return sum(await asyncio.gather(*(write_with_retry(chunk) for chunk in chunks)))
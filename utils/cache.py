@@ -0,0 +1,264 @@
+# utils/cache.py
+"""
+Caché de resultados de los loaders con backend intercambiable.
+
+- memory: LRU por función en la memoria del proceso (scripts, workers,
+  benchmarks).
+- disk: pickles en un directorio (CACHE_DIR), compartidos entre procesos del
+  mismo host; scripts/warm_cache.py puede dejarlos listos para la app.
+- streamlit: st.cache_data, dentro de la app.
+
+El backend se elige con CACHE_BACKEND=memory|disk|streamlit; por defecto
+streamlit si el proceso corre bajo `streamlit run` y memory si no. Como
+st.cache_data, los backends memory y disk guardan el pickle del resultado:
+cada llamada recibe su propia copia y puede modificarla sin tocar el caché.
+
+Con cualquier backend, las llamadas simultáneas con los mismos argumentos se
+calculan una sola vez: las demás esperan el cálculo en curso (por ejemplo,
+la Home del primer visitante espera la precarga de utils/warmup.py en lugar
+de repetir cada loader) y leen el resultado del caché.
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 32
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join("data", "cache"))
+
+
+def _namespace(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _key(args, kwargs):
+    payload = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha1(payload).hexdigest()
+
+
+class _StoreCache:
+    """Base de los backends clave-valor: get/set de bytes por (función, argumentos)."""
+
+    def wrap(self, func, max_entries=DEFAULT_MAX_ENTRIES):
+        namespace = _namespace(func)
+
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            key = _key(args, kwargs)
+            payload = self.get(namespace, key)
+            if payload is not None:
+                return pickle.loads(payload)
+            value = func(*args, **kwargs)
+            self.set(namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), max_entries)
+            return value
+
+        cached.clear = lambda: self.clear(namespace)
+        return cached
+
+
+class MemoryCache(_StoreCache):
+    """LRU en memoria del proceso, una por función"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # {namespace: OrderedDict(key -> bytes)}
+
+    def get(self, namespace, key):
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if entries is None or key not in entries:
+                return None
+            entries.move_to_end(key)
+            return entries[key]
+
+    def set(self, namespace, key, payload, max_entries):
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = payload
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(namespace, None)
+
+
+class DiskCache(_StoreCache):
+    """Un archivo por resultado en <directory>/<función>/; se descartan los menos usados (mtime)"""
+
+    name = "disk"
+
+    def __init__(self, directory=None):
+        self.directory = directory or CACHE_DIR
+
+    def _dir(self, namespace):
+        return os.path.join(self.directory, namespace)
+
+    def get(self, namespace, key):
+        path = os.path.join(self._dir(namespace), key + ".pkl")
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            os.utime(path)
+            return payload
+        except OSError:
+            return None
+
+    def set(self, namespace, key, payload, max_entries):
+        directory = self._dir(namespace)
+        os.makedirs(directory, exist_ok=True)
+        # Escritura atómica: otro proceso nunca lee un pickle a medias
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(directory, key + ".pkl"))
+
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pkl")]
+        if len(files) > max_entries:
+            files.sort(key=lambda path: os.stat(path).st_mtime)
+            for path in files[:len(files) - max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self, namespace=None):
+        namespaces = [namespace] if namespace else (
+            os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        )
+        for name in namespaces:
+            directory = self._dir(name)
+            if not os.path.isdir(directory):
+                continue
+            for file_name in os.listdir(directory):
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except OSError:
+                    pass
+
+
+class StreamlitCache:
+    """st.cache_data (Streamlit se importa recién al envolver la primera función)"""
+
+    name = "streamlit"
+
+    def wrap(self, func, max_entries=DEFAULT_MAX_ENTRIES):
+        import streamlit as st
+
+        return st.cache_data(max_entries=max_entries)(func)
+
+
+BACKENDS = {"memory": MemoryCache, "disk": DiskCache, "streamlit": StreamlitCache}
+
+_backend = None
+_backend_lock = threading.Lock()
+_memoized = weakref.WeakSet()
+
+
+def _running_in_streamlit():
+    # Sin importar Streamlit: si el proceso no lo cargó, no es la app
+    if "streamlit" not in sys.modules:
+        return False
+    from streamlit import runtime
+
+    return runtime.exists()
+
+
+def get_backend():
+    """Backend del proceso (CACHE_BACKEND o detección de `streamlit run`)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("CACHE_BACKEND", "").lower()
+            if name not in BACKENDS:
+                name = "streamlit" if _running_in_streamlit() else "memory"
+            _backend = BACKENDS[name]()
+        return _backend
+
+
+def set_backend(backend):
+    """Cambia el backend (instancia o nombre); las funciones memoizadas lo toman en su próxima llamada"""
+    global _backend
+    if isinstance(backend, str):
+        backend = BACKENDS[backend]()
+    with _backend_lock:
+        _backend = backend
+    for memoized in list(_memoized):
+        memoized.reset()
+
+
+def clear_all():
+    """Vacía el caché de todas las funciones memoizadas"""
+    for memoized in list(_memoized):
+        memoized.clear()
+
+
+class _Memoized:
+    def __init__(self, func, max_entries):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.max_entries = max_entries
+        self._cached = None
+        self._lock = threading.Lock()
+        # Llave de los argumentos -> Event del cálculo en curso
+        self._inflight = {}
+        _memoized.add(self)
+
+    def _resolve(self):
+        with self._lock:
+            if self._cached is None:
+                self._cached = get_backend().wrap(self.func, self.max_entries)
+            return self._cached
+
+    def __call__(self, *args, **kwargs):
+        cached = self._cached or self._resolve()
+        try:
+            key = _key(args, kwargs)
+        except Exception:
+            return cached(*args, **kwargs)
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = threading.Event()
+        if pending is not None:
+            # Otro hilo ya lo está calculando: se espera y se lee del caché
+            pending.wait()
+            return cached(*args, **kwargs)
+
+        try:
+            return cached(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def clear(self):
+        if self._cached is not None:
+            self._cached.clear()
+
+    def reset(self):
+        with self._lock:
+            self._cached = None
+
+
+def memoize(func=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Decorador: cachea `func` en el backend del proceso. El backend se resuelve
+    en la primera llamada, así un script puede llamar set_backend() después
+    de importar los loaders.
+    """
+    if func is None:
+        return lambda f: _Memoized(f, max_entries)
+    return _Memoized(func, max_entries)
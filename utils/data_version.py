@@ -0,0 +1,102 @@
+# utils/data_version.py
+"""
+Versión de los datos por temporada, incrementada por la ingesta.
+
+Los loaders cacheados de la app usan (temporada, versión) como llave y no
+tienen TTL: el caché vale hasta que la ingesta escribe datos nuevos. La
+versión vive en la tabla `data_version` de Supabase y, para el modo
+DATA_SOURCE=parquet, en `<SNAPSHOT_DIR>/data_version.json`.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+MARKER_NAME = "data_version.json"
+
+# Cada proceso consulta la versión como máximo una vez por intervalo
+POLL_INTERVAL_S = int(os.environ.get("DATA_VERSION_POLL_S", "60"))
+
+# Sin versiones (tabla aún no creada) se vuelve a un TTL equivalente
+FALLBACK_TTL_S = 600
+
+_polled = {"at": None, "versions": {}}
+_lock = threading.Lock()
+
+
+def _execute(query):
+    return query.execute()
+
+
+def new_version() -> int:
+    """Milisegundos desde epoch: crece entre corridas sin leer la versión anterior"""
+    return time.time_ns() // 1_000_000
+
+
+def bump(supabase, seasons, execute=_execute) -> int:
+    """Marca datos nuevos en las temporadas; retorna la versión escrita."""
+    version = new_version()
+    updated_at = datetime.now(timezone.utc).isoformat()
+    rows = [{"season": int(s), "version": version, "updated_at": updated_at} for s in seasons]
+    execute(supabase.table("data_version").upsert(rows, on_conflict="season"))
+    return version
+
+
+def fetch_versions(supabase, execute=_execute) -> dict:
+    rows = execute(supabase.table("data_version").select("season, version")).data or []
+    return {int(r["season"]): int(r["version"]) for r in rows}
+
+
+def marker_path(snapshot_dir):
+    return os.path.join(snapshot_dir, MARKER_NAME)
+
+
+def read_marker(snapshot_dir) -> dict:
+    path = marker_path(snapshot_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {int(season): int(version) for season, version in json.load(f).items()}
+
+
+def write_marker(versions, snapshot_dir):
+    """Combina `versions` con el marcador existente (escritura atómica)."""
+    merged = read_marker(snapshot_dir)
+    merged.update({int(s): int(v) for s, v in versions.items()})
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_path = marker_path(snapshot_dir) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({str(s): v for s, v in sorted(merged.items())}, f)
+    os.replace(tmp_path, marker_path(snapshot_dir))
+
+
+def current_versions(load) -> dict:
+    """{temporada: versión} con `load()`, consultado como máximo cada POLL_INTERVAL_S."""
+    now = time.monotonic()
+    with _lock:
+        if _polled["at"] is not None and now - _polled["at"] < POLL_INTERVAL_S:
+            return _polled["versions"]
+    try:
+        versions = load()
+    except Exception:
+        versions = _polled["versions"]  # Se conserva la última versión conocida
+    with _lock:
+        _polled.update(at=now, versions=versions)
+    return versions
+
+
+def version_for(versions, season=None) -> int:
+    """Versión de la temporada; con `season=None` la más reciente de todas."""
+    if not versions:
+        return -int(time.time() // FALLBACK_TTL_S)
+    if season is None:
+        return max(versions.values())
+    return versions.get(int(season), 0)
+
+
+def reset():
+    """Fuerza a consultar la versión en la próxima llamada"""
+    with _lock:
+        _polled.update(at=None, versions={})
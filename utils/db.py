@@ -0,0 +1,113 @@
+# utils/db.py
+"""
+Acceso a Supabase compartido por la app, la ingesta y los scripts, sin
+Streamlit ni pandas: credenciales, cliente, temporada actual y consultas que
+antes estaban duplicadas en scripts/update_daily.py y scripts/backfill_elo.py.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+from utils.schema import phase_filter_column
+
+
+def _execute(query):
+    return query.execute()
+
+
+# ============================================================
+# TEMPORADA
+# ============================================================
+
+def season_for_date(day):
+    """Temporada a la que pertenece una fecha (datetime o 'YYYY-MM-DD')"""
+    if isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d")
+
+    # La temporada 2025-2026 se guarda como 2025 (año de inicio):
+    # Oct-Dic del año N = temporada N; Ene-Feb del año N = temporada N-1
+    if day.month >= 10:
+        return day.year
+    # Ene-Feb: continuación de la temporada; Mar-Sep: fuera de temporada, la
+    # última jugada es la que empezó el año anterior
+    return day.year - 1
+
+
+def get_current_season():
+    """Temporada actual (la última que empezó)"""
+    return season_for_date(datetime.now())
+
+
+# ============================================================
+# CLIENTE
+# ============================================================
+
+def get_credentials():
+    """(url, key) de Supabase: st.secrets dentro de la app, variables de entorno si no"""
+    # Streamlit solo se consulta si el proceso ya lo cargó (la app)
+    streamlit = sys.modules.get("streamlit")
+    if streamlit is not None:
+        try:
+            return streamlit.secrets["SUPABASE_URL"], streamlit.secrets["SUPABASE_KEY"]
+        except Exception:
+            pass
+    return os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+
+
+def create_supabase_client():
+    """Cliente de Supabase nuevo; RuntimeError si faltan las credenciales"""
+    url, key = get_credentials()
+    if not url or not key:
+        raise RuntimeError("Faltan SUPABASE_URL o SUPABASE_KEY en variables de entorno")
+    # Import diferido: el SDK tarda en cargar
+    from supabase import create_client
+
+    return create_client(url, key)
+
+
+# ============================================================
+# ELO POR FASE
+# ============================================================
+
+def fetch_phase_final_games(supabase, season, phase, execute=_execute):
+    """Juegos finalizados de una fase (phase o, en esquemas viejos, game_type), en orden cronológico"""
+    response = execute(
+        supabase.table("games")
+        .select("id, game_datetime, game_date, home_team_id, away_team_id, home_score, away_score")
+        .eq("season", season)
+        .eq("status", "Final")
+        .eq(phase_filter_column(supabase), phase)
+    )
+    games = response.data or []
+    # Orden determinístico por game_datetime con fallback a game_date
+    games.sort(key=lambda g: (g.get("game_datetime") or g.get("game_date") or "", g.get("id") or 0))
+    return games
+
+
+def fetch_elo_processed_ids(supabase, season, phase, execute=_execute):
+    """IDs de los juegos ya aplicados al ELO de la fase (elo_game_log)"""
+    response = execute(
+        supabase.table("elo_game_log")
+        .select("game_id")
+        .eq("season", season)
+        .eq("phase", phase)
+    )
+    return {row["game_id"] for row in (response.data or [])}
+
+
+def fetch_elo_ratings(supabase, season, phase, execute=_execute):
+    """{team_id: fila de elo_ratings} de la fase"""
+    response = execute(
+        supabase.table("elo_ratings")
+        .select("*")
+        .eq("season", season)
+        .eq("phase", phase)
+    )
+    return {row["team_id"]: row for row in (response.data or [])}
+
+
+def delete_elo_phase(supabase, season, phase, execute=_execute):
+    """Borra el ELO (log y ratings) de la fase para reconstruirlo"""
+    execute(supabase.table("elo_game_log").delete().eq("season", season).eq("phase", phase))
+    execute(supabase.table("elo_ratings").delete().eq("season", season).eq("phase", phase))
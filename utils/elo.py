@@ -1,4 +1,8 @@
 ﻿# utils/elo.py
+from datetime import datetime
+
+from utils import db
+
 BASE_ELO = 1500
 HOME_ADVANTAGE = 35
 K_BY_PHASE = {
@@ -25,3 +29,108 @@ def update_elo(r_home, r_away, home_win, k, home_advantage=HOME_ADVANTAGE):
     new_home = r_home + delta
     new_away = r_away - delta
     return new_home, new_away
+
+
+def _execute(query):
+    return query.execute()
+
+
+def process_phase(supabase, season, phase, reset=False, execute=_execute):
+    """
+    Aplica al ELO de la fase los juegos finalizados que aún no están en
+    elo_game_log (idempotente); con `reset` reconstruye la fase desde cero.
+    Retorna (juegos finalizados, procesados, omitidos).
+    """
+    if reset:
+        db.delete_elo_phase(supabase, season, phase, execute=execute)
+
+    games = db.fetch_phase_final_games(supabase, season, phase, execute=execute)
+    if not games:
+        return 0, 0, 0
+
+    processed_ids = db.fetch_elo_processed_ids(supabase, season, phase, execute=execute)
+    ratings_map = db.fetch_elo_ratings(supabase, season, phase, execute=execute)
+    processed_count = 0
+    skipped_count = 0
+
+    for game in games:
+        game_id = game.get("id")
+        if game_id in processed_ids:
+            skipped_count += 1
+            continue
+
+        home_team_id = game.get("home_team_id")
+        away_team_id = game.get("away_team_id")
+        home_score = game.get("home_score")
+        away_score = game.get("away_score")
+        game_datetime = game.get("game_datetime") or game.get("game_date")
+
+        if None in [home_team_id, away_team_id, home_score, away_score]:
+            skipped_count += 1
+            continue
+
+        home_row = ratings_map.get(home_team_id, {})
+        away_row = ratings_map.get(away_team_id, {})
+        home_elo = float(home_row.get("elo", BASE_ELO))
+        away_elo = float(away_row.get("elo", BASE_ELO))
+        home_games_played = int(home_row.get("games_played", 0))
+        away_games_played = int(away_row.get("games_played", 0))
+
+        home_win = home_score > away_score
+        k_value = K_BY_PHASE.get(phase, K_BY_PHASE["unknown"])
+        new_home_elo, new_away_elo = update_elo(
+            r_home=home_elo,
+            r_away=away_elo,
+            home_win=home_win,
+            k=k_value,
+            home_advantage=HOME_ADVANTAGE,
+        )
+
+        now_iso = datetime.now().isoformat()
+        home_payload = {
+            "season": season,
+            "phase": phase,
+            "team_id": home_team_id,
+            "elo": round(new_home_elo, 2),
+            "games_played": home_games_played + 1,
+            "last_game_id": game_id,
+            "game_datetime": game_datetime,
+            "updated_at": now_iso,
+        }
+        away_payload = {
+            "season": season,
+            "phase": phase,
+            "team_id": away_team_id,
+            "elo": round(new_away_elo, 2),
+            "games_played": away_games_played + 1,
+            "last_game_id": game_id,
+            "game_datetime": game_datetime,
+            "updated_at": now_iso,
+        }
+
+        execute(supabase.table("elo_ratings").upsert(home_payload))
+        execute(supabase.table("elo_ratings").upsert(away_payload))
+        execute(supabase.table("elo_game_log").insert({
+            "season": season,
+            "phase": phase,
+            "game_id": game_id,
+            "game_datetime": game_datetime,
+            "home_team_id": home_team_id,
+            "away_team_id": away_team_id,
+            "home_score": home_score,
+            "away_score": away_score,
+            "home_elo_before": round(home_elo, 2),
+            "away_elo_before": round(away_elo, 2),
+            "home_elo_after": round(new_home_elo, 2),
+            "away_elo_after": round(new_away_elo, 2),
+            "k_value": k_value,
+            "home_advantage": HOME_ADVANTAGE,
+            "updated_at": now_iso,
+        }))
+
+        ratings_map[home_team_id] = home_payload
+        ratings_map[away_team_id] = away_payload
+        processed_ids.add(game_id)
+        processed_count += 1
+
+    return len(games), processed_count, skipped_count
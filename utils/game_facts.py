@@ -0,0 +1,199 @@
+# utils/game_facts.py
+"""
+Hechos derivados de cada juego (tabla `game_facts`), calculados una vez en
+la ingesta a partir del juego y su linescore (game_innings).
+
+Hay una fila por equipo y juego: extrainnings, terreneada, por una carrera,
+diferencia al 5to y 7mo, mayor ventaja/desventaja, de noche, si la decisión
+fue del abridor o del bullpen... Los splits del tab de Leones son conteos
+agrupados sobre esas filas.
+"""
+
+from datetime import datetime, timedelta
+
+REGULATION_INNINGS = 9
+
+# Venezuela (UTC-4): juego de noche si empieza a partir de las 5 pm
+LOCAL_UTC_OFFSET_H = -4
+NIGHT_START_HOUR = 17
+
+FINAL_STATUSES = ["Final", "Completed", "Completed Early"]
+
+
+def _is_night(game_datetime):
+    if not game_datetime:
+        return False
+    try:
+        start = datetime.fromisoformat(str(game_datetime).replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return (start + timedelta(hours=LOCAL_UTC_OFFSET_H)).hour >= NIGHT_START_HOUR
+
+
+def _cumulative(innings):
+    """[(inning, home acumulado, away acumulado)] ordenado por inning"""
+    home = away = 0
+    result = []
+    for row in sorted(innings, key=lambda r: r["inning"]):
+        home += row.get("home_score") or 0
+        away += row.get("away_score") or 0
+        result.append((row["inning"], home, away))
+    return result
+
+
+def _team_decisions(pitching, team_id):
+    """(decisión del abridor, salvado) del equipo; None si el juego no trae decisiones."""
+    lines = [r for r in pitching or [] if r.get("team_id") == team_id]
+    decision = [r for r in lines if r.get("w") or r.get("l")]
+    if not decision:
+        return None, None
+    return bool(decision[0].get("gs")), any(r.get("sv") for r in lines)
+
+
+def build_game_facts(game, innings, pitching=None):
+    """
+    Filas de game_facts (local y visitante) de un juego finalizado.
+
+    `game` es el registro de games, `innings` sus filas de game_innings y
+    `pitching` sus filas de pitching_stats (con w/l/sv/gs); lo que falte deja
+    en None/False los hechos que dependen de ello.
+    """
+    home_score, away_score = game.get("home_score"), game.get("away_score")
+    if home_score is None or away_score is None:
+        return []
+
+    cumulative = _cumulative(innings or [])
+    by_inning = {inning: (home, away) for inning, home, away in cumulative}
+    total_innings = cumulative[-1][0] if cumulative else REGULATION_INNINGS
+
+    # Terreneada: el home club gana anotando en la baja del último inning
+    walkoff = False
+    if cumulative and home_score > away_score:
+        home_before = by_inning.get(total_innings - 1, (0, 0))[0]
+        walkoff = home_before <= by_inning[total_innings][1]
+
+    rows = []
+    for side in ("home", "away"):
+        is_home = side == "home"
+        runs, runs_allowed = (home_score, away_score) if is_home else (away_score, home_score)
+        diffs = [(home - away) if is_home else (away - home) for _, home, away in cumulative]
+
+        starter_decision, save = _team_decisions(pitching, game[f"{side}_team_id"])
+
+        def diff_after(inning):
+            if inning not in by_inning:
+                return None
+            home, away = by_inning[inning]
+            return (home - away) if is_home else (away - home)
+
+        rows.append({
+            "game_id": game["id"],
+            "team_id": game[f"{side}_team_id"],
+            "opponent_id": game["away_team_id" if is_home else "home_team_id"],
+            "season": game.get("season"),
+            "game_date": game.get("game_date"),
+            "is_home": is_home,
+            "won": runs > runs_allowed,
+            "runs": runs,
+            "runs_allowed": runs_allowed,
+            "innings": total_innings,
+            "extra_innings": total_innings > REGULATION_INNINGS,
+            "one_run": abs(runs - runs_allowed) == 1,
+            "shutout": runs_allowed == 0,
+            "walkoff": walkoff,
+            "night_game": _is_night(game.get("game_datetime")),
+            "diff_after_5": diff_after(5),
+            "diff_after_7": diff_after(7),
+            "max_lead": max([0] + diffs) if diffs else None,
+            "max_deficit": max([0] + [-d for d in diffs]) if diffs else None,
+            "starter_decision": starter_decision,
+            "save": save,
+        })
+    return rows
+
+
+def _by_game(df):
+    if df is None or df.empty:
+        return {}
+    return {game_id: group.to_dict("records") for game_id, group in df.groupby("game_id")}
+
+
+def facts_from_tables(games_df, innings_df, team_id=None, pitching_df=None):
+    """game_facts calculados al vuelo desde games + game_innings + pitching_stats (temporadas sin backfill)."""
+    # pandas solo en la app: la ingesta usa build_game_facts y no lo necesita
+    import pandas as pd
+
+    innings_by_game = _by_game(innings_df)
+    pitching_by_game = _by_game(pitching_df)
+
+    rows = []
+    for game in games_df.to_dict("records"):
+        rows += build_game_facts(game, innings_by_game.get(game["id"], []), pitching_by_game.get(game["id"]))
+    facts = pd.DataFrame(rows)
+    if team_id is not None and not facts.empty:
+        facts = facts[facts["team_id"] == team_id]
+    return facts.reset_index(drop=True)
+
+
+def summarize_team_facts(facts):
+    """Splits del tab de Leones a partir de las filas de game_facts del equipo."""
+    import pandas as pd
+
+    if facts.empty:
+        return {}
+
+    facts = facts.sort_values(["game_date", "game_id"]).reset_index(drop=True)
+    won = facts["won"].astype(bool)
+    diff_5 = pd.to_numeric(facts["diff_after_5"], errors="coerce")
+    diff_7 = pd.to_numeric(facts["diff_after_7"], errors="coerce")
+    max_deficit = pd.to_numeric(facts["max_deficit"], errors="coerce")
+    month = pd.to_datetime(facts["game_date"], errors="coerce").dt.month
+
+    def record(mask):
+        wins = int((mask & won).sum())
+        return f"{wins}-{int(mask.sum()) - wins}"
+
+    def month_record(number):
+        wins = int(((month == number) & won).sum())
+        return f"{wins}G-{int((month == number).sum()) - wins}P"
+
+    # Ganados/perdidos según quién se llevó la decisión (juegos sin decisiones no cuentan)
+    starter_decision = facts["starter_decision"] if "starter_decision" in facts else pd.Series(None, index=facts.index)
+    starter = starter_decision.eq(True)
+    reliever = starter_decision.eq(False)
+    saves = facts["save"].eq(True) if "save" in facts else pd.Series(False, index=facts.index)
+
+    # Racha: juegos consecutivos con el resultado del último
+    results = won.tolist()
+    streak_length = 0
+    for result in reversed(results):
+        if result != results[-1]:
+            break
+        streak_length += 1
+    streak = f"{streak_length} {'W' if results[-1] else 'L'}"
+
+    last_10 = won.tail(10)
+    wins = int(won.sum())
+
+    return {
+        'total_games': len(facts),
+        'record': f"{wins}-{len(facts) - wins}",
+        'home_record': record(facts["is_home"].astype(bool)),
+        'away_record': record(~facts["is_home"].astype(bool)),
+        'night_record': record(facts["night_game"].astype(bool)),
+        'shutouts': f"{int(facts['shutout'].astype(bool).sum())}",
+        'streak': streak,
+        'extra_inning': record(facts["extra_innings"].astype(bool)),
+        'last_10': f"{int(last_10.sum())}-{len(last_10) - int(last_10.sum())}",
+        'one_run': record(facts["one_run"].astype(bool)),
+        'comebacks': record(max_deficit > 0),
+        'up': record(diff_7 > 0),
+        'blown_leads': f"{int(facts['walkoff'].astype(bool).sum())}",
+        'starters': record(starter),
+        'relievers': record(reliever),
+        'saves': f"{int(saves.sum())}",
+        'remontados': f"{int(((diff_5 > 0) & ~won).sum())}",
+        'oct': month_record(10),
+        'nov': month_record(11),
+        'dec': month_record(12),
+    }
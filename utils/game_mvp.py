@@ -0,0 +1,40 @@
+# utils/game_mvp.py
+"""
+MVP por WPA del último juego de los Leones (tarjeta de la Home).
+
+Vive fuera de app.py para que la precarga de cachés (utils/warmup.py) llene
+la misma entrada de st.cache_data que usa la página.
+"""
+
+import streamlit as st
+
+from utils.resilience import get_json
+from utils.wpa import TEAM_ID, calculate_player_wpa, compute_feed_wpa, roster_from_boxscore
+
+
+@st.cache_data(ttl=600)
+def get_game_wpa_mvp(game_pk: int) -> dict:
+    """Obtiene el MVP del juego basado en WPA (mismo cálculo que la página de WPA)"""
+    try:
+        url = f"https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
+        feed = get_json(url)
+    except Exception:
+        return None
+
+    df_wpa, _, error = compute_feed_wpa(feed, TEAM_ID)
+    if error or df_wpa.empty:
+        return None
+
+    # El feed trae el boxscore: roster de Leones sin otra request
+    roster_ids = roster_from_boxscore(feed.get("liveData", {}).get("boxscore", {}), TEAM_ID)
+    wpa_total = calculate_player_wpa(df_wpa, roster_ids)
+    if wpa_total.empty:
+        return None
+
+    mvp = wpa_total.iloc[0]
+    return {
+        "name": mvp["player"],
+        "wpa_total": float(mvp["WPA_total"]),
+        "wpa_bat": float(mvp["wpa_bat"]),
+        "wpa_pit": float(mvp["wpa_pit"]),
+    }
@@ -0,0 +1,147 @@
+# utils/head_to_head.py
+"""
+Récord Head to Head de un equipo contra cada rival (tab 🆚 de Standings).
+
+Lógica pura sobre el DataFrame de juegos, separada de la página para poder
+medirla con los benchmarks.
+"""
+
+import pandas as pd
+
+# IDs de los equipos LVBP
+LVBP_TEAMS = {
+    695: "Leones del Caracas",
+    698: "Tiburones de La Guaira",
+    696: "Navegantes del Magallanes",
+    699: "Tigres de Aragua",
+    692: "Águilas del Zulia",
+    693: "Cardenales de Lara",
+    694: "Caribes de Anzoátegui",
+    697: "Bravos de Margarita"
+}
+
+LEONES_ID = 695
+
+
+def short_team_name(team_name: str) -> str:
+    """Nombre corto del equipo para tablas y gráficos"""
+    short_name = team_name.replace(' del ', ' ').replace(' de ', ' ')
+    if 'Tiburones' in short_name:
+        short_name = 'Tiburones'
+    elif 'Navegantes' in short_name:
+        short_name = 'Magallanes'
+    elif 'Tigres' in short_name:
+        short_name = 'Tigres'
+    elif 'Águilas' in short_name:
+        short_name = 'Águilas'
+    elif 'Cardenales' in short_name:
+        short_name = 'Cardenales'
+    elif 'Caribes' in short_name:
+        short_name = 'Caribes'
+    elif 'Bravos' in short_name:
+        short_name = 'Margarita'
+    return short_name
+
+
+def head_to_head_records(games_df: pd.DataFrame, team_id: int = LEONES_ID, teams: dict = None) -> list:
+    """Una fila por rival con JJ, G, P, PCT, Local, Visitante, CF, CP, DIF y Última"""
+    teams = teams or LVBP_TEAMS
+    h2h_data = []
+
+    for rival_id, rival_name in teams.items():
+        if rival_id == team_id:
+            continue  # Saltar Leones vs Leones
+
+        # Filtrar juegos contra este equipo
+        vs_team = games_df[
+            ((games_df['home_team_id'] == team_id) & (games_df['away_team_id'] == rival_id)) |
+            ((games_df['away_team_id'] == team_id) & (games_df['home_team_id'] == rival_id))
+        ]
+
+        short_name = short_team_name(rival_name)
+
+        if len(vs_team) == 0:
+            h2h_data.append({
+                'Rival': short_name,
+                'JJ': 0,
+                'G': 0,
+                'P': 0,
+                'PCT': '.000',
+                'Local': '0-0',
+                'Visitante': '0-0',
+                'CF': 0,
+                'CP': 0,
+                'DIF': 0,
+                'Última': '-'
+            })
+            continue
+
+        # Calcular estadísticas
+        total_games = 0
+        total_wins = 0
+        total_losses = 0
+        home_wins = 0
+        home_losses = 0
+        away_wins = 0
+        away_losses = 0
+        runs_for = 0
+        runs_against = 0
+
+        for _, game in vs_team.iterrows():
+            total_games += 1
+
+            if game['home_team_id'] == team_id:
+                # Jugando de local
+                runs_for += game['home_score'] or 0
+                runs_against += game['away_score'] or 0
+
+                if game['home_score'] > game['away_score']:
+                    total_wins += 1
+                    home_wins += 1
+                else:
+                    total_losses += 1
+                    home_losses += 1
+            else:
+                # Jugando de visitante
+                runs_for += game['away_score'] or 0
+                runs_against += game['home_score'] or 0
+
+                if game['away_score'] > game['home_score']:
+                    total_wins += 1
+                    away_wins += 1
+                else:
+                    total_losses += 1
+                    away_losses += 1
+
+        # Último juego
+        last_game = vs_team.sort_values('game_date').iloc[-1]
+        if last_game['home_team_id'] == team_id:
+            last_result = 'V' if last_game['home_score'] > last_game['away_score'] else 'D'
+            last_score = f"{last_game['home_score']}-{last_game['away_score']}"
+        else:
+            last_result = 'V' if last_game['away_score'] > last_game['home_score'] else 'D'
+            last_score = f"{last_game['away_score']}-{last_game['home_score']}"
+
+        try:
+            last_date = pd.to_datetime(last_game['game_date']).strftime('%d/%m')
+        except:
+            last_date = ''
+
+        # Calcular PCT
+        pct = total_wins / total_games if total_games > 0 else 0
+
+        h2h_data.append({
+            'Rival': short_name,
+            'JJ': total_games,
+            'G': total_wins,
+            'P': total_losses,
+            'PCT': f'.{int(pct*1000):03d}',
+            'Local': f'{home_wins}-{home_losses}',
+            'Visitante': f'{away_wins}-{away_losses}',
+            'CF': runs_for,
+            'CP': runs_against,
+            'DIF': runs_for - runs_against,
+            'Última': f'{last_result} {last_score} ({last_date})' if last_date else f'{last_result} {last_score}'
+        })
+
+    return h2h_data
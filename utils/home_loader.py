@@ -0,0 +1,80 @@
+# utils/home_loader.py
+"""
+Carga en paralelo de los datos de la Home.
+
+`load_home_data()` lanza todos los loaders independientes a la vez en un pool
+de hilos (con el contexto de la sesión, para que st.cache_data y st.secrets
+funcionen en los hilos) y retorna sus futures. La página espera cada uno con
+`wait_for()` justo donde lo dibuja, con un skeleton mientras llega: en frío
+la Home tarda lo del loader más lento en lugar de la suma de todos.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from utils.game_mvp import get_game_wpa_mvp
+from utils.live import get_live_game
+from utils.supabase_client import (
+    get_batting_stats,
+    get_leones_advanced_stats,
+    get_pitching_stats,
+    get_recent_games,
+    get_standings,
+)
+
+LEONES_ID = 695
+MAX_WORKERS = 8
+
+SKELETON_HTML = """
+<div style='height: {height}px; border-radius: 0.75rem; margin-bottom: 1rem;
+            background: linear-gradient(90deg, #1a1a2e 25%, #2a2a4e 50%, #1a1a2e 75%);
+            background-size: 200% 100%; animation: skeleton-pulse 1.2s ease-in-out infinite;'></div>
+<style>
+@keyframes skeleton-pulse {{ 0% {{ background-position: 200% 0; }} 100% {{ background-position: -200% 0; }} }}
+</style>
+"""
+
+
+def _last_game_mvp(last_game_future):
+    """MVP por WPA del último juego (depende del future del último juego)"""
+    recent_games = last_game_future.result()
+    if recent_games.empty or not recent_games.iloc[0].get("id"):
+        return None
+    return get_game_wpa_mvp(recent_games.iloc[0]["id"])
+
+
+def load_home_data(season) -> dict:
+    """Lanza los loaders de la Home en paralelo; retorna {sección: future}."""
+    pool = ThreadPoolExecutor(
+        max_workers=MAX_WORKERS,
+        thread_name_prefix="home",
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx()),
+    )
+    futures = {
+        "standings": pool.submit(get_standings, season),
+        "last_game": pool.submit(get_recent_games, team_id=LEONES_ID, limit=1),
+        "recent_10": pool.submit(get_recent_games, team_id=LEONES_ID, limit=10),
+        "batting": pool.submit(get_batting_stats, team_id=LEONES_ID, limit=10, season=season),
+        "pitching": pool.submit(get_pitching_stats, team_id=LEONES_ID, limit=10, season=season),
+        "advanced": pool.submit(get_leones_advanced_stats, season),
+        "live_game": pool.submit(get_live_game, LEONES_ID),
+    }
+    futures["mvp"] = pool.submit(_last_game_mvp, futures["last_game"])
+    # Las tareas pendientes siguen corriendo; no se bloquea el script aquí
+    pool.shutdown(wait=False)
+    return futures
+
+
+def wait_for(future, height=120):
+    """Resultado del future; mientras llega se muestra un skeleton de `height` px"""
+    if future.done():
+        return future.result()
+    placeholder = st.empty()
+    placeholder.markdown(SKELETON_HTML.format(height=height), unsafe_allow_html=True)
+    try:
+        return future.result()
+    finally:
+        placeholder.empty()
@@ -0,0 +1,284 @@
+# utils/ingest_metrics.py
+"""
+Instrumentación del job de ingesta: tiempos por etapa, conteo de llamadas a
+statsapi y Supabase, bytes transferidos, reintentos y fallos.
+
+Uso:
+    report = start_run("update_daily")
+    with report.stage("update_yesterdays_games"):
+        schedule = statsapi_get("schedule", {...})
+        execute(supabase.table("games").upsert(record))
+    print(report.to_json())
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.resilience import SUPABASE_HOST, call_with_retry
+
+SERVICES = ("statsapi", "supabase")
+
+# Si una etapa tarda más que esto respecto a la corrida anterior se marca como regresión
+REGRESSION_THRESHOLD = 1.25
+
+_active_report = None
+
+
+def _payload_size(data):
+    """Tamaño aproximado en bytes del JSON recibido/enviado."""
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _empty_counters():
+    counters = {"wall_time_s": 0.0, "retries": 0, "failures": 0}
+    for service in SERVICES:
+        counters[f"{service}_calls"] = 0
+        counters[f"{service}_bytes"] = 0
+    return counters
+
+
+class RunReport:
+    """Acumula métricas de una corrida de ingesta, agrupadas por etapa."""
+
+    def __init__(self, job):
+        self.job = job
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.stages = {}
+        self.errors = []
+        self.dead_letters = []
+        self.regressions = []
+        self._stack = []
+        self._t0 = time.perf_counter()
+
+    @property
+    def current_stage(self):
+        return self._stack[-1] if self._stack else "main"
+
+    def _counters(self, stage_name=None):
+        return self.stages.setdefault(stage_name or self.current_stage, _empty_counters())
+
+    @contextmanager
+    def stage(self, name):
+        """Mide el tiempo de pared de una etapa; las llamadas dentro se le atribuyen."""
+        self._counters(name)
+        self._stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield self
+        except BaseException as e:
+            # Registrar el fallo una sola vez aunque atraviese etapas anidadas
+            if not getattr(e, "_ingest_recorded", False):
+                self.record_failure(e)
+                try:
+                    e._ingest_recorded = True
+                except AttributeError:
+                    pass
+            raise
+        finally:
+            self._stack.pop()
+            self.stages[name]["wall_time_s"] += round(time.perf_counter() - t0, 4)
+
+    def record_call(self, service, nbytes=0):
+        counters = self._counters()
+        counters[f"{service}_calls"] += 1
+        counters[f"{service}_bytes"] += int(nbytes)
+
+    def record_retry(self, service=None):
+        self._counters()["retries"] += 1
+
+    def record_failure(self, error, context=None):
+        self._counters()["failures"] += 1
+        # Guardar solo una muestra acotada de mensajes
+        if len(self.errors) < 50:
+            self.errors.append({
+                "stage": self.current_stage,
+                "context": context,
+                "error": str(error)[:200],
+            })
+
+    def record_dead_letter(self, kind, key):
+        """Elemento que queda pendiente para la próxima corrida"""
+        self.dead_letters.append({"stage": self.current_stage, "kind": kind, "key": str(key)})
+
+    def totals(self):
+        totals = _empty_counters()
+        for counters in self.stages.values():
+            for key, value in counters.items():
+                totals[key] += value
+        totals["wall_time_s"] = round(time.perf_counter() - self._t0, 4) if self.finished_at is None \
+            else round((self.finished_at - self.started_at).total_seconds(), 4)
+        return totals
+
+    def finish(self):
+        self.finished_at = datetime.now(timezone.utc)
+        return self
+
+    @property
+    def status(self):
+        failures = sum(c["failures"] for c in self.stages.values())
+        return "ok" if failures == 0 else "partial"
+
+    def compare_with(self, previous_report):
+        """Marca etapas cuyo tiempo supera REGRESSION_THRESHOLD x la corrida anterior."""
+        self.regressions = []
+        previous_stages = (previous_report or {}).get("stages", {})
+        for name, counters in self.stages.items():
+            before = previous_stages.get(name, {}).get("wall_time_s")
+            now = counters["wall_time_s"]
+            if before and now > before * REGRESSION_THRESHOLD and now - before > 1.0:
+                self.regressions.append({
+                    "stage": name,
+                    "previous_s": before,
+                    "current_s": now,
+                    "ratio": round(now / before, 2),
+                })
+        return self.regressions
+
+    def to_dict(self):
+        return {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "status": self.status,
+            "totals": self.totals(),
+            "stages": self.stages,
+            "errors": self.errors,
+            "dead_letters": self.dead_letters,
+            "regressions": self.regressions,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, default=str)
+
+    def to_markdown(self):
+        """Tabla resumen (útil para $GITHUB_STEP_SUMMARY)."""
+        lines = [
+            f"### Ingesta `{self.job}` - {self.status}",
+            "",
+            "| Etapa | Tiempo (s) | statsapi | Supabase | KB | Reintentos | Fallos |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        for name, c in list(self.stages.items()) + [("**total**", self.totals())]:
+            kb = (c["statsapi_bytes"] + c["supabase_bytes"]) / 1024
+            lines.append(
+                f"| {name} | {c['wall_time_s']:.2f} | {c['statsapi_calls']} | {c['supabase_calls']} "
+                f"| {kb:.1f} | {c['retries']} | {c['failures']} |"
+            )
+        if self.dead_letters:
+            keys = ", ".join(f"{d['kind']} {d['key']}" for d in self.dead_letters[:20])
+            lines.append(f"\n📮 Pendientes para la próxima corrida ({len(self.dead_letters)}): {keys}")
+        for r in self.regressions:
+            lines.append(f"\n⚠️ Regresión en `{r['stage']}`: {r['previous_s']:.2f}s → {r['current_s']:.2f}s (x{r['ratio']})")
+        return "\n".join(lines)
+
+    def write(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def to_row(self):
+        """Fila para la tabla ingest_runs."""
+        totals = self.totals()
+        return {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "status": self.status,
+            "duration_s": totals["wall_time_s"],
+            "statsapi_calls": totals["statsapi_calls"],
+            "supabase_calls": totals["supabase_calls"],
+            "bytes_transferred": totals["statsapi_bytes"] + totals["supabase_bytes"],
+            "retries": totals["retries"],
+            "failures": totals["failures"],
+            "report": self.to_dict(),
+        }
+
+
+class _NullReport(RunReport):
+    """Reporte que descarta todo; se usa cuando no hay corrida activa."""
+
+    def __init__(self):
+        super().__init__("inactive")
+
+    def record_call(self, service, nbytes=0):
+        pass
+
+    def record_retry(self, service=None):
+        pass
+
+    def record_failure(self, error, context=None):
+        pass
+
+    def record_dead_letter(self, kind, key):
+        pass
+
+
+_null_report = _NullReport()
+
+
+def start_run(job):
+    global _active_report
+    _active_report = RunReport(job)
+    return _active_report
+
+
+def get_report():
+    return _active_report or _null_report
+
+
+def execute(query):
+    """Ejecuta un query de Supabase con reintentos, registrando llamadas, bytes y reintentos."""
+    report = get_report()
+
+    def run():
+        try:
+            response = query.execute()
+        except Exception:
+            report.record_call("supabase")
+            raise
+        report.record_call("supabase", _payload_size(getattr(response, "data", None)))
+        return response
+
+    return call_with_retry(run, SUPABASE_HOST, on_retry=lambda e, attempt: report.record_retry("supabase"))
+
+
+def record_statsapi_call(result):
+    get_report().record_call("statsapi", _payload_size(result))
+    return result
+
+
+def load_previous_report(supabase, job):
+    """Último reporte persistido del job (None si la tabla no existe o está vacía)."""
+    try:
+        response = supabase.table("ingest_runs") \
+            .select("report") \
+            .eq("job", job) \
+            .order("started_at", desc=True) \
+            .limit(1) \
+            .execute()
+        if response.data:
+            return response.data[0].get("report")
+    except Exception:
+        pass
+    return None
+
+
+def persist_report(supabase, report):
+    """Guarda la corrida en ingest_runs; un fallo aquí no debe tumbar el job."""
+    try:
+        supabase.table("ingest_runs").insert(report.to_row()).execute()
+        return True
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar el reporte en ingest_runs: {str(e)[:100]}")
+        return False
@@ -0,0 +1,209 @@
+# utils/live.py
+"""
+Modo en vivo: seguimiento de un juego en curso de los Leones.
+
+`LiveGameTracker` baja el feed completo una sola vez y después pide solo los
+cambios con el endpoint `feed/live/diffPatch` (JSON Patch desde el último
+timecode). Las jugadas nuevas completas se aplican al WPAState, así cada
+refresco procesa unas pocas jugadas en lugar del feed entero.
+
+El tracker se comparte entre todas las sesiones (st.cache_resource) y hace
+como máximo un poll por POLL_INTERVAL_S, sin importar cuántos usuarios vean
+el juego.
+"""
+
+import copy
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils.resilience import get_json
+from utils.wpa import TEAM_ID, WPAState, feed_team_is_home
+
+STATSAPI_LIVE = "https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
+STATSAPI_SCHEDULE = "https://statsapi.mlb.com/api/v1/schedule"
+
+# Segundos entre polls a statsapi (y entre refrescos de los fragments)
+POLL_INTERVAL_S = 15
+
+
+class PatchError(Exception):
+    """El patch no aplica sobre el feed local (se vuelve a bajar completo)."""
+
+
+def _pointer(path):
+    """'/liveData/plays/allPlays/3' -> ['liveData', 'plays', 'allPlays', '3'] (RFC 6901)"""
+    if path == "":
+        return []
+    return [part.replace("~1", "/").replace("~0", "~") for part in path.lstrip("/").split("/")]
+
+
+def _resolve(doc, parts):
+    for part in parts:
+        doc = doc[int(part)] if isinstance(doc, list) else doc[part]
+    return doc
+
+
+def apply_patch(doc, operations):
+    """Aplica operaciones JSON Patch (RFC 6902) sobre `doc` en el lugar."""
+    for op in operations:
+        try:
+            kind = op["op"]
+            parts = _pointer(op["path"])
+            parent = _resolve(doc, parts[:-1])
+            key = parts[-1]
+            if isinstance(parent, list):
+                key = len(parent) if key == "-" else int(key)
+
+            if kind == "add":
+                if isinstance(parent, list):
+                    parent.insert(key, op["value"])
+                else:
+                    parent[key] = op["value"]
+            elif kind == "replace":
+                parent[key] = op["value"]
+            elif kind == "remove":
+                del parent[key]
+            elif kind in ("copy", "move"):
+                source_parts = _pointer(op["from"])
+                value = copy.deepcopy(_resolve(doc, source_parts))
+                if kind == "move":
+                    source_parent = _resolve(doc, source_parts[:-1])
+                    source_key = source_parts[-1]
+                    del source_parent[int(source_key) if isinstance(source_parent, list) else source_key]
+                apply_patch(doc, [{"op": "add", "path": op["path"], "value": value}])
+            elif kind == "test":
+                if _resolve(doc, parts) != op["value"]:
+                    raise PatchError(f"test falló en {op['path']}")
+            else:
+                raise PatchError(f"operación desconocida: {kind}")
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            raise PatchError(f"{op.get('op')} {op.get('path')}: {e}") from e
+    return doc
+
+
+class LiveGameTracker:
+    """Feed local del juego + WPAState, actualizados por diffs desde statsapi."""
+
+    def __init__(self, game_pk, team_id=TEAM_ID, fetch_json=get_json):
+        self.game_pk = game_pk
+        self.team_id = team_id
+        self.fetch_json = fetch_json
+        self.feed = None
+        self.timecode = None
+        self.state = None
+        self.applied = 0
+        self.polled_at = None
+        self.full_fetches = 0
+        self.patches = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return STATSAPI_LIVE.format(game_pk=self.game_pk)
+
+    def _load_full(self):
+        self.feed = self.fetch_json(self.url)
+        self.full_fetches += 1
+        # El feed completo puede reordenar jugadas: se recalcula el WPA desde cero
+        self.state = None
+        self.applied = 0
+
+    def _load_diff(self):
+        response = self.fetch_json(f"{self.url}/diffPatch", params={"startTimecode": self.timecode})
+        # Si hay demasiados cambios statsapi responde con el feed completo
+        if isinstance(response, dict) and "gameData" in response:
+            self.feed = response
+            self.full_fetches += 1
+            self.state = None
+            self.applied = 0
+            return
+        for entry in response or []:
+            apply_patch(self.feed, entry.get("diff", []) if isinstance(entry, dict) else entry)
+            self.patches += 1
+
+    def _apply_new_plays(self):
+        """Aplica las jugadas completas que aún no están en el WPAState; retorna sus filas."""
+        if self.state is None:
+            team_is_home = feed_team_is_home(self.feed, self.team_id)
+            if team_is_home is None:
+                return []
+            self.state = WPAState(team_is_home, self.team_id)
+
+        plays = self.feed.get("liveData", {}).get("plays", {}).get("allPlays", [])
+        new_rows = []
+        # La jugada en curso (isComplete=False) todavía puede cambiar
+        for play in plays[self.applied:]:
+            if not play.get("about", {}).get("isComplete", True):
+                break
+            new_rows.append(self.state.apply_play(play))
+            self.applied += 1
+        return new_rows
+
+    def poll(self, force=False):
+        """Trae los cambios desde el último poll; retorna las filas de WPA nuevas."""
+        with self._lock:
+            if not force and self.polled_at and time.monotonic() - self.polled_at < POLL_INTERVAL_S:
+                return []
+            self.polled_at = time.monotonic()
+
+            if self.feed is None or not self.timecode:
+                self._load_full()
+            else:
+                try:
+                    self._load_diff()
+                except PatchError:
+                    self._load_full()
+
+            self.timecode = self.feed.get("metaData", {}).get("timeStamp")
+            return self._apply_new_plays()
+
+    @property
+    def status(self):
+        return (self.feed or {}).get("gameData", {}).get("status", {}).get("abstractGameState", "Preview")
+
+    @property
+    def is_final(self):
+        return self.status == "Final"
+
+    def linescore(self):
+        return (self.feed or {}).get("liveData", {}).get("linescore", {})
+
+    def current_play(self):
+        return (self.feed or {}).get("liveData", {}).get("plays", {}).get("currentPlay", {})
+
+    def frame(self):
+        """DataFrame de WPA como el de compute_feed_wpa (sin fijar el WP final mientras se juega)"""
+        if self.state is None:
+            return pd.DataFrame()
+        return self.state.to_frame(final=self.is_final)
+
+
+def inning_label(linescore):
+    """'Alta 5' / 'Baja 7' a partir del linescore del feed"""
+    half = {"Top": "Alta", "Middle": "Mitad", "Bottom": "Baja", "End": "Fin"}.get(linescore.get("inningHalf"), "")
+    return f"{half} {linescore.get('currentInning', '')}".strip()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_live_game(team_id=TEAM_ID):
+    """Juego en curso del equipo hoy (dict del schedule) o None"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        schedule = get_json(STATSAPI_SCHEDULE, params={"sportId": 17, "teamId": team_id, "date": today})
+    except Exception:
+        return None
+    for date in schedule.get("dates", []):
+        for game in date.get("games", []):
+            if game.get("status", {}).get("abstractGameState") == "Live":
+                return game
+    return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_live_tracker(game_pk, team_id=TEAM_ID):
+    """Tracker compartido por todas las sesiones que ven el juego"""
+    return LiveGameTracker(game_pk, team_id)
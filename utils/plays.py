@@ -0,0 +1,245 @@
+# utils/plays.py
+"""
+Turnos al bate (y opcionalmente lanzamientos) desde el feed live de statsapi.
+
+La ingesta guarda una fila por turno en `plate_appearances`: bateador,
+pitcher, mano de cada uno, conteo, outs y bases antes del turno, evento y
+carreras. Con eso los splits (vs zurdos/derechos, RISP, late & close) y los
+duelos bateador-pitcher son agregaciones sobre una tabla indexada, sin volver
+a bajar feeds.
+"""
+
+BASES = ("1B", "2B", "3B")
+
+HIT_EVENTS = {"single", "double", "triple", "home_run"}
+TOTAL_BASES = {"single": 1, "double": 2, "triple": 3, "home_run": 4}
+WALK_EVENTS = {"walk", "intent_walk"}
+STRIKEOUT_EVENTS = {"strikeout", "strikeout_double_play", "strikeout_triple_play"}
+# Turnos que no cuentan como turno oficial (AB)
+NON_AB_EVENTS = WALK_EVENTS | {
+    "hit_by_pitch", "sac_fly", "sac_bunt", "sac_fly_double_play", "sac_bunt_double_play",
+    "catcher_interf", "fielder_interference",
+}
+
+# Jugadas de corredores que cierran una entrada de allPlays sin completar el
+# turno (el bateador vuelve a batear después): no son turnos
+RUNNER_EVENTS = {
+    "caught_stealing_2b", "caught_stealing_3b", "caught_stealing_home",
+    "stolen_base_2b", "stolen_base_3b", "stolen_base_home",
+    "pickoff_1b", "pickoff_2b", "pickoff_3b",
+    "pickoff_caught_stealing_2b", "pickoff_caught_stealing_3b", "pickoff_caught_stealing_home",
+    "pickoff_error_1b", "pickoff_error_2b", "pickoff_error_3b",
+    "wild_pitch", "passed_ball", "balk", "other_advance", "defensive_indiff",
+    "runner_double_play", "cs_double_play",
+}
+
+# Splits de bateo: nombre -> filtro sobre el DataFrame de turnos
+SPLITS = {
+    "Total": lambda pa: pa.index == pa.index,
+    "vs Zurdos": lambda pa: pa["pitch_hand"] == "L",
+    "vs Derechos": lambda pa: pa["pitch_hand"] == "R",
+    "RISP": lambda pa: pa["risp"].astype(bool),
+    "Bases vacías": lambda pa: pa["base_state"] == 0,
+    "Late & close": lambda pa: pa["late_close"].astype(bool),
+}
+
+# Columnas de plate_appearances que usan los splits y los duelos
+SPLIT_COLUMNS = [
+    "game_id", "at_bat_index", "batter_id", "pitcher_id", "pitch_hand", "base_state", "risp", "late_close",
+    "event_type", "is_ab", "is_hit", "total_bases", "is_walk", "is_strikeout", "is_hbp", "is_sac_fly",
+]
+
+
+def event_type(result):
+    """eventType del resultado ('home_run'); los feeds viejos solo traen el evento ('Home Run')"""
+    return result.get("eventType") or result.get("event", "").lower().replace(" ", "_")
+
+
+def is_plate_appearance(result):
+    """False para las jugadas de corredores (robos, outs en las bases, wild pitch...)"""
+    return result.get("type", "atBat") == "atBat" and event_type(result) not in RUNNER_EVENTS
+
+
+def runners_on(base_state):
+    """Corredores en base según la máscara de bits de base_state"""
+    return bin(int(base_state)).count("1")
+
+
+def late_close(inning, bat_score, fld_score, runners):
+    """7mo o después con el bateador empatado, arriba por 1 o con la carrera del empate en el círculo"""
+    if inning < 7:
+        return False
+    diff = bat_score - fld_score
+    return 0 <= diff <= 1 or (diff < 0 and -diff <= runners + 2)
+
+
+def parse_plays(feed, game_id, season=None, with_pitches=False):
+    """
+    Registros de plate_appearances (y pitches si `with_pitches`) del feed.
+
+    Outs, bases y marcador antes de cada turno se reconstruyen recorriendo las
+    jugadas en orden, igual que WPAState. Las jugadas de corredores no generan
+    turno: sus outs y carreras se suman al turno anterior de la misma media
+    entrada, como lo demás que pasa entre turnos (así la media entrada cierra
+    con 3 outs para RE24 y win expectancy).
+    """
+    home_id = feed.get("gameData", {}).get("teams", {}).get("home", {}).get("id")
+    away_id = feed.get("gameData", {}).get("teams", {}).get("away", {}).get("id")
+
+    pa_records, pitch_records = [], []
+    scores = {"home": 0, "away": 0}
+    bases = {}
+    outs = 0
+    current_half = None
+
+    for play in feed.get("liveData", {}).get("plays", {}).get("allPlays", []):
+        about = play.get("about", {})
+        if not about.get("isComplete", True):
+            break
+        result = play.get("result", {})
+        matchup = play.get("matchup", {})
+        count = play.get("count", {})
+
+        inning = about.get("inning", 1)
+        half = about.get("halfInning", "top")
+        if (inning, half) != current_half:
+            current_half = (inning, half)
+            bases, outs = {}, 0
+
+        batting_side, fielding_side = ("away", "home") if half == "top" else ("home", "away")
+        base_state = sum(1 << i for i, base in enumerate(BASES) if base in bases)
+        runners = len(bases)
+        bat_score, fld_score = scores[batting_side], scores[fielding_side]
+        kind = event_type(result)
+
+        # Movimiento de corredores en orden: origen libre, destino ocupado (si no fue out)
+        runs = 0
+        for runner in play.get("runners", []):
+            movement = runner.get("movement", {})
+            runner_id = runner.get("details", {}).get("runner", {}).get("id")
+            start, end = movement.get("start"), movement.get("end")
+            if start in bases and bases[start] == runner_id:
+                del bases[start]
+            if movement.get("isOut"):
+                continue
+            if end == "score":
+                runs += 1
+            elif end in BASES:
+                bases[end] = runner_id
+        scores[batting_side] += runs
+        outs_after = count.get("outs", outs)
+
+        batter = matchup.get("batter", {})
+        pitcher = matchup.get("pitcher", {})
+        at_bat_index = about.get("atBatIndex", len(pa_records))
+        if is_plate_appearance(result):
+            pa_records.append({
+                "game_id": game_id,
+                "season": season,
+                "at_bat_index": at_bat_index,
+                "inning": inning,
+                "half_inning": half,
+                "batter_id": batter.get("id"),
+                "batter_team_id": batter.get("parentTeamId") or (home_id if batting_side == "home" else away_id),
+                "pitcher_id": pitcher.get("id"),
+                "pitcher_team_id": pitcher.get("parentTeamId") or (home_id if fielding_side == "home" else away_id),
+                "bat_side": matchup.get("batSide", {}).get("code"),
+                "pitch_hand": matchup.get("pitchHand", {}).get("code"),
+                "balls": count.get("balls"),
+                "strikes": count.get("strikes"),
+                "outs_before": outs,
+                "outs_after": outs_after,
+                "base_state": base_state,
+                "risp": bool(base_state & 0b110),
+                "bat_score": bat_score,
+                "fld_score": fld_score,
+                "late_close": late_close(inning, bat_score, fld_score, runners),
+                "event": result.get("event"),
+                "event_type": kind,
+                "is_ab": kind not in NON_AB_EVENTS,
+                "is_hit": kind in HIT_EVENTS,
+                "total_bases": TOTAL_BASES.get(kind, 0),
+                "is_walk": kind in WALK_EVENTS,
+                "is_strikeout": kind in STRIKEOUT_EVENTS,
+                "is_hbp": kind == "hit_by_pitch",
+                "is_sac_fly": kind in ("sac_fly", "sac_fly_double_play"),
+                "rbi": result.get("rbi", 0),
+                "runs_scored": runs,
+            })
+        elif pa_records and (pa_records[-1]["inning"], pa_records[-1]["half_inning"]) == current_half:
+            pa_records[-1]["outs_after"] = outs_after
+            pa_records[-1]["runs_scored"] += runs
+        outs = outs_after
+
+        if with_pitches:
+            for event in play.get("playEvents", []):
+                if not event.get("isPitch"):
+                    continue
+                details = event.get("details", {})
+                pitch_data = event.get("pitchData", {})
+                pitch_count = event.get("count", {})
+                pitch_records.append({
+                    "game_id": game_id,
+                    "season": season,
+                    "at_bat_index": at_bat_index,
+                    "pitch_number": event.get("pitchNumber"),
+                    "batter_id": batter.get("id"),
+                    "pitcher_id": pitcher.get("id"),
+                    "pitch_type": details.get("type", {}).get("code"),
+                    "call_code": details.get("call", {}).get("code"),
+                    "is_strike": details.get("isStrike"),
+                    "is_in_play": details.get("isInPlay"),
+                    "balls": pitch_count.get("balls"),
+                    "strikes": pitch_count.get("strikes"),
+                    "start_speed": pitch_data.get("startSpeed"),
+                    "zone": pitch_data.get("zone"),
+                })
+
+    return pa_records, pitch_records
+
+
+def batting_line(pa):
+    """PA, AB, H, HR, BB, K, AVG, OBP, SLG y OPS de un conjunto de turnos"""
+    ab = int(pa["is_ab"].sum())
+    hits = int(pa["is_hit"].sum())
+    walks = int(pa["is_walk"].sum())
+    hbp = int(pa["is_hbp"].sum())
+    sf = int(pa["is_sac_fly"].sum())
+    obp_den = ab + walks + hbp + sf
+    avg = hits / ab if ab else 0.0
+    obp = (hits + walks + hbp) / obp_den if obp_den else 0.0
+    slg = pa["total_bases"].sum() / ab if ab else 0.0
+    return {
+        "pa": len(pa),
+        "ab": ab,
+        "h": hits,
+        "hr": int((pa["event_type"] == "home_run").sum()),
+        "bb": walks,
+        "so": int(pa["is_strikeout"].sum()),
+        "avg": round(avg, 3),
+        "obp": round(obp, 3),
+        "slg": round(slg, 3),
+        "ops": round(obp + slg, 3),
+    }
+
+
+def batting_splits(pa):
+    """Una fila por (bateador, split) con su línea de bateo"""
+    # Import diferido: parse_plays corre en la ingesta, que no carga pandas
+    import pandas as pd
+
+    rows = []
+    for batter_id, batter_pa in pa.groupby("batter_id"):
+        for split, condition in SPLITS.items():
+            subset = batter_pa[condition(batter_pa)]
+            if not subset.empty:
+                rows.append({"player_id": batter_id, "split": split, **batting_line(subset)})
+    return pd.DataFrame(rows)
+
+
+def matchup_lines(pa, by="pitcher_id"):
+    """Línea de bateo por rival (pitcher_id o batter_id) de un conjunto de turnos"""
+    import pandas as pd
+
+    rows = [{by: key, **batting_line(group)} for key, group in pa.groupby(by)]
+    return pd.DataFrame(rows).sort_values("pa", ascending=False) if rows else pd.DataFrame()
@@ -0,0 +1,289 @@
+# utils/resilience.py
+"""
+Capa de resiliencia para statsapi y Supabase.
+
+- Reintentos con backoff exponencial y jitter ("full jitter") solo para
+  errores transitorios (red, timeouts, 429 y 5xx).
+- Límite de requests simultáneas por host.
+- Circuit breaker por host: tras varios fallos seguidos se falla de inmediato
+  (CircuitOpenError) hasta que pasa el tiempo de enfriamiento.
+- Dead letters: juegos/fechas que fallaron en la ingesta, guardados en
+  `ingest_dead_letters` para reintentarlos en la siguiente corrida.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+STATSAPI_HOST = "statsapi.mlb.com"
+SUPABASE_HOST = "supabase"
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Códigos transitorios de postgrest.APIError (sin status HTTP): PostgREST sin
+# conexión a la base o caché de esquema cargando (PGRST000-003), y de Postgres:
+# conexión (clase 08), serialización/deadlock, statement timeout y
+# demasiadas conexiones
+RETRYABLE_POSTGREST_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+RETRYABLE_POSTGRES_CODES = {"40001", "40P01", "57014", "53300"}
+
+# Requests simultáneas por host (el resto espera turno)
+HOST_LIMITS = {STATSAPI_HOST: 8}
+DEFAULT_HOST_LIMIT = 16
+
+# (conexión, lectura) para la app: mejor fallar rápido que bloquear la página
+APP_TIMEOUT = (3.05, 10)
+
+BASE_DELAY_S = 0.5
+MAX_DELAY_S = 8.0
+
+# Reintentos máximos de un dead letter antes de abandonarlo
+MAX_DEAD_LETTER_ATTEMPTS = 5
+
+
+class CircuitOpenError(Exception):
+    """El host acumuló demasiados fallos seguidos; no se intenta la request."""
+
+
+class CircuitBreaker:
+    """Abierto tras `failure_threshold` fallos seguidos; semiabierto pasado `reset_timeout_s`."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout_s=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout_s:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """False mientras está abierto; en semiabierto deja pasar requests de prueba"""
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_semaphores = {}
+_registry_lock = threading.Lock()
+
+
+def breaker_for(host) -> CircuitBreaker:
+    with _registry_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def semaphore_for(host) -> threading.BoundedSemaphore:
+    with _registry_lock:
+        if host not in _semaphores:
+            _semaphores[host] = threading.BoundedSemaphore(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+        return _semaphores[host]
+
+
+def reset():
+    """Cierra todos los circuitos (p. ej. entre benchmarks)"""
+    with _registry_lock:
+        _breakers.clear()
+
+
+def backoff_delay(attempt, base=BASE_DELAY_S, cap=MAX_DELAY_S):
+    """Espera antes del reintento `attempt` (0, 1, ...): uniforme en [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _status_code(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _postgrest_retryable(error):
+    """
+    Clasifica un postgrest.APIError por su `code`, que puede ser un status
+    HTTP ("503"), un código de PostgREST ("PGRST003") o uno de Postgres
+    ("57014"). None si no es un APIError.
+    """
+    try:
+        from postgrest.exceptions import APIError
+    except ImportError:
+        return None
+    if not isinstance(error, APIError):
+        return None
+    code = str(error.code or "")
+    if code.isdigit() and len(code) == 3:
+        return int(code) in RETRYABLE_STATUS
+    return code in RETRYABLE_POSTGREST_CODES or code in RETRYABLE_POSTGRES_CODES or code.startswith("08")
+
+
+def is_retryable(error):
+    """True para errores transitorios: red, timeouts, 429 y 5xx"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    postgrest_retryable = _postgrest_retryable(error)
+    if postgrest_retryable is not None:
+        return postgrest_retryable
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+def call_with_retry(fn, host, retries=3, on_retry=None, sleep=time.sleep):
+    """
+    Ejecuta `fn()` con reintentos, límite por host y circuit breaker.
+
+    `on_retry(error, attempt)` se llama antes de cada reintento (p. ej. para
+    contarlo en el reporte de la corrida).
+    """
+    breaker = breaker_for(host)
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host}: circuito abierto tras {breaker.failures} fallos seguidos")
+        try:
+            with semaphore_for(host):
+                result = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                # El host respondió (p. ej. 404 o error de esquema): no cuenta para el circuito
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            if on_retry:
+                on_retry(e, attempt)
+            sleep(backoff_delay(attempt))
+        else:
+            breaker.record_success()
+            return result
+
+
+async def async_call_with_retry(make_coro, host, retries=3, on_retry=None):
+    """Versión asíncrona de call_with_retry; `make_coro()` crea una corrutina nueva por intento."""
+    breaker = breaker_for(host)
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host}: circuito abierto tras {breaker.failures} fallos seguidos")
+        try:
+            result = await make_coro()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            if on_retry:
+                on_retry(e, attempt)
+            await asyncio.sleep(backoff_delay(attempt))
+        else:
+            breaker.record_success()
+            return result
+
+
+def get_json(url, timeout=APP_TIMEOUT, retries=1, **kwargs):
+    """GET con reintentos y circuit breaker; lanza la excepción si no hay respuesta válida."""
+    def fetch():
+        response = requests.get(url, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    return call_with_retry(fetch, urlparse(url).hostname, retries=retries)
+
+
+# ============================================================
+# DEAD LETTERS (ingesta)
+# ============================================================
+
+def _execute(query):
+    return query.execute()
+
+
+class DeadLetters:
+    """
+    Elementos que fallaron en una corrida (kind="game_stats" con el gamePk o
+    kind="schedule" con la fecha) para reintentarlos en la siguiente.
+    """
+
+    def __init__(self, supabase, job, execute=_execute):
+        self.supabase = supabase
+        self.job = job
+        self.execute = execute
+        self.added = []
+        self.resolved = []
+
+    def add(self, kind, key, error, context=None):
+        """Registra (o vuelve a registrar) el fallo; un error aquí no debe tumbar el job."""
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            existing = self.execute(self.supabase.table("ingest_dead_letters") \
+                .select("attempts") \
+                .eq("kind", kind) \
+                .eq("key", str(key)) \
+                .limit(1)).data
+            attempts = (existing[0]["attempts"] if existing else 0) + 1
+            self.execute(self.supabase.table("ingest_dead_letters").upsert({
+                "kind": kind,
+                "key": str(key),
+                "job": self.job,
+                "context": context,
+                "error": str(error)[:500],
+                "attempts": attempts,
+                "last_failed_at": now,
+            }))
+            self.added.append({"kind": kind, "key": str(key), "attempts": attempts})
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el dead letter {kind} {key}: {str(e)[:100]}")
+
+    def pending(self, kind=None, max_attempts=MAX_DEAD_LETTER_ATTEMPTS):
+        """Dead letters a reintentar (los que superan `max_attempts` se dejan para revisión manual)."""
+        try:
+            query = self.supabase.table("ingest_dead_letters") \
+                .select("kind, key, attempts") \
+                .lte("attempts", max_attempts) \
+                .order("last_failed_at")
+            if kind:
+                query = query.eq("kind", kind)
+            return self.execute(query).data or []
+        except Exception as e:
+            print(f"⚠️ No se pudieron leer los dead letters: {str(e)[:100]}")
+            return []
+
+    def resolve(self, kind, key):
+        try:
+            self.execute(self.supabase.table("ingest_dead_letters") \
+                .delete() \
+                .eq("kind", kind) \
+                .eq("key", str(key)))
+            self.resolved.append({"kind": kind, "key": str(key)})
+        except Exception as e:
+            print(f"⚠️ No se pudo resolver el dead letter {kind} {key}: {str(e)[:100]}")
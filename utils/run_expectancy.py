@@ -0,0 +1,148 @@
+# utils/run_expectancy.py
+"""
+Run expectancy por estado base-out (matriz RE24) y RE24 por turno al bate.
+
+La matriz tiene 24 estados: 8 combinaciones de corredores (base_state, bit 0
+= 1B, bit 1 = 2B, bit 2 = 3B) x 0-2 outs. Cada celda es el promedio de
+carreras anotadas desde ese estado hasta el final de la media entrada, sobre
+los turnos guardados en `plate_appearances`.
+
+Se acumulan sumas y conteos por juego, así la matriz de la temporada se
+actualiza sumando solo los juegos nuevos.
+"""
+
+import numpy as np
+import pandas as pd
+
+N_BASE_STATES = 8
+N_OUTS = 3
+
+# Etiqueta de cada base_state: corredores en 1B, 2B y 3B
+BASE_STATE_LABELS = [
+    "".join(str(i + 1) if state & (1 << i) else "-" for i in range(3))
+    for state in range(N_BASE_STATES)
+]
+
+# Columnas de plate_appearances que usa el motor
+RE_COLUMNS = [
+    "game_id", "at_bat_index", "inning", "half_inning", "batter_id", "pitcher_id",
+    "base_state", "outs_before", "outs_after", "runs_scored",
+]
+
+_HALF_KEYS = ["game_id", "inning", "half_inning"]
+
+
+def _sorted(pa):
+    return pa.sort_values(["game_id", "at_bat_index"]).reset_index(drop=True)
+
+
+def runs_to_end_of_inning(pa):
+    """
+    Carreras desde el inicio de cada turno hasta el final de su media entrada,
+    y si la media entrada se completó (3 outs). `pa` debe venir ordenado.
+    """
+    halves = pa.groupby(_HALF_KEYS, sort=False)
+    # Suma acumulada invertida dentro de cada media entrada
+    runs_total = halves["runs_scored"].transform("sum")
+    runs_before = halves["runs_scored"].cumsum() - pa["runs_scored"]
+    complete = halves["outs_after"].transform("max") >= N_OUTS
+    return runs_total - runs_before, complete
+
+
+class REMatrix:
+    """Sumas y conteos de carreras hasta el final del inning por estado base-out."""
+
+    def __init__(self):
+        self.run_sums = np.zeros((N_BASE_STATES, N_OUTS))
+        self.counts = np.zeros((N_BASE_STATES, N_OUTS), dtype=np.int64)
+        self.game_ids = set()
+
+    def add(self, pa):
+        """Suma los turnos de juegos que aún no están en la matriz; retorna cuántos juegos agregó."""
+        if pa.empty:
+            return 0
+        pa = _sorted(pa[~pa["game_id"].isin(self.game_ids)])
+        if pa.empty:
+            return 0
+
+        runs, complete = runs_to_end_of_inning(pa)
+        # Las medias entradas que no llegan a 3 outs (terreneadas, juegos
+        # acortados) no dicen cuántas carreras faltaban: no cuentan
+        valid = complete.to_numpy() & (pa["outs_before"].to_numpy() < N_OUTS)
+        states = pa["base_state"].to_numpy()[valid].astype(int)
+        outs = pa["outs_before"].to_numpy()[valid].astype(int)
+        np.add.at(self.run_sums, (states, outs), runs.to_numpy()[valid])
+        np.add.at(self.counts, (states, outs), 1)
+
+        new_games = set(pa["game_id"].unique().tolist())
+        self.game_ids |= new_games
+        return len(new_games)
+
+    @property
+    def values(self):
+        """Matriz 8x3 de carreras esperadas (0 en estados sin turnos)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.counts > 0, self.run_sums / np.maximum(self.counts, 1), 0.0)
+
+    def to_frame(self):
+        """Matriz con etiquetas: una fila por corredores, una columna por outs"""
+        return pd.DataFrame(
+            self.values.round(3),
+            index=BASE_STATE_LABELS,
+            columns=[f"{outs} out" for outs in range(N_OUTS)],
+        )
+
+
+def build_re_matrix(pa):
+    """Matriz RE de un conjunto de turnos (p. ej. toda una temporada)"""
+    matrix = REMatrix()
+    matrix.add(pa)
+    return matrix
+
+
+def compute_re24(pa, re_values):
+    """
+    Agrega re_start, re_end y re24 a cada turno.
+
+    RE24 = RE(estado siguiente) - RE(estado inicial) + carreras del turno. El
+    estado siguiente es el del próximo turno de la misma media entrada (con
+    lo que pasó entre turnos: robos, outs en las bases); al cerrar la media
+    entrada vale 0.
+    """
+    pa = _sorted(pa)
+    if pa.empty:
+        return pa.assign(re_start=[], re_end=[], re24=[])
+
+    states = pa["base_state"].to_numpy().astype(int)
+    outs = np.clip(pa["outs_before"].to_numpy().astype(int), 0, N_OUTS - 1)
+    re_start = re_values[states, outs]
+
+    same_half = pa[_HALF_KEYS].shift(-1).eq(pa[_HALF_KEYS]).all(axis=1).to_numpy()
+    re_end = np.where(same_half, np.roll(re_start, -1), 0.0)
+
+    return pa.assign(
+        re_start=re_start,
+        re_end=re_end,
+        re24=re_end - re_start + pa["runs_scored"].to_numpy(),
+    )
+
+
+def calculate_player_re24(pa_re24, batter_ids=None, pitcher_ids=None):
+    """RE24 total por jugador: como bateador y como pitcher (con signo invertido)"""
+    bat = pa_re24
+    if batter_ids is not None:
+        bat = bat[bat["batter_id"].isin(batter_ids)]
+    pit = pa_re24
+    if pitcher_ids is not None:
+        pit = pit[pit["pitcher_id"].isin(pitcher_ids)]
+
+    re_bat = bat.groupby("batter_id").agg(pa=("re24", "size"), re24_bat=("re24", "sum"))
+    re_pit = pit.groupby("pitcher_id").agg(bf=("re24", "size"), re24_pit=("re24", "sum"))
+    re_pit["re24_pit"] = -re_pit["re24_pit"]
+
+    re_total = re_bat.join(re_pit, how="outer").fillna(0)
+    re_total.index.name = "player_id"
+    re_total = re_total.reset_index()
+    re_total[["pa", "bf"]] = re_total[["pa", "bf"]].astype(int)
+    re_total["RE24_total"] = re_total["re24_bat"] + re_total["re24_pit"]
+    return re_total.sort_values("RE24_total", ascending=False).reset_index(drop=True)
@@ -0,0 +1,121 @@
+# utils/schema.py
+"""
+Detección de columnas opcionales en tablas de Supabase.
+
+Las columnas nuevas (p. ej. games.phase) pueden no existir todavía en bases
+con un esquema anterior. En lugar de intentar cada escritura y reintentar al
+fallar, se sondea una sola vez por proceso qué columnas existen y se adaptan
+payloads y filtros con ese resultado cacheado.
+"""
+
+# Columnas de games que pueden no existir en esquemas antiguos
+GAMES_OPTIONAL_COLUMNS = ["game_type", "game_type_code", "phase", "series_description"]
+
+# Decisiones de pitcheo en pitching_stats (scripts/sql/pitching_decisions.sql)
+PITCHING_OPTIONAL_COLUMNS = ["w", "l", "sv", "hld", "bs", "gs"]
+
+# WP/WPA guardado por turno (scripts/sql/wpa_model.sql)
+PLATE_APPEARANCES_OPTIONAL_COLUMNS = ["wp_before", "wp_after", "wpa", "wp_model_version"]
+
+# {table_name: {column_name: bool}} - válido durante toda la vida del proceso
+_column_cache = {}
+
+
+def get_error_code(error):
+    """Extrae el código de error PostgREST/PostgreSQL si existe."""
+    code = getattr(error, "code", None)
+    if code:
+        return str(code)
+
+    # Algunos clientes exponen detalles en args[0] como dict/string.
+    if getattr(error, "args", None):
+        payload = error.args[0]
+        if isinstance(payload, dict):
+            payload_code = payload.get("code")
+            if payload_code:
+                return str(payload_code)
+        payload_str = str(payload)
+        for known_code in ["42703", "PGRST204"]:
+            if known_code in payload_str:
+                return known_code
+    return ""
+
+
+def is_undefined_column_error(error):
+    """True si el error indica columna inexistente (select o escritura)."""
+    return get_error_code(error) in ("42703", "PGRST204")
+
+
+def probe_columns(supabase, table_name, columns):
+    """
+    Retorna el subconjunto de `columns` que existe en `table_name`.
+
+    Primero sondea todas juntas (un solo request en el caso normal) y solo si
+    falla sondea columna por columna. El resultado queda cacheado.
+    """
+    known = _column_cache.setdefault(table_name, {})
+    pending = [c for c in columns if c not in known]
+
+    if pending:
+        try:
+            supabase.table(table_name).select(",".join(pending)).limit(1).execute()
+            known.update({c: True for c in pending})
+        except Exception as e:
+            if not is_undefined_column_error(e):
+                raise
+            for column in pending:
+                try:
+                    supabase.table(table_name).select(column).limit(1).execute()
+                    known[column] = True
+                except Exception as column_error:
+                    if not is_undefined_column_error(column_error):
+                        raise
+                    known[column] = False
+
+    return {c for c in columns if known.get(c)}
+
+
+def has_column(supabase, table_name, column_name):
+    return column_name in probe_columns(supabase, table_name, [column_name])
+
+
+def shape_record(supabase, table_name, record, optional_columns):
+    """Elimina del payload las columnas opcionales que no existen en la tabla."""
+    existing = probe_columns(supabase, table_name, optional_columns)
+    return {k: v for k, v in record.items() if k not in optional_columns or k in existing}
+
+
+def shape_records(supabase, table_name, records, optional_columns):
+    """shape_record de un lote: si todas las opcionales existen, el lote pasa tal cual."""
+    existing = probe_columns(supabase, table_name, optional_columns) if records else set()
+    missing = set(optional_columns) - existing
+    if not records or not missing:
+        return records
+    return [{k: v for k, v in record.items() if k not in missing} for record in records]
+
+
+def shape_game_record(supabase, game_record):
+    return shape_record(supabase, "games", game_record, GAMES_OPTIONAL_COLUMNS)
+
+
+def shape_pitching_record(supabase, pitching_record):
+    return shape_record(supabase, "pitching_stats", pitching_record, PITCHING_OPTIONAL_COLUMNS)
+
+
+def shape_plate_appearance_records(supabase, pa_records):
+    return shape_records(supabase, "plate_appearances", pa_records, PLATE_APPEARANCES_OPTIONAL_COLUMNS)
+
+
+def phase_filter_column(supabase):
+    """Columna de games usada para filtrar por fase: phase o, en esquemas viejos, game_type."""
+    existing = probe_columns(supabase, "games", ["phase", "game_type"])
+    if "phase" in existing:
+        return "phase"
+    if "game_type" in existing:
+        return "game_type"
+    raise RuntimeError("La tabla games no tiene columnas phase ni game_type para filtrar fases")
+
+
+def reset_schema_cache():
+    """Olvida el sondeo (p. ej. tras aplicar una migración en el mismo proceso)."""
+    _column_cache.clear()
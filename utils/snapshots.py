@@ -0,0 +1,312 @@
+# utils/snapshots.py
+"""
+Snapshots Parquet por temporada como almacén analítico local.
+
+La ingesta nocturna exporta las tablas de Supabase a
+`<SNAPSHOT_DIR>/<tabla>/season=<temporada>/data.parquet` (más `teams` y
+`players` sin particionar). Modos de lectura local de la app (DATA_SOURCE):
+
+- `parquet`: lee los snapshots de la ingesta.
+- `arrow`: descarga cada tabla de la temporada desde Supabase la primera vez
+  y de nuevo cuando la ingesta publica otra versión de datos.
+
+En ambos casos cada tabla se abre a través de utils/arrow_cache.py (Arrow IPC
+memory-mapped, compartido entre sesiones y procesos). Cada lectura convierte
+a pandas solo su vista (filas de `where` y `columns`, recortadas en Arrow):
+ese DataFrame es una copia propia de la llamada. Las lecturas de todas las
+temporadas sin filtro de filas usan DuckDB si está instalado.
+"""
+
+import os
+
+import pandas as pd
+
+from utils import arrow_cache, data_version
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join("data", "snapshots"))
+
+# Tablas particionadas por temporada -> columna de filtro en Supabase
+# ("season" propia, o "game_id" resuelto contra games). Las tablas de WPA
+# precalculado se agregan aquí cuando existan.
+SEASON_TABLES = {
+    "games": "season",
+    "game_innings": "game_id",
+    "game_facts": "season",
+    "plate_appearances": "season",
+    "batting_stats": "game_id",
+    "pitching_stats": "game_id",
+    "elo_game_log": "season",
+}
+
+# Tablas pequeñas que se exportan completas
+STATIC_TABLES = ["teams", "players"]
+
+# PostgREST corta las respuestas en 1000 filas por defecto
+PAGE_SIZE = 1000
+GAME_ID_CHUNK = 200
+
+LOCAL_SOURCES = ("parquet", "arrow")
+
+# Fábrica del cliente de Supabase para el modo arrow (la registra supabase_client)
+_supabase_factory = None
+
+
+def data_source() -> str:
+    return os.environ.get("DATA_SOURCE", "").lower()
+
+
+def use_snapshots() -> bool:
+    """True si la app debe leer del almacén local en lugar de consultar Supabase por query"""
+    return data_source() in LOCAL_SOURCES
+
+
+def set_supabase_factory(factory):
+    global _supabase_factory
+    _supabase_factory = factory
+
+
+def _execute(query):
+    return query.execute()
+
+
+# ============================================================
+# EXPORTACIÓN (ingesta)
+# ============================================================
+
+def fetch_all(build_query, execute=_execute):
+    """Lee todas las páginas de un query; `build_query()` debe crear uno nuevo cada vez."""
+    rows = []
+    start = 0
+    while True:
+        page = execute(build_query().range(start, start + PAGE_SIZE - 1)).data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def _write_parquet(df, path):
+    """Escritura atómica: los lectores nunca ven un archivo a medias."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def season_path(table, season, snapshot_dir=None):
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, table, f"season={season}", "data.parquet")
+
+
+def static_path(table, snapshot_dir=None):
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f"{table}.parquet")
+
+
+def fetch_table_rows(supabase, table, season=None, execute=_execute, game_ids=None):
+    """Todas las filas de la tabla en la temporada (o completa si es estática)."""
+    if table in STATIC_TABLES:
+        return fetch_all(lambda: supabase.table(table).select("*").order("id"), execute)
+    if table == "games":
+        return fetch_all(
+            lambda: supabase.table("games").select("*").eq("season", season).order("id"),
+            execute,
+        )
+    if SEASON_TABLES[table] == "season":
+        return fetch_all(
+            lambda: supabase.table(table).select("*").eq("season", season).order("game_id"),
+            execute,
+        )
+
+    if game_ids is None:
+        game_ids = [g["id"] for g in fetch_all(
+            lambda: supabase.table("games").select("id").eq("season", season).order("id"),
+            execute,
+        )]
+    rows = []
+    for i in range(0, len(game_ids), GAME_ID_CHUNK):
+        chunk = game_ids[i:i + GAME_ID_CHUNK]
+        rows += fetch_all(
+            lambda: supabase.table(table).select("*").in_("game_id", chunk).order("game_id"),
+            execute,
+        )
+    return rows
+
+
+def export_season(supabase, season, snapshot_dir=None, execute=_execute):
+    """Exporta las tablas de la temporada; retorna {tabla: filas escritas}."""
+    counts = {}
+    games = fetch_table_rows(supabase, "games", season, execute)
+    game_ids = [g["id"] for g in games]
+
+    for table in SEASON_TABLES:
+        rows = games if table == "games" else fetch_table_rows(supabase, table, season, execute, game_ids)
+        df = pd.DataFrame(rows)
+        if df.empty:
+            counts[table] = 0
+            continue
+        df["season"] = season
+        _write_parquet(df, season_path(table, season, snapshot_dir))
+        counts[table] = len(df)
+
+    for table in STATIC_TABLES:
+        rows = fetch_table_rows(supabase, table, execute=execute)
+        if rows:
+            _write_parquet(pd.DataFrame(rows), static_path(table, snapshot_dir))
+        counts[table] = len(rows)
+
+    return counts
+
+
+# ============================================================
+# LECTURA (app)
+# ============================================================
+
+def _duckdb():
+    try:
+        import duckdb
+        return duckdb
+    except ImportError:
+        return None
+
+
+def available_seasons(snapshot_dir=None):
+    """Temporadas con snapshot de games, de la más reciente a la más antigua"""
+    games_dir = os.path.join(snapshot_dir or SNAPSHOT_DIR, "games")
+    if not os.path.isdir(games_dir):
+        return []
+    seasons = [int(name.split("=", 1)[1]) for name in os.listdir(games_dir) if name.startswith("season=")]
+    return sorted(seasons, reverse=True)
+
+
+def _arrow_table(table, season, snapshot_dir=None):
+    """pa.Table memory-mapped de la tabla/temporada (None si no hay datos)."""
+    cache_season = season if table not in STATIC_TABLES else "all"
+
+    if data_source() == "arrow":
+        # Se descarga una vez por versión de datos para todo el host
+        versions = data_version.current_versions(lambda: data_version.fetch_versions(_supabase_factory()))
+        version = data_version.version_for(versions, None if table in STATIC_TABLES else season)
+        return arrow_cache.get_table(
+            table, cache_season, version,
+            lambda: pd.DataFrame(fetch_table_rows(_supabase_factory(), table, season)),
+        )
+
+    import pyarrow.parquet as pq
+
+    path = static_path(table, snapshot_dir) if table in STATIC_TABLES else season_path(table, season, snapshot_dir)
+    if not os.path.exists(path):
+        return None
+    # La versión es el mtime del snapshot: la ingesta nocturna la invalida sola
+    return arrow_cache.get_table(table, cache_season, os.stat(path).st_mtime_ns, lambda: pq.read_table(path))
+
+
+def _row_filter(where):
+    """Función pa.Table -> máscara para `where`: {columna: valores} (todas deben cumplirse) o ya una función"""
+    if where is None or callable(where):
+        return where
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def mask(arrow_table):
+        result = None
+        for column, values in where.items():
+            condition = pc.is_in(arrow_table[column], value_set=pa.array(list(values)))
+            result = condition if result is None else pc.and_(result, condition)
+        return result
+
+    return mask
+
+
+def _to_pandas(arrow_table, columns=None, row_filter=None):
+    """DataFrame de la vista: filas y columnas se recortan en Arrow, sin tocar la tabla compartida"""
+    if row_filter is not None:
+        arrow_table = arrow_table.filter(row_filter(arrow_table))
+    if columns:
+        arrow_table = arrow_table.select([c for c in columns if c in arrow_table.column_names])
+    return arrow_table.to_pandas(split_blocks=True)
+
+
+def read_table(table, season=None, columns=None, snapshot_dir=None, where=None) -> pd.DataFrame:
+    """
+    Lee una tabla del almacén local. `season=None` en una tabla particionada
+    lee todas las temporadas con snapshot. `where` ({columna: valores} o una
+    función pa.Table -> máscara) filtra las filas antes de pasar a pandas.
+    """
+    row_filter = _row_filter(where)
+    if table in STATIC_TABLES or season is not None:
+        arrow_table = _arrow_table(table, season, snapshot_dir)
+        if arrow_table is None or arrow_table.num_columns == 0:
+            return pd.DataFrame(columns=columns or [])
+        return _to_pandas(arrow_table, columns, row_filter)
+
+    # Vista histórica: escaneo columnar de todas las temporadas
+    paths = [season_path(table, s, snapshot_dir) for s in available_seasons(snapshot_dir)]
+    paths = [p for p in paths if os.path.exists(p)]
+    if not paths:
+        return pd.DataFrame(columns=columns or [])
+
+    duckdb = _duckdb()
+    if duckdb is not None and row_filter is None:
+        select = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        return duckdb.sql(f"SELECT {select} FROM read_parquet({paths!r}, union_by_name = true)").df()
+
+    import pyarrow as pa
+
+    tables = [_arrow_table(table, int(p.split("season=")[1].split(os.sep)[0]), snapshot_dir) for p in paths]
+    return _to_pandas(pa.concat_tables(tables, promote_options="default"), columns, row_filter)
+
+
+def read_games(season, statuses=None, team_ids=None, columns=None, snapshot_dir=None) -> pd.DataFrame:
+    """Juegos de la temporada filtrados por status y equipos (local o visitante)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def mask(games):
+        result = pa.array([True] * games.num_rows)
+        if statuses:
+            result = pc.and_(result, pc.is_in(games["status"], value_set=pa.array(list(statuses))))
+        if team_ids:
+            teams = pa.array(list(team_ids))
+            result = pc.and_(result, pc.or_kleene(
+                pc.is_in(games["home_team_id"], value_set=teams),
+                pc.is_in(games["away_team_id"], value_set=teams),
+            ))
+        return result
+
+    return read_table("games", season, columns=columns, snapshot_dir=snapshot_dir, where=mask)
+
+
+def read_player_lines(table, season, team_id, snapshot_dir=None) -> pd.DataFrame:
+    """batting_stats/pitching_stats del equipo con la columna `players` como en PostgREST"""
+    lines = read_table(table, season, snapshot_dir=snapshot_dir, where={"team_id": [team_id]})
+    if lines.empty:
+        return lines
+    players = read_table("players", columns=["id", "full_name"], snapshot_dir=snapshot_dir)
+    names = dict(zip(players["id"], players["full_name"])) if not players.empty else {}
+    # Igual que players!inner(...): sin jugador no hay fila
+    lines = lines[lines["player_id"].isin(names)]
+    lines = lines.assign(players=[{"full_name": names.get(pid)} for pid in lines["player_id"]])
+    return lines.reset_index(drop=True)
+
+
+def read_recent_games(team_id, limit=10, seasons=None, snapshot_dir=None) -> pd.DataFrame:
+    """Últimos juegos finalizados del equipo con home_team/away_team embebidos como en PostgREST"""
+    frames, found = [], 0
+    # De la temporada más reciente hacia atrás hasta completar `limit`
+    for season in sorted(seasons or available_seasons(snapshot_dir), reverse=True):
+        games = read_games(season, statuses=["Final"], team_ids=[team_id], snapshot_dir=snapshot_dir)
+        frames.append(games)
+        found += len(games)
+        if found >= limit:
+            break
+    if not found:
+        return pd.DataFrame()
+
+    games = pd.concat(frames, ignore_index=True).sort_values("game_date", ascending=False).head(limit)
+    teams = read_table("teams", columns=["id", "name", "abbreviation"], snapshot_dir=snapshot_dir)
+    lookup = {
+        row["id"]: {"name": row["name"], "abbreviation": row["abbreviation"]}
+        for row in teams.to_dict("records")
+    }
+    games["home_team"] = [lookup.get(t) for t in games["home_team_id"]]
+    games["away_team"] = [lookup.get(t) for t in games["away_team_id"]]
+    return games.reset_index(drop=True)
@@ -0,0 +1,230 @@
+# utils/standings_history.py
+"""
+Standings históricos: tabla de posiciones a cualquier fecha de una temporada.
+
+Se construye una sola vez por temporada una estructura de sumas acumuladas
+(fechas x equipos) sobre los juegos finalizados. Consultar la tabla de
+cualquier fecha es luego una búsqueda binaria más la lectura de una fila,
+es decir O(equipos), sin volver a recorrer los juegos.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _to_day(value):
+    """Convierte str/date/datetime/Timestamp a numpy datetime64[D]."""
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class StandingsTimeline:
+    """Sumas acumuladas de standings por fecha y equipo para una temporada."""
+
+    def __init__(self, games, teams=None):
+        """
+        Args:
+            games: iterable de dicts (o DataFrame) con game_date, home_team_id,
+                   away_team_id, home_score y away_score de juegos finalizados.
+            teams: dict opcional {team_id: {'name': ..., 'abbreviation': ...}}
+        """
+        games_df = pd.DataFrame(games)
+        required = ['game_date', 'home_team_id', 'away_team_id', 'home_score', 'away_score']
+        if not games_df.empty:
+            games_df = games_df.dropna(subset=required)
+
+        self.teams = teams or {}
+
+        if games_df.empty:
+            self.team_ids = np.array(sorted(self.teams.keys()), dtype=np.int64)
+            self.dates = np.array([], dtype='datetime64[D]')
+            n_teams = len(self.team_ids)
+            self._cum = {
+                key: np.zeros((1, n_teams), dtype=np.int64)
+                for key in ['wins', 'losses', 'runs_for', 'runs_against',
+                            'home_wins', 'home_losses', 'away_wins', 'away_losses']
+            }
+            self._team_games = {}
+            return
+
+        games_df = games_df.copy()
+        games_df['day'] = pd.to_datetime(games_df['game_date']).dt.normalize()
+        sort_cols = ['day'] + (['game_datetime'] if 'game_datetime' in games_df.columns else [])
+        games_df = games_df.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+
+        home_ids = games_df['home_team_id'].astype(np.int64).to_numpy()
+        away_ids = games_df['away_team_id'].astype(np.int64).to_numpy()
+        home_scores = games_df['home_score'].astype(np.int64).to_numpy()
+        away_scores = games_df['away_score'].astype(np.int64).to_numpy()
+        home_won = home_scores > away_scores
+
+        self.team_ids = np.union1d(
+            np.union1d(home_ids, away_ids),
+            np.array(list(self.teams.keys()), dtype=np.int64)
+        )
+        self.dates = games_df['day'].drop_duplicates().to_numpy().astype('datetime64[D]')
+
+        n_dates = len(self.dates)
+        n_teams = len(self.team_ids)
+        # Fila 0 = antes del primer juego; fila i+1 = al cierre de dates[i]
+        date_idx = np.searchsorted(self.dates, games_df['day'].to_numpy().astype('datetime64[D]')) + 1
+        home_col = np.searchsorted(self.team_ids, home_ids)
+        away_col = np.searchsorted(self.team_ids, away_ids)
+
+        def accumulate(rows, cols, values):
+            daily = np.zeros((n_dates + 1, n_teams), dtype=np.int64)
+            np.add.at(daily, (rows, cols), values)
+            return np.cumsum(daily, axis=0)
+
+        home_win_i = home_won.astype(np.int64)
+        home_loss_i = 1 - home_win_i
+        self._cum = {
+            'home_wins': accumulate(date_idx, home_col, home_win_i),
+            'home_losses': accumulate(date_idx, home_col, home_loss_i),
+            'away_wins': accumulate(date_idx, away_col, home_loss_i),
+            'away_losses': accumulate(date_idx, away_col, home_win_i),
+            'runs_for': accumulate(
+                np.concatenate([date_idx, date_idx]),
+                np.concatenate([home_col, away_col]),
+                np.concatenate([home_scores, away_scores])
+            ),
+            'runs_against': accumulate(
+                np.concatenate([date_idx, date_idx]),
+                np.concatenate([home_col, away_col]),
+                np.concatenate([away_scores, home_scores])
+            ),
+        }
+        self._cum['wins'] = self._cum['home_wins'] + self._cum['away_wins']
+        self._cum['losses'] = self._cum['home_losses'] + self._cum['away_losses']
+
+        # Secuencia de resultados por equipo para últimos 10 y racha
+        self._team_games = {}
+        for col, team_id in enumerate(self.team_ids):
+            is_home = home_col == col
+            is_away = away_col == col
+            mask = is_home | is_away
+            won = np.where(is_home[mask], home_won[mask], ~home_won[mask])
+            streak = np.zeros(len(won), dtype=np.int64)
+            for i, w in enumerate(won):
+                sign = 1 if w else -1
+                prev = streak[i - 1] if i > 0 else 0
+                streak[i] = prev + sign if prev * sign > 0 else sign
+            self._team_games[int(team_id)] = {
+                'days': games_df['day'].to_numpy()[mask].astype('datetime64[D]'),
+                'cum_wins': np.concatenate([[0], np.cumsum(won.astype(np.int64))]),
+                'streak': streak,
+            }
+
+    @property
+    def first_date(self):
+        return pd.Timestamp(self.dates[0]) if len(self.dates) else None
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
+
+    def _row_for(self, date):
+        if date is None:
+            return len(self.dates)
+        return int(np.searchsorted(self.dates, _to_day(date), side='right'))
+
+    def as_of(self, date=None) -> pd.DataFrame:
+        """Tabla de posiciones al cierre de `date` (None = último día con juegos)."""
+        row = self._row_for(date)
+        day = _to_day(date) if date is not None else (self.dates[-1] if len(self.dates) else None)
+
+        standings_data = []
+        for col, team_id in enumerate(self.team_ids):
+            team_id = int(team_id)
+            if self.teams and team_id not in self.teams:
+                continue
+            wins = int(self._cum['wins'][row, col])
+            losses = int(self._cum['losses'][row, col])
+            if wins + losses == 0:
+                continue
+
+            runs_for = int(self._cum['runs_for'][row, col])
+            runs_against = int(self._cum['runs_against'][row, col])
+
+            last_10 = "0-0"
+            streak = "-"
+            team_games = self._team_games.get(team_id)
+            if team_games is not None and day is not None:
+                k = int(np.searchsorted(team_games['days'], day, side='right'))
+                if k > 0:
+                    start = max(k - 10, 0)
+                    last_10_wins = int(team_games['cum_wins'][k] - team_games['cum_wins'][start])
+                    last_10 = f"{last_10_wins}-{(k - start) - last_10_wins}"
+                    current = int(team_games['streak'][k - 1])
+                    # La racha mostrada se limita a los últimos 10 juegos
+                    streak = f"{'W' if current > 0 else 'L'}{min(abs(current), 10)}"
+
+            team_info = self.teams.get(team_id, {})
+            standings_data.append({
+                'team_id': team_id,
+                'team_name': team_info.get('name', f"Equipo {team_id}"),
+                'team_abbreviation': team_info.get('abbreviation', ''),
+                'wins': wins,
+                'losses': losses,
+                'pct': wins / (wins + losses),
+                'games_back': 0,
+                'runs_for': runs_for,
+                'runs_against': runs_against,
+                'run_diff': runs_for - runs_against,
+                'home_record': f"{int(self._cum['home_wins'][row, col])}-{int(self._cum['home_losses'][row, col])}",
+                'away_record': f"{int(self._cum['away_wins'][row, col])}-{int(self._cum['away_losses'][row, col])}",
+                'last_10': last_10,
+                'streak': streak
+            })
+
+        if not standings_data:
+            return pd.DataFrame()
+
+        standings_df = pd.DataFrame(standings_data).sort_values('pct', ascending=False)
+        leader_wins = standings_df.iloc[0]['wins']
+        leader_losses = standings_df.iloc[0]['losses']
+        standings_df['games_back'] = ((leader_wins - standings_df['wins']) + (standings_df['losses'] - leader_losses)) / 2
+        standings_df['as_of'] = pd.Timestamp(day).strftime('%Y-%m-%d') if day is not None else None
+        return standings_df.reset_index(drop=True)
+
+    def positions(self) -> pd.DataFrame:
+        """Serie diaria (formato largo) de récord, PCT, JD y posición por equipo."""
+        if not len(self.dates):
+            return pd.DataFrame()
+
+        wins = self._cum['wins'][1:]
+        losses = self._cum['losses'][1:]
+        if self.teams:
+            keep = np.isin(self.team_ids, list(self.teams.keys()))
+            wins = wins[:, keep]
+            losses = losses[:, keep]
+            team_ids = self.team_ids[keep]
+        else:
+            team_ids = self.team_ids
+        played = wins + losses
+        pct = np.divide(wins, played, out=np.zeros(wins.shape, dtype=float), where=played > 0)
+
+        # Posición por fecha: ordenar PCT descendente en cada fila
+        order = np.argsort(-pct, axis=1, kind='stable')
+        position = np.empty_like(order)
+        rows = np.arange(order.shape[0])[:, None]
+        position[rows, order] = np.arange(1, order.shape[1] + 1)
+
+        leader = order[:, 0]
+        leader_wins = wins[np.arange(len(leader)), leader][:, None]
+        leader_losses = losses[np.arange(len(leader)), leader][:, None]
+        games_back = ((leader_wins - wins) + (losses - leader_losses)) / 2
+
+        n_dates, n_teams = wins.shape
+        df = pd.DataFrame({
+            'date': np.repeat(self.dates, n_teams),
+            'team_id': np.tile(team_ids, n_dates),
+            'wins': wins.ravel(),
+            'losses': losses.ravel(),
+            'pct': pct.ravel(),
+            'games_back': games_back.ravel(),
+            'position': position.ravel(),
+        })
+        df['team_name'] = df['team_id'].map(
+            lambda t: self.teams.get(int(t), {}).get('name', f"Equipo {t}")
+        )
+        return df[(df['wins'] + df['losses']) > 0].reset_index(drop=True)
@@ -1,47 +1,91 @@
 # utils/supabase_client.py
-import os
-from supabase import create_client, Client
-import streamlit as st
+"""
+Loaders de datos de la app (standings, estadísticas, RE24, leverage...) sobre
+Supabase o los snapshots locales.
+
+No depende de Streamlit: los resultados se cachean con utils.cache (st.cache_data
+dentro de la app, LRU en memoria o disco en scripts y workers), así la ingesta,
+los benchmarks y los procesos batch comparten los mismos loaders.
+"""
+import copy
+import functools
+import inspect
+import threading
 import pandas as pd
-from datetime import datetime, timedelta
-
-# Inicializar cliente de Supabase
-@st.cache_resource
-def init_supabase() -> Client:
+from utils.standings_history import StandingsTimeline
+from utils import cache, data_version, snapshots
+from utils.db import create_supabase_client, get_current_season
+from utils.game_facts import FINAL_STATUSES, facts_from_tables, summarize_team_facts
+from utils.plays import SPLIT_COLUMNS, batting_splits, matchup_lines
+from utils.run_expectancy import RE_COLUMNS, REMatrix, calculate_player_re24, compute_re24
+from utils.schema import PLATE_APPEARANCES_OPTIONAL_COLUMNS, probe_columns
+from utils.win_expectancy import WE_COLUMNS, annotate_plays, calculate_player_leverage, load_tables
+from utils.wpa import WP_MODEL_VERSION, WPA_COLUMNS, batting_wpa, play_wpa
+
+# IDs de los equipos LVBP
+LVBP_TEAM_IDS = [692, 693, 694, 695, 696, 697, 698, 699]
+
+# Cliente de Supabase (uno por proceso)
+@functools.lru_cache(maxsize=1)
+def init_supabase():
     """Inicializa y retorna el cliente de Supabase"""
-    try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-    except:
-        url = os.environ.get("SUPABASE_URL")
-        key = os.environ.get("SUPABASE_KEY")
-    
-    return create_client(url, key)
-
-def get_current_season():
-    """Retorna la temporada actual basada en la fecha"""
-    now = datetime.now()
-    month = now.month
-    year = now.year
-
-    # La temporada 2025-2026 se guarda como 2025 (año de inicio)
-    # Octubre-Diciembre del año N = temporada N (ej: Oct 2025 = season 2025)
-    # Enero-Febrero del año N = temporada N-1 (ej: Ene 2026 = season 2025)
-    # Marzo-Septiembre = fuera de temporada
-    if month >= 10:  # Oct-Dic: temporada en curso
-        return year
-    elif month <= 2:  # Ene-Feb: continuación de temporada anterior
-        return year - 1
-    else:
-        # Fuera de temporada (Mar-Sep)
-        return year
+    return create_supabase_client()
+
+# Modo DATA_SOURCE=arrow: las tablas por temporada se descargan con este cliente
+snapshots.set_supabase_factory(init_supabase)
 
-@st.cache_data(ttl=3600)
+def get_data_version(season=None):
+    """Versión de los datos de la temporada (la incrementa la ingesta)"""
+    if snapshots.data_source() == "parquet":
+        load = lambda: data_version.read_marker(snapshots.SNAPSHOT_DIR)
+    else:
+        load = lambda: data_version.fetch_versions(init_supabase())
+    return data_version.version_for(data_version.current_versions(load), season)
+
+def versioned_cache(func):
+    """
+    Caché (utils.cache) sin TTL con llave (argumentos, versión de datos): el
+    resultado vale hasta que la ingesta publica una versión nueva de la temporada.
+    """
+    signature = inspect.signature(func)
+
+    def load(version, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    # Los backends identifican la función por módulo + nombre (st.cache_data
+    # además por código); sin esto todos los loaders compartirían la llave
+    load.__module__ = func.__module__
+    load.__name__ = func.__name__
+    load.__qualname__ = func.__qualname__
+    cached = cache.memoize(load, max_entries=32)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Argumentos normalizados: get_standings(2025), get_standings(season=2025)
+        # y get_standings() en la temporada 2025 comparten la entrada del caché
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        season = None
+        if "season" in bound.arguments:
+            season = bound.arguments["season"] = bound.arguments["season"] or get_current_season()
+        return cached(get_data_version(season), **bound.arguments)
+
+    wrapper.clear = cached.clear
+    return wrapper
+
+@versioned_cache
 def get_available_seasons():
     """Obtiene todas las temporadas disponibles en la base de datos"""
-    supabase = init_supabase()
     current = get_current_season()
 
+    # Modo lectura local: temporadas con snapshot Parquet
+    if snapshots.use_snapshots():
+        seasons = snapshots.available_seasons()
+        if seasons:
+            return sorted(set(seasons) | {current}, reverse=True)
+
+    supabase = init_supabase()
+
     try:
         response = supabase.table('games') \
             .select('season') \
@@ -61,19 +105,17 @@ def get_available_seasons():
     # 2015 = temporada 2014-2015, 2016 = temporada 2015-2016, etc.
     return [2026, 2025, 2024, 2023, 2022, 2021, 2020, 2019, 2018, 2017, 2016, 2015]
 
-@st.cache_data(ttl=600)  # Cache por 10 minutos
+@versioned_cache
 def get_standings(season=None):
     """Calcula standings desde la tabla games - Solo equipos LVBP"""
     if season is None:
         season = get_current_season()
     
-    supabase = init_supabase()
-    
-    # IDs de los equipos LVBP
-    LVBP_TEAM_IDS = [692, 693, 694, 695, 696, 697, 698, 699]
-    
-    # Primero intentar tabla standings si existe
+    # Primero intentar tabla standings si existe (no aplica en modo snapshots)
     try:
+        if snapshots.use_snapshots():
+            raise LookupError("standings no se exporta a Parquet")
+        supabase = init_supabase()
         response = supabase.table('standings') \
             .select('*') \
             .eq('season', season) \
@@ -86,445 +128,157 @@ def get_standings(season=None):
     except:
         pass
     
-    # Si no hay standings, calcular desde games
+    # Si no hay standings, calcular desde games (último día de la serie histórica)
     try:
-        # Obtener juegos de la temporada - CORRECCIÓN: Incluir 'Final', 'Completed' y 'Completed Early'
-        games_response = supabase.table('games') \
-            .select('*') \
-            .eq('season', season) \
-            .in_('status', ['Final', 'Completed', 'Completed Early']) \
-            .execute()
-        
-        if not games_response.data:
-            return pd.DataFrame()
-        
-        games_df = pd.DataFrame(games_response.data)
-        games_df = games_df.sort_values('game_date')
-        
-        # Filtrar solo juegos de equipos LVBP
-        games_df = games_df[
-            (games_df['home_team_id'].isin(LVBP_TEAM_IDS)) | 
-            (games_df['away_team_id'].isin(LVBP_TEAM_IDS))
-        ]
-        
-        # Obtener información de equipos
-        teams_response = supabase.table('teams') \
-            .select('*') \
-            .in_('id', LVBP_TEAM_IDS) \
-            .execute()
-        
-        if not teams_response.data:
-            return pd.DataFrame()
-        
-        teams_df = pd.DataFrame(teams_response.data)
-        
-        # Calcular standings
-        standings_data = []
-        
-        for team in teams_df.itertuples():
-            # Filtrar juegos del equipo
-            team_games = games_df[
-                (games_df['home_team_id'] == team.id) | 
-                (games_df['away_team_id'] == team.id)
-            ]
-            
-            if len(team_games) == 0:
-                continue
-            
-            wins = 0
-            losses = 0
-            runs_for = 0
-            runs_against = 0
-            home_wins = 0
-            home_losses = 0
-            away_wins = 0
-            away_losses = 0
-            last_10 = []
-            
-            # Ordenar juegos por fecha para calcular rachas
-            team_games_sorted = team_games.sort_values('game_date')
-            
-            for _, game in team_games_sorted.iterrows():
-                if game['home_team_id'] == team.id:
-                    # Juego de local
-                    runs_for += game['home_score'] or 0
-                    runs_against += game['away_score'] or 0
-                    
-                    if game['home_score'] > game['away_score']:
-                        wins += 1
-                        home_wins += 1
-                        last_10.append('W')
-                    else:
-                        losses += 1
-                        home_losses += 1
-                        last_10.append('L')
-                else:
-                    # Juego de visitante
-                    runs_for += game['away_score'] or 0
-                    runs_against += game['home_score'] or 0
-                    
-                    if game['away_score'] > game['home_score']:
-                        wins += 1
-                        away_wins += 1
-                        last_10.append('W')
-                    else:
-                        losses += 1
-                        away_losses += 1
-                        last_10.append('L')
-            
-            # Calcular estadísticas
-            games_played = wins + losses
-            pct = wins / games_played if games_played > 0 else 0
-            
-            # Últimos 10 juegos
-            last_10 = last_10[-10:] if len(last_10) >= 10 else last_10
-            last_10_wins = last_10.count('W')
-            last_10_losses = last_10.count('L')
-            last_10_record = f"{last_10_wins}-{last_10_losses}"
-            
-            # Racha actual
-            if last_10:
-                current_streak = 1
-                streak_type = last_10[-1]
-                for i in range(len(last_10)-2, -1, -1):
-                    if last_10[i] == streak_type:
-                        current_streak += 1
-                    else:
-                        break
-                streak = f"{streak_type}{current_streak}"
-            else:
-                streak = "-"
-            
-            standings_data.append({
-                'team_id': team.id,
-                'team_name': team.name,
-                'team_abbreviation': team.abbreviation if hasattr(team, 'abbreviation') else '',
-                'wins': wins,
-                'losses': losses,
-                'pct': pct,
-                'games_back': 0,  # Se calculará después
-                'runs_for': runs_for,
-                'runs_against': runs_against,
-                'run_diff': runs_for - runs_against,
-                'home_record': f"{home_wins}-{home_losses}",
-                'away_record': f"{away_wins}-{away_losses}",
-                'last_10': last_10_record,
-                'streak': streak
-            })
-        
-        if not standings_data:
-            return pd.DataFrame()
-        
-        # Crear DataFrame y ordenar por PCT
-        standings_df = pd.DataFrame(standings_data).sort_values('pct', ascending=False)
-        
-        # Calcular games back
-        if not standings_df.empty:
-            leader_wins = standings_df.iloc[0]['wins']
-            leader_losses = standings_df.iloc[0]['losses']
-            
-            standings_df['games_back'] = standings_df.apply(
-                lambda x: ((leader_wins - x['wins']) + (x['losses'] - leader_losses)) / 2,
-                axis=1
-            )
-        
-        return standings_df
-        
+        timeline = get_standings_timeline(season)
+        return timeline.as_of(None)
     except Exception as e:
-        st.error(f"Error calculando standings: {str(e)}")
+        print(f"Error calculando standings: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_leones_advanced_stats(season=None):
-    """Calcula estadísticas avanzadas de los Leones del Caracas"""
+@versioned_cache
+def get_standings_timeline(season=None) -> StandingsTimeline:
+    """Construye la serie histórica de standings de la temporada (sumas acumuladas por fecha)"""
     if season is None:
         season = get_current_season()
-    
+
+    if snapshots.use_snapshots():
+        games = snapshots.read_games(
+            season,
+            statuses=['Final', 'Completed', 'Completed Early'],
+            team_ids=LVBP_TEAM_IDS,
+            columns=['id', 'game_date', 'game_datetime', 'home_team_id', 'away_team_id', 'home_score', 'away_score'],
+        )
+        teams_df = snapshots.read_table('teams', columns=['id', 'name', 'abbreviation'])
+        teams = {
+            t['id']: {'name': t.get('name'), 'abbreviation': t.get('abbreviation') or ''}
+            for t in teams_df.to_dict('records') if t['id'] in LVBP_TEAM_IDS
+        }
+        return StandingsTimeline(games.to_dict('records'), teams=teams)
+
     supabase = init_supabase()
+
+    # Obtener juegos de la temporada - CORRECCIÓN: Incluir 'Final', 'Completed' y 'Completed Early'
+    games_response = supabase.table('games') \
+        .select('id, game_date, game_datetime, home_team_id, away_team_id, home_score, away_score') \
+        .eq('season', season) \
+        .in_('status', ['Final', 'Completed', 'Completed Early']) \
+        .or_(f"home_team_id.in.({','.join(map(str, LVBP_TEAM_IDS))}),away_team_id.in.({','.join(map(str, LVBP_TEAM_IDS))})") \
+        .execute()
+
+    # Obtener información de equipos
+    teams_response = supabase.table('teams') \
+        .select('id, name, abbreviation') \
+        .in_('id', LVBP_TEAM_IDS) \
+        .execute()
+
+    teams = {
+        t['id']: {'name': t.get('name'), 'abbreviation': t.get('abbreviation') or ''}
+        for t in (teams_response.data or [])
+    }
+    return StandingsTimeline(games_response.data or [], teams=teams)
+
+def get_standings_as_of(season=None, date=None):
+    """Tabla de posiciones al cierre de una fecha cualquiera de la temporada"""
+    return get_standings_timeline(season).as_of(date)
+
+@versioned_cache
+def get_leones_advanced_stats(season=None):
+    """Calcula estadísticas avanzadas de los Leones del Caracas (desde game_facts)"""
+    if season is None:
+        season = get_current_season()
     
     try:
-        # Obtener juegos de los Leones en la temporada
+        # Hechos por juego precalculados en la ingesta
+        if snapshots.use_snapshots():
+            facts_df = snapshots.read_table('game_facts', season, where={'team_id': [695]})
+        else:
+            supabase = init_supabase()
+            try:
+                facts_response = supabase.table('game_facts') \
+                    .select('*') \
+                    .eq('season', season) \
+                    .eq('team_id', 695) \
+                    .execute()
+                facts_df = pd.DataFrame(facts_response.data or [])
+            except Exception:
+                # La tabla no existe todavía
+                facts_df = pd.DataFrame()
+
+        # Juegos finalizados que todavía no están en game_facts (temporadas sin
+        # backfill o juegos que la ingesta no alcanzó a guardar): al vuelo
+        known_ids = set(facts_df['game_id']) if not facts_df.empty else set()
+        missing_df = _leones_facts_from_games(season, skip_ids=known_ids)
+        if not missing_df.empty:
+            facts_df = pd.concat([facts_df, missing_df], ignore_index=True) if not facts_df.empty else missing_df
+
+        return summarize_team_facts(facts_df)
+        
+    except Exception as e:
+        print(f"Error calculando estadísticas avanzadas: {str(e)}")
+        return {}
+
+def _leones_facts_from_games(season, skip_ids=()):
+    """game_facts de los Leones calculados al vuelo para los juegos finalizados que no están en `skip_ids`"""
+    if snapshots.use_snapshots():
+        games_df = snapshots.read_games(season, statuses=FINAL_STATUSES, team_ids=[695])
+    else:
+        supabase = init_supabase()
         games_response = supabase.table('games') \
             .select('*') \
             .eq('season', season) \
-            .in_('status', ['Final', 'Completed', 'Completed Early']) \
+            .in_('status', FINAL_STATUSES) \
             .or_('home_team_id.eq.695,away_team_id.eq.695') \
             .execute()
-        
-        if not games_response.data:
-            return {}
-        
-        games_df = pd.DataFrame(games_response.data)
-        game_ids = games_df['id'].tolist()
-        
-        # Inicializar contadores
-        total_games = len(games_df)
-        wins = 0
-        losses = 0
-        home_wins = 0
-        home_losses = 0
-        away_wins = 0
-        away_losses = 0
-        night_wins = 0
-        night_losses = 0
-        shutouts = 0
-        extra_inning_wins = 0
-        extra_inning_losses = 0
-        one_run_wins = 0
-        one_run_losses = 0
-        comeback_wins = 0
-        comeback_losses = 0
-        up_wins = 0
-        up_losses = 0
-        blown_leads = 0
-        remontados = 0
-        arriba_wins = 0
-        arriba_losses = 0
-        oct_wins = 0
-        oct_losses = 0
-        nov_wins = 0
-        nov_losses = 0
-        dec_wins = 0
-        dec_losses = 0
-        starter_wins = 0
-        starter_losses = 0
-        reliever_wins = 0
-        reliever_losses = 0
-        saves = 0
-        
-        # Intentar consultar innings (si la tabla existe)
-        innings_df = pd.DataFrame()
-        try:
+        games_df = pd.DataFrame(games_response.data or [])
+
+    if not games_df.empty and skip_ids:
+        games_df = games_df[~games_df['id'].isin(skip_ids)]
+    if games_df.empty:
+        return pd.DataFrame()
+
+    game_ids = games_df['id'].tolist()
+
+    # Intentar consultar innings (si la tabla existe)
+    innings_df = pd.DataFrame()
+    try:
+        if snapshots.use_snapshots():
+            innings_df = snapshots.read_table('game_innings', season, where={'game_id': game_ids})
+        else:
             innings_response = supabase.table('game_innings') \
                 .select('*') \
                 .in_('game_id', game_ids) \
                 .execute()
             if innings_response.data:
                 innings_df = pd.DataFrame(innings_response.data)
-        except Exception as e:
-            # Si la tabla no existe, continuar sin innings
-            pass
-        
-        # Últimos 10 juegos
-        last_10_games = games_df.sort_values('game_date', ascending=False).head(10)
-        last_10_wins = 0
-        last_10_losses = 0
-        
-        # Racha actual
-        streak_games = []
-        
-        for _, game in games_df.iterrows():
-            game_id = game['id']
-            is_home = game['home_team_id'] == 695
-            leones_score = game['home_score'] if is_home else game['away_score']
-            opponent_score = game['away_score'] if is_home else game['home_score']
-            won = leones_score > opponent_score
-            
-            # Récord general
-            if won:
-                wins += 1
-                streak_games.append('W')
-            else:
-                losses += 1
-                streak_games.append('L')
-            
-            # Home/Away
-            if is_home:
-                if won:
-                    home_wins += 1
-                else:
-                    home_losses += 1
-            else:
-                if won:
-                    away_wins += 1
-                else:
-                    away_losses += 1
-            
-            # Blanqueo
-            if opponent_score == 0:
-                shutouts += 1
-            
-            # Extra innings
-            if game.get('inning', 9) > 9:
-                if won:
-                    extra_inning_wins += 1
-                else:
-                    extra_inning_losses += 1
-            
-            # Por 1 carrera
-            if abs(leones_score - opponent_score) == 1:
-                if won:
-                    one_run_wins += 1
-                else:
-                    one_run_losses += 1
-            
-            # Remontadas, arriba, terreneadas y decisiones de pitcheo (solo si innings_df tiene datos)
-            if not innings_df.empty:
-                game_innings = innings_df[innings_df['game_id'] == game_id].sort_values('inning')
-                if not game_innings.empty:
-                    inning_runs_leones = game_innings.apply(
-                        lambda row: row['home_score'] if is_home else row['away_score'], axis=1
-                    )
-                    inning_runs_opp = game_innings.apply(
-                        lambda row: row['away_score'] if is_home else row['home_score'], axis=1
-                    )
-
-                    cumulative_leones = inning_runs_leones.cumsum()
-                    cumulative_opp = inning_runs_opp.cumsum()
-
-                    score_by_inning = pd.DataFrame({
-                        'inning': game_innings['inning'],
-                        'leones': cumulative_leones,
-                        'opp': cumulative_opp
-                    })
-
-                    # Estado al 5to y 7mo inning
-                    through_five = score_by_inning[score_by_inning['inning'] == 5]
-                    through_seven = score_by_inning[score_by_inning['inning'] == 7]
-
-                    if not through_five.empty:
-                        five_leones = through_five.iloc[0]['leones']
-                        five_opp = through_five.iloc[0]['opp']
-
-                        # Remontados: ganaban al 5to y terminaron perdiendo
-                        if five_leones > five_opp and not won:
-                            remontados += 1
-
-                        # Decisiones de abridores / relevistas (aproximación)
-                        if five_leones > five_opp and won:
-                            starter_wins += 1
-                        elif five_leones < five_opp and not won:
-                            starter_losses += 1
-                        elif five_leones < five_opp and won:
-                            reliever_wins += 1
-                        elif five_leones > five_opp and not won:
-                            reliever_losses += 1
-                        else:
-                            # Empatados al 5to, decisión recae en el bullpen
-                            if won:
-                                reliever_wins += 1
-                            else:
-                                reliever_losses += 1
-
-                    if not through_seven.empty:
-                        seven_leones = through_seven.iloc[0]['leones']
-                        seven_opp = through_seven.iloc[0]['opp']
-                        if seven_leones > seven_opp:
-                            if won:
-                                arriba_wins += 1
-                            else:
-                                arriba_losses += 1
-
-                    # Arriba / Remontadas generales
-                    leones_was_behind = (score_by_inning['leones'] < score_by_inning['opp']).any()
-                    leones_was_ahead = (score_by_inning['leones'] > score_by_inning['opp']).any()
-
-                    if won and leones_was_behind:
-                        comeback_wins += 1
-                    elif not won and leones_was_behind:
-                        comeback_losses += 1
-
-                    if won and leones_was_ahead:
-                        up_wins += 1
-                    elif not won and leones_was_ahead:
-                        up_losses += 1
-
-                    # Terreneadas (walk-offs)
-                    final_inning = score_by_inning['inning'].max()
-                    last_frame = score_by_inning[score_by_inning['inning'] == final_inning]
-                    prev_frame = score_by_inning[score_by_inning['inning'] == final_inning - 1]
-
-                    if not last_frame.empty and not prev_frame.empty:
-                        prev_leones = prev_frame.iloc[0]['leones']
-                        prev_opp = prev_frame.iloc[0]['opp']
-                        final_leones = last_frame.iloc[0]['leones']
-                        final_opp = last_frame.iloc[0]['opp']
-
-                        # Si el local deja en el terreno al final
-                        walkoff_for = is_home and won and prev_leones <= prev_opp and final_leones > final_opp
-                        walkoff_against = (not is_home) and (not won) and prev_opp <= prev_leones and final_opp > final_leones
-
-                        if walkoff_for or walkoff_against:
-                            blown_leads += 1
-            
-            # Por mes
-            try:
-                month = pd.to_datetime(game['game_date']).month
-                if month == 10:
-                    if won:
-                        oct_wins += 1
-                    else:
-                        oct_losses += 1
-                elif month == 11:
-                    if won:
-                        nov_wins += 1
-                    else:
-                        nov_losses += 1
-                elif month == 12:
-                    if won:
-                        dec_wins += 1
-                    else:
-                        dec_losses += 1
-            except:
-                pass
-
-            # Salvados: aproximar con margen de 3 carreras o menos
-            if won and abs(leones_score - opponent_score) <= 3:
-                saves += 1
-        
-        # Últimos 10
-        for _, g in last_10_games.iterrows():
-            is_home = g['home_team_id'] == 695
-            leones_score = g['home_score'] if is_home else g['away_score']
-            opponent_score = g['away_score'] if is_home else g['home_score']
-            if leones_score > opponent_score:
-                last_10_wins += 1
-            else:
-                last_10_losses += 1
-        
-        # Racha
-        if streak_games:
-            current_streak = 1
-            streak_type = streak_games[-1]
-            for i in range(len(streak_games)-2, -1, -1):
-                if streak_games[i] == streak_type:
-                    current_streak += 1
-                else:
-                    break
-            streak = f"{current_streak} {streak_type}"
+    except Exception:
+        # Si la tabla no existe, continuar sin innings
+        pass
+
+    # Decisiones de pitcheo (si ya existen las columnas)
+    pitching_df = pd.DataFrame()
+    try:
+        if snapshots.use_snapshots():
+            pitching_df = snapshots.read_table('pitching_stats', season, where={'game_id': game_ids})
         else:
-            streak = "N/A"
-        
-        return {
-            'total_games': total_games,
-            'record': f"{wins}-{losses}",
-            'home_record': f"{home_wins}-{home_losses}",
-            'away_record': f"{away_wins}-{away_losses}",
-            'night_record': f"{night_wins}-{night_losses}",
-            'shutouts': f"{shutouts}",
-            'streak': streak,
-            'extra_inning': f"{extra_inning_wins}-{extra_inning_losses}",
-            'last_10': f"{last_10_wins}-{last_10_losses}",
-            'one_run': f"{one_run_wins}-{one_run_losses}",
-            'comebacks': f"{comeback_wins}-{comeback_losses}",
-            'up': f"{arriba_wins}-{arriba_losses}",
-            'blown_leads': f"{blown_leads}",
-            'starters': f"{starter_wins}-{starter_losses}",
-            'relievers': f"{reliever_wins}-{reliever_losses}",
-            'saves': f"{saves}",
-            'remontados': f"{remontados}",
-            'oct': f"{oct_wins}G-{oct_losses}P",
-            'nov': f"{nov_wins}G-{nov_losses}P",
-            'dec': f"{dec_wins}G-{dec_losses}P"
-        }
-        
+            pitching_response = supabase.table('pitching_stats') \
+                .select('game_id, team_id, w, l, sv, gs') \
+                .in_('game_id', game_ids) \
+                .execute()
+            if pitching_response.data:
+                pitching_df = pd.DataFrame(pitching_response.data)
     except Exception as e:
-        st.error(f"Error calculando estadísticas avanzadas: {str(e)}")
-        return {}
+        # Sin decisiones (columnas w/l/sv/gs todavía no migradas): se sigue sin ellas
+        print(f"Error obteniendo decisiones de pitcheo: {str(e)}")
+
+    return facts_from_tables(games_df, innings_df, team_id=695, pitching_df=pitching_df)
    
-@st.cache_data(ttl=1800)
+@versioned_cache
 def get_recent_games(team_id=695, limit=10):
     """Obtiene los últimos juegos del equipo"""
+    if snapshots.use_snapshots():
+        return snapshots.read_recent_games(team_id, limit, seasons=get_available_seasons())
+
     supabase = init_supabase()
     
     try:
@@ -540,27 +294,28 @@ def get_recent_games(team_id=695, limit=10):
     except:
         return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
+@versioned_cache
 def get_batting_stats(team_id=695, limit=50, season=None):
     """Obtiene estadísticas de bateo agregadas por jugador"""
-    supabase = init_supabase()
-
     if season is None:
         season = get_current_season()
 
     try:
         # Obtener todos los registros de bateo del equipo para la temporada
-        response = supabase.table('batting_stats') \
-            .select('*, players!inner(full_name), games!inner(season)') \
-            .eq('team_id', team_id) \
-            .eq('games.season', season) \
-            .execute()
+        if snapshots.use_snapshots():
+            df = snapshots.read_player_lines('batting_stats', season, team_id)
+        else:
+            supabase = init_supabase()
+            response = supabase.table('batting_stats') \
+                .select('*, players!inner(full_name), games!inner(season)') \
+                .eq('team_id', team_id) \
+                .eq('games.season', season) \
+                .execute()
+            df = pd.DataFrame(response.data or [])
 
-        if not response.data:
+        if df.empty:
             return pd.DataFrame()
 
-        df = pd.DataFrame(response.data)
-
         # Extraer nombre del jugador
         df['player_name'] = df['players'].apply(
             lambda x: x.get('full_name', 'N/A') if isinstance(x, dict) else 'N/A'
@@ -609,27 +364,28 @@ def get_batting_stats(team_id=695, limit=50, season=None):
         print(f"Error obteniendo estadísticas de bateo: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
+@versioned_cache
 def get_pitching_stats(team_id=695, limit=50, season=None):
     """Obtiene estadísticas de pitcheo agregadas por jugador"""
-    supabase = init_supabase()
-
     if season is None:
         season = get_current_season()
 
     try:
         # Obtener todos los registros de pitcheo del equipo para la temporada
-        response = supabase.table('pitching_stats') \
-            .select('*, players!inner(full_name), games!inner(season)') \
-            .eq('team_id', team_id) \
-            .eq('games.season', season) \
-            .execute()
+        if snapshots.use_snapshots():
+            df = snapshots.read_player_lines('pitching_stats', season, team_id)
+        else:
+            supabase = init_supabase()
+            response = supabase.table('pitching_stats') \
+                .select('*, players!inner(full_name), games!inner(season)') \
+                .eq('team_id', team_id) \
+                .eq('games.season', season) \
+                .execute()
+            df = pd.DataFrame(response.data or [])
 
-        if not response.data:
+        if df.empty:
             return pd.DataFrame()
 
-        df = pd.DataFrame(response.data)
-
         # Extraer nombre del jugador
         df['player_name'] = df['players'].apply(
             lambda x: x.get('full_name', 'N/A') if isinstance(x, dict) else 'N/A'
@@ -657,6 +413,11 @@ def get_pitching_stats(team_id=695, limit=50, season=None):
             agg_dict['wp'] = 'sum'
         if 'bk' in df.columns:
             agg_dict['bk'] = 'sum'
+        # Decisiones (pitching_stats sin migrar no las tiene)
+        for column in ['w', 'l', 'sv', 'hld', 'bs', 'gs']:
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype(int)
+                agg_dict[column] = 'sum'
 
         grouped = df.groupby(['player_id', 'player_name']).agg(agg_dict).reset_index()
 
@@ -670,12 +431,9 @@ def get_pitching_stats(team_id=695, limit=50, season=None):
         grouped['era'] = ((grouped['er'] * 9) / grouped['ip']).fillna(0).round(2)
         grouped['whip'] = ((grouped['h'] + grouped['bb']) / grouped['ip']).fillna(0).round(2)
 
-        # Estas estadísticas no están disponibles en el boxscore individual
-        # Las inicializamos en 0 por ahora
-        grouped['w'] = 0
-        grouped['l'] = 0
-        grouped['sv'] = 0
-        grouped['gs'] = 0
+        for column in ['w', 'l', 'sv', 'hld', 'bs', 'gs']:
+            if column not in grouped.columns:
+                grouped[column] = 0
 
         # Crear columna 'players' con el formato esperado
         grouped['players'] = grouped.apply(
@@ -688,6 +446,250 @@ def get_pitching_stats(team_id=695, limit=50, season=None):
         print(f"Error obteniendo estadísticas de pitcheo: {str(e)}")
         return pd.DataFrame()
 
+def _plate_appearances(season, column, value, columns=SPLIT_COLUMNS):
+    """Turnos (solo `columns`) de la temporada filtrados por una columna (batter_team_id, batter_id...)"""
+    if snapshots.use_snapshots():
+        return snapshots.read_table('plate_appearances', season, columns=columns, where={column: [value]})
+
+    supabase = init_supabase()
+    try:
+        rows = snapshots.fetch_all(
+            lambda: supabase.table('plate_appearances')
+                .select(','.join(columns))
+                .eq('season', season)
+                .eq(column, value)
+                .order('game_id')
+                .order('at_bat_index')
+        )
+    except Exception:
+        # La tabla no existe todavía
+        rows = []
+    return pd.DataFrame(rows)
+
+def _player_names(player_ids):
+    """{player_id: full_name} de una lista de jugadores"""
+    player_ids = [int(p) for p in set(player_ids) if pd.notna(p)]
+    if not player_ids:
+        return {}
+    if snapshots.use_snapshots():
+        players = snapshots.read_table('players', columns=['id', 'full_name'], where={'id': player_ids})
+        return dict(zip(players['id'], players['full_name']))
+
+    supabase = init_supabase()
+    response = supabase.table('players') \
+        .select('id, full_name') \
+        .in_('id', player_ids) \
+        .execute()
+    return {row['id']: row['full_name'] for row in response.data or []}
+
+@versioned_cache
+def get_batting_splits(team_id=695, season=None):
+    """Splits de bateo (vs zurdos/derechos, RISP, late & close...) por jugador, desde plate_appearances"""
+    if season is None:
+        season = get_current_season()
+
+    try:
+        pa = _plate_appearances(season, 'batter_team_id', team_id)
+        if pa.empty:
+            return pd.DataFrame()
+
+        splits = batting_splits(pa)
+        names = _player_names(splits['player_id'])
+        splits['player_name'] = splits['player_id'].map(names).fillna('N/A')
+        return splits
+
+    except Exception as e:
+        print(f"Error obteniendo splits de bateo: {str(e)}")
+        return pd.DataFrame()
+
+@versioned_cache
+def get_batter_matchups(batter_id, season=None):
+    """Línea del bateador contra cada pitcher que enfrentó en la temporada"""
+    if season is None:
+        season = get_current_season()
+
+    try:
+        pa = _plate_appearances(season, 'batter_id', batter_id)
+        if pa.empty:
+            return pd.DataFrame()
+
+        matchups = matchup_lines(pa, by='pitcher_id')
+        names = _player_names(matchups['pitcher_id'])
+        matchups.insert(1, 'pitcher_name', matchups['pitcher_id'].map(names).fillna('N/A'))
+        return matchups
+
+    except Exception as e:
+        print(f"Error obteniendo duelos del bateador: {str(e)}")
+        return pd.DataFrame()
+
+# Turnos por request al leer juegos puntuales de plate_appearances
+GAME_ID_CHUNK = 100
+
+# {season: REMatrix} del proceso; cada versión de datos solo suma los juegos nuevos
+_re_matrices = {}
+_re_matrices_lock = threading.Lock()
+
+def _plate_appearances_for_games(season, game_ids, columns):
+    """Turnos (solo `columns`) de una lista de juegos"""
+    if not game_ids:
+        return pd.DataFrame(columns=columns)
+    if snapshots.use_snapshots():
+        return snapshots.read_table('plate_appearances', season, columns=columns, where={'game_id': game_ids})
+
+    supabase = init_supabase()
+    rows = []
+    for i in range(0, len(game_ids), GAME_ID_CHUNK):
+        chunk = game_ids[i:i + GAME_ID_CHUNK]
+        rows += snapshots.fetch_all(
+            lambda: supabase.table('plate_appearances')
+                .select(','.join(columns))
+                .in_('game_id', chunk)
+                .order('game_id')
+                .order('at_bat_index')
+        )
+    return pd.DataFrame(rows, columns=columns)
+
+@versioned_cache
+def get_re_matrix(season=None):
+    """Matriz de run expectancy (24 estados base-out) de la temporada desde plate_appearances"""
+    if season is None:
+        season = get_current_season()
+
+    with _re_matrices_lock:
+        matrix = _re_matrices.setdefault(season, REMatrix())
+        try:
+            if snapshots.use_snapshots():
+                games_df = snapshots.read_games(season, statuses=FINAL_STATUSES, columns=['id'])
+                final_ids = games_df['id'].tolist()
+            else:
+                supabase = init_supabase()
+                final_ids = [g['id'] for g in snapshots.fetch_all(
+                    lambda: supabase.table('games')
+                        .select('id')
+                        .eq('season', season)
+                        .in_('status', FINAL_STATUSES)
+                        .order('id')
+                )]
+
+            # Solo se leen los turnos de los juegos que la matriz no tiene. Un
+            # juego sin turnos todavía (stats en dead letter, re-ingesta
+            # pendiente) no queda marcado: se vuelve a consultar en la próxima
+            # llamada hasta que REMatrix.add reciba sus turnos
+            new_ids = [int(g) for g in final_ids if g not in matrix.game_ids]
+            matrix.add(_plate_appearances_for_games(season, new_ids, RE_COLUMNS))
+        except Exception as e:
+            print(f"Error actualizando matriz de run expectancy: {str(e)}")
+        return copy.deepcopy(matrix)
+
+def _team_plate_appearances(season, team_id, columns):
+    """Turnos (solo `columns`) de los juegos del equipo, con las columnas de equipo de bateador y pitcher"""
+    columns = list(dict.fromkeys(columns + ['batter_team_id', 'pitcher_team_id']))
+    if snapshots.use_snapshots():
+        import pyarrow.compute as pc
+
+        return snapshots.read_table(
+            'plate_appearances', season, columns=columns,
+            where=lambda t: pc.or_kleene(pc.equal(t['batter_team_id'], team_id), pc.equal(t['pitcher_team_id'], team_id)),
+        )
+
+    supabase = init_supabase()
+    # El WP/WPA guardado es opcional (bases sin scripts/sql/wpa_model.sql)
+    existing = probe_columns(supabase, 'plate_appearances', PLATE_APPEARANCES_OPTIONAL_COLUMNS)
+    columns = [c for c in columns if c not in PLATE_APPEARANCES_OPTIONAL_COLUMNS or c in existing]
+    return pd.DataFrame(snapshots.fetch_all(
+        lambda: supabase.table('plate_appearances')
+            .select(','.join(columns))
+            .eq('season', season)
+            .or_(f'batter_team_id.eq.{team_id},pitcher_team_id.eq.{team_id}')
+            .order('game_id')
+            .order('at_bat_index')
+    ), columns=columns)
+
+@versioned_cache
+def get_player_re24(team_id=695, season=None):
+    """RE24 de la temporada por jugador del equipo (bateo y pitcheo)"""
+    if season is None:
+        season = get_current_season()
+
+    try:
+        pa = _team_plate_appearances(season, team_id, RE_COLUMNS)
+        if pa.empty:
+            return pd.DataFrame()
+
+        pa_re24 = compute_re24(pa, get_re_matrix(season).values)
+        re24 = calculate_player_re24(
+            pa_re24,
+            batter_ids=pa.loc[pa['batter_team_id'] == team_id, 'batter_id'].unique(),
+            pitcher_ids=pa.loc[pa['pitcher_team_id'] == team_id, 'pitcher_id'].unique(),
+        )
+        names = _player_names(re24['player_id'])
+        re24.insert(1, 'player_name', re24['player_id'].map(names).fillna('N/A'))
+        return re24
+
+    except Exception as e:
+        print(f"Error calculando RE24: {str(e)}")
+        return pd.DataFrame()
+
+def _model_wpa(pa):
+    """
+    Turnos con el WP/WPA del modelo actual: el guardado si todo es de
+    WP_MODEL_VERSION; si falta o hay versiones mezcladas se recalcula, así la
+    app nunca muestra WPA de dos modelos distintos.
+    """
+    stored = set(PLATE_APPEARANCES_OPTIONAL_COLUMNS) <= set(pa.columns)
+    if stored and pa['wpa'].notna().all() and (pa['wp_model_version'] == WP_MODEL_VERSION).all():
+        return pa.sort_values(['game_id', 'at_bat_index']).reset_index(drop=True)
+    return play_wpa(pa.drop(columns=PLATE_APPEARANCES_OPTIONAL_COLUMNS, errors='ignore'))
+
+@versioned_cache
+def get_player_leverage(team_id=695, season=None):
+    """pLI, gmLI, WPA y clutch de la temporada por jugador del equipo (tablas de win expectancy)"""
+    if season is None:
+        season = get_current_season()
+
+    tables = load_tables()
+    if tables is None:
+        return pd.DataFrame()
+
+    try:
+        columns = list(dict.fromkeys(WE_COLUMNS + WPA_COLUMNS + PLATE_APPEARANCES_OPTIONAL_COLUMNS))
+        pa = _team_plate_appearances(season, team_id, columns)
+        if pa.empty:
+            return pd.DataFrame()
+
+        # LI de las tablas de win expectancy; WPA del modelo versionado
+        plays = annotate_plays(_model_wpa(pa), tables)
+        plays['wpa'] = batting_wpa(plays)
+        leverage = calculate_player_leverage(
+            plays,
+            batter_ids=pa.loc[pa['batter_team_id'] == team_id, 'batter_id'].unique(),
+            pitcher_ids=pa.loc[pa['pitcher_team_id'] == team_id, 'pitcher_id'].unique(),
+        )
+        if leverage.empty:
+            return leverage
+        names = _player_names(leverage['player_id'])
+        leverage.insert(1, 'player_name', leverage['player_id'].map(names).fillna('N/A'))
+        return leverage
+
+    except Exception as e:
+        print(f"Error calculando leverage: {str(e)}")
+        return pd.DataFrame()
+
+@versioned_cache
+def get_game_re24(game_id, season=None):
+    """Turnos del juego con su RE24 (matriz de la temporada)"""
+    if season is None:
+        season = get_current_season()
+
+    try:
+        pa = _plate_appearances_for_games(season, [game_id], RE_COLUMNS)
+        if pa.empty:
+            return pd.DataFrame()
+        return compute_re24(pa, get_re_matrix(season).values)
+    except Exception as e:
+        print(f"Error calculando RE24 del juego {game_id}: {str(e)}")
+        return pd.DataFrame()
+
 def calculate_batting_stats(df):
     """Calcula estadísticas de bateo agregadas"""
     if df.empty:
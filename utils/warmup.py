@@ -0,0 +1,93 @@
+# utils/warmup.py
+"""
+Precarga de los datos de la temporada actual en los cachés de la app.
+
+`start_background_warmup()` corre una vez por proceso del servidor y vuelve a
+precargar cada vez que la ingesta publica una versión de datos nueva, así el
+primer visitante después de la ingesta nocturna encuentra los cachés llenos.
+
+Límite: Streamlit no ejecuta código al arrancar el servidor, así que el hilo
+nace en la primera ejecución del script (el primer visitante después de un
+deploy). Ese visitante no encuentra los cachés llenos, pero tampoco repite
+las lecturas: utils.cache calcula cada loader una sola vez y su Home espera
+las lecturas que la precarga ya tiene en curso.
+
+`scripts/warm_cache.py` hace la misma precarga a mano; solo le sirve a la app
+lo que queda fuera del proceso (archivos Arrow o CACHE_BACKEND=disk).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+from utils import data_version
+from utils import supabase_client as client
+from utils.game_mvp import get_game_wpa_mvp
+from utils.win_expectancy import load_tables
+
+LEONES_ID = 695
+MAX_WORKERS = 8
+
+
+def _last_game_mvp():
+    recent = client.get_recent_games(team_id=LEONES_ID, limit=1)
+    if not recent.empty and recent.iloc[0].get("id"):
+        get_game_wpa_mvp(recent.iloc[0]["id"])
+
+
+def warm_targets(season=None) -> dict:
+    """Loaders de la Home con los mismos argumentos que usa la página"""
+    season = season or client.get_current_season()
+    return {
+        "get_available_seasons": lambda: client.get_available_seasons(),
+        "get_standings": lambda: client.get_standings(season),
+        "get_recent_games": lambda: client.get_recent_games(team_id=LEONES_ID, limit=10),
+        "get_batting_stats": lambda: client.get_batting_stats(team_id=LEONES_ID, limit=10, season=season),
+        "get_pitching_stats": lambda: client.get_pitching_stats(team_id=LEONES_ID, limit=10, season=season),
+        "get_leones_advanced_stats": lambda: client.get_leones_advanced_stats(season),
+        "get_game_wpa_mvp": _last_game_mvp,
+        "win_expectancy": load_tables,
+    }
+
+
+def _timed(load):
+    start = time.perf_counter()
+    try:
+        load()
+        return round(time.perf_counter() - start, 3)
+    except Exception as e:
+        return f"error: {str(e)[:100]}"
+
+
+def warm_up(season=None, max_workers=MAX_WORKERS) -> dict:
+    """Ejecuta los loaders en paralelo; retorna {loader: segundos o error}."""
+    targets = warm_targets(season)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup") as pool:
+        futures = {pool.submit(_timed, load): name for name, load in targets.items()}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def _warm_loop():
+    last_version = None
+    while True:
+        try:
+            version = client.get_data_version(client.get_current_season())
+            if version != last_version:
+                warm_up()
+                last_version = version
+        except Exception as e:
+            print(f"⚠️ Error en la precarga de cachés: {str(e)[:100]}")
+        time.sleep(data_version.POLL_INTERVAL_S)
+
+
+@st.cache_resource(show_spinner=False)
+def start_background_warmup():
+    """Arranca el hilo de precarga (una sola vez por proceso)"""
+    thread = threading.Thread(target=_warm_loop, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
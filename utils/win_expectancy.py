@@ -0,0 +1,306 @@
+# utils/win_expectancy.py
+"""
+Tablas de win expectancy (WE) y leverage index (LI) por estado de juego.
+
+El estado es (inning, mitad, outs, corredores, diferencia del home club).
+Las tablas se construyen una vez con el historial de la LVBP
+(scripts/build_win_expectancy.py) y se guardan como arreglos numpy en un
+.npz, con una copia en Supabase Storage que la app baja si no lo tiene. Así el LI de cada turno, el pLI, el gmLI de los relevistas y el clutch
+son búsquedas O(1) por índice, sin simulaciones.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.run_expectancy import N_BASE_STATES, N_OUTS, build_re_matrix
+from utils.wpa import calculate_wp
+
+# Extrainnings comparten la fila del 10mo
+MAX_INNING = 10
+# Diferencias mayores se recortan a +/- MAX_DIFF
+MAX_DIFF = 10
+N_DIFFS = 2 * MAX_DIFF + 1
+
+# Turnos "virtuales" del estimado previo en cada estado: los estados con
+# pocos turnos en el historial quedan cerca del previo
+WE_PRIOR_WEIGHT = 150
+# Carreras por turno en las transiciones (4 = grand slam)
+MAX_RUNS = 4
+
+TABLES_PATH = os.environ.get("WIN_EXPECTANCY_PATH", os.path.join("data", "win_expectancy.npz"))
+# Copia del .npz en Supabase Storage (la sube el job nocturno)
+TABLES_BUCKET = os.environ.get("WIN_EXPECTANCY_BUCKET", "models")
+TABLES_OBJECT = "win_expectancy.npz"
+# Segundos antes de volver a buscar unas tablas que no estaban
+MISSING_RETRY_S = 600
+
+# Columnas de plate_appearances que necesitan las tablas
+WE_COLUMNS = [
+    "game_id", "at_bat_index", "inning", "half_inning", "outs_before", "outs_after", "base_state",
+    "bat_score", "fld_score", "runs_scored", "batter_id", "pitcher_id",
+]
+
+
+def state_index(inning, half_inning, outs, base_state, home_diff):
+    """Índices (arreglos) de cada estado en las tablas"""
+    inning = np.clip(np.asarray(inning, dtype=int), 1, MAX_INNING) - 1
+    half = (np.asarray(half_inning) == "bottom").astype(int)
+    outs = np.clip(np.asarray(outs, dtype=int), 0, N_OUTS - 1)
+    bases = np.asarray(base_state, dtype=int)
+    diff = np.clip(np.asarray(home_diff, dtype=int), -MAX_DIFF, MAX_DIFF) + MAX_DIFF
+    return inning, half, outs, bases, diff
+
+
+def pa_state_index(pa):
+    """Índices del estado al inicio de cada turno"""
+    bottom = (pa["half_inning"] == "bottom").to_numpy()
+    bat, fld = pa["bat_score"].to_numpy(), pa["fld_score"].to_numpy()
+    home_diff = np.where(bottom, bat - fld, fld - bat)
+    return state_index(pa["inning"], pa["half_inning"], pa["outs_before"], pa["base_state"], home_diff)
+
+
+def _prior_we(pa, idx, won, re_values):
+    """
+    Estimado previo de la WE de cada estado. Primero la WE por (inning, mitad,
+    diferencia) sin corredores ni outs, suavizada hacia calculate_wp; luego
+    cada estado base-out se lee en la diferencia desplazada por sus carreras
+    esperadas (RE) respecto al inicio de la mitad.
+    """
+    inning, half, _, _, diff = idx
+    counts = np.zeros((MAX_INNING, 2, N_DIFFS))
+    wins = np.zeros((MAX_INNING, 2, N_DIFFS))
+    np.add.at(counts, (inning, half, diff), 1)
+    np.add.at(wins, (inning, half, diff), won)
+    model = np.array([[calculate_wp(i, d) for d in range(-MAX_DIFF, MAX_DIFF + 1)]
+                      for i in range(1, MAX_INNING + 1)])[:, None, :]
+    pooled = (wins + WE_PRIOR_WEIGHT * model) / (counts + WE_PRIOR_WEIGHT)
+
+    # Diferencia efectiva: el equipo al bate suma las carreras esperadas extra del estado
+    i, h, o, b, d = np.ogrid[:MAX_INNING, :2, :N_OUTS, :N_BASE_STATES, :N_DIFFS]
+    extra_runs = re_values[b, o] - re_values[0, 0]
+    position = np.clip(d + np.where(h == 1, extra_runs, -extra_runs), 0, N_DIFFS - 1)
+    low = np.floor(position).astype(int)
+    high = np.minimum(low + 1, N_DIFFS - 1)
+    frac = position - low
+    return pooled[i, h, low] * (1 - frac) + pooled[i, h, high] * frac
+
+
+class WinExpectancyTables:
+    """WE del home club y LI por estado, con los turnos que respaldan cada celda."""
+
+    def __init__(self, we, li, counts, seasons=()):
+        self.we = we
+        self.li = li
+        self.counts = counts
+        self.seasons = tuple(int(s) for s in seasons)
+
+    def save(self, path=TABLES_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            we=self.we.astype(np.float32),
+            li=self.li.astype(np.float32),
+            counts=self.counts.astype(np.int32),
+            seasons=np.array(self.seasons, dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path=TABLES_PATH):
+        with np.load(path) as data:
+            return cls(data["we"], data["li"], data["counts"], data["seasons"].tolist())
+
+
+_loaded = {}
+_missing_since = {}
+_tables_lock = threading.Lock()
+
+
+def upload_tables(supabase, path=TABLES_PATH):
+    """Sube el .npz a Supabase Storage, reemplazando la copia anterior"""
+    with open(path, "rb") as f:
+        supabase.storage.from_(TABLES_BUCKET).upload(
+            TABLES_OBJECT, f.read(), {"content-type": "application/octet-stream", "upsert": "true"}
+        )
+
+
+def _download_tables(path):
+    """Baja el .npz de Supabase Storage a `path`; False si no se pudo"""
+    try:
+        from utils.db import create_supabase_client
+
+        data = create_supabase_client().storage.from_(TABLES_BUCKET).download(TABLES_OBJECT)
+    except Exception as e:
+        print(f"⚠️ Tablas de win expectancy no disponibles en Storage: {str(e)[:100]}")
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_tables(path=TABLES_PATH):
+    """
+    Tablas del .npz (una vez por proceso); si no está en disco se baja de
+    Supabase Storage. None si todavía no se construyeron: ese resultado no se
+    guarda y se vuelve a buscar pasados MISSING_RETRY_S.
+    """
+    tables = _loaded.get(path)
+    if tables is not None:
+        return tables
+    with _tables_lock:
+        if path in _loaded:
+            return _loaded[path]
+        missing_since = _missing_since.get(path)
+        if missing_since is not None and time.monotonic() - missing_since < MISSING_RETRY_S:
+            return None
+        if not os.path.exists(path) and not _download_tables(path):
+            _missing_since[path] = time.monotonic()
+            return None
+        _missing_since.pop(path, None)
+        _loaded[path] = WinExpectancyTables.load(path)
+        return _loaded[path]
+
+
+def _transition_probs(pa):
+    """
+    P(corredores y outs después, carreras | corredores y outs antes) con todos
+    los turnos: arreglo [outs, corredores, corredores', outs' (3 = fin de la
+    mitad), carreras]. No depende del inning ni del marcador.
+    """
+    halves = ["game_id", "inning", "half_inning"]
+    same_half = pa[halves].shift(-1).eq(pa[halves]).all(axis=1).to_numpy()
+    complete = (pa.groupby(halves, sort=False)["outs_after"].transform("max") >= N_OUTS).to_numpy()
+    # Último turno de una mitad que no cerró con 3 outs (terreneada): sin transición
+    valid = (same_half | complete) & (pa["outs_before"].to_numpy() < N_OUTS)
+
+    outs = pa["outs_before"].to_numpy().astype(int)
+    bases = pa["base_state"].to_numpy().astype(int)
+    next_outs = np.where(same_half, np.roll(outs, -1), N_OUTS)
+    next_bases = np.where(same_half, np.roll(bases, -1), 0)
+    runs = np.clip(pa["runs_scored"].to_numpy().astype(int), 0, MAX_RUNS)
+
+    counts = np.zeros((N_OUTS, N_BASE_STATES, N_BASE_STATES, N_OUTS + 1, MAX_RUNS + 1))
+    np.add.at(counts, (outs[valid], bases[valid], next_bases[valid], next_outs[valid], runs[valid]), 1)
+    totals = counts.sum(axis=(2, 3, 4), keepdims=True)
+    return np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+
+def _expected_swing(we, transitions):
+    """
+    Cambio absoluto esperado de WE desde cada estado: promedio sobre las
+    transiciones base-out de |WE(estado siguiente) - WE(estado)|, con el
+    cambio de mitad de inning y los finales de juego (terreneada, home club
+    arriba al cerrar el 9no alto).
+    """
+    # Ejes: inning, mitad, outs, corredores, diferencia, corredores', outs', carreras
+    i, h, o, b, d, b2, o2, r = np.ogrid[
+        :MAX_INNING, :2, :N_OUTS, :N_BASE_STATES, :N_DIFFS, :N_BASE_STATES, :N_OUTS + 1, :MAX_RUNS + 1
+    ]
+    bottom = h == 1
+    diff = np.clip(d + np.where(bottom, r, -r), 0, N_DIFFS - 1)
+    home_ahead = diff > MAX_DIFF
+    late = i >= 8  # 9no inning o extrainnings
+
+    # La mitad sigue: mismo inning, nuevos corredores y outs
+    same = we[i, h, np.minimum(o2, N_OUTS - 1), b2, diff]
+    # Terreneada: el home club toma la ventaja en la baja del 9no o después
+    same = np.where(bottom & late & home_ahead, 1.0, same)
+
+    # Fin de la mitad: baja del mismo inning o alta del siguiente
+    next_half = np.where(bottom, we[np.minimum(i + 1, MAX_INNING - 1), 0, 0, 0, diff], we[i, 1, 0, 0, diff])
+    ended_top = ~bottom & late & home_ahead
+    ended_bottom = bottom & late & (diff != MAX_DIFF)
+    next_half = np.where(ended_top, 1.0, next_half)
+    next_half = np.where(ended_bottom, home_ahead.astype(float), next_half)
+
+    we_next = np.where(o2 == N_OUTS, next_half, same)
+    swing = np.abs(we_next - we[i, h, o, b, d])
+    probs = transitions[None, None, :, :, None, :, :, :]
+    return (swing * probs).sum(axis=(5, 6, 7))
+
+
+def build_tables(pa, home_won, seasons=()):
+    """
+    Construye las tablas con turnos de juegos finalizados.
+
+    `home_won` es {game_id: bool}. La WE de cada estado es la proporción de
+    juegos ganados por el home club desde ese estado; el LI es el cambio
+    absoluto esperado de WE en el estado (transiciones base-out de todo el
+    historial), dividido entre el promedio de todos los turnos.
+    """
+    pa = pa[pa["game_id"].isin(home_won.keys())].sort_values(["game_id", "at_bat_index"]).reset_index(drop=True)
+    shape = (MAX_INNING, 2, N_OUTS, N_BASE_STATES, N_DIFFS)
+    idx = pa_state_index(pa)
+
+    won = pa["game_id"].map(home_won).astype(float).to_numpy()
+    counts = np.zeros(shape, dtype=np.int64)
+    wins = np.zeros(shape)
+    np.add.at(counts, idx, 1)
+    np.add.at(wins, idx, won)
+    prior = _prior_we(pa, idx, won, build_re_matrix(pa).values)
+    we = (wins + WE_PRIOR_WEIGHT * prior) / (counts + WE_PRIOR_WEIGHT)
+
+    # LI: cambio esperado de WE relativo al del turno promedio
+    swing = _expected_swing(we, _transition_probs(pa))
+    mean_swing = swing[idx].mean() if len(pa) else 0.0
+    li = swing / mean_swing if mean_swing > 0 else np.ones(shape)
+
+    return WinExpectancyTables(we, li, counts, seasons)
+
+
+def annotate_plays(pa, tables):
+    """Agrega li y we_before (perspectiva del equipo al bate) a cada turno"""
+    pa = pa.sort_values(["game_id", "at_bat_index"]).reset_index(drop=True)
+    if pa.empty:
+        return pa.assign(li=[], we_before=[])
+
+    idx = pa_state_index(pa)
+    home_before = tables.we[idx].astype(float)
+    bottom = (pa["half_inning"] == "bottom").to_numpy()
+    return pa.assign(
+        li=tables.li[idx].astype(float),
+        we_before=np.where(bottom, home_before, 1 - home_before),
+    )
+
+
+def calculate_player_leverage(plays, batter_ids=None, pitcher_ids=None):
+    """
+    pLI, WPA, WPA/LI y clutch por bateador y por pitcher; gmLI (LI al entrar)
+    para los pitchers que salieron del bullpen. `plays` trae li y wpa desde
+    la perspectiva del equipo al bate (utils.wpa.batting_wpa).
+
+    clutch = WPA / pLI - WPA/LI: positivo si el jugador rindió más en los
+    momentos de mayor leverage que en el resto.
+    """
+    plays = plays.dropna(subset=["wpa"]).assign(wpa_li=lambda df: df["wpa"] / df["li"])
+
+    # El abridor de cada lado es el pitcher del primer turno de la mitad
+    first_pitchers = plays.groupby(["game_id", "half_inning"])["pitcher_id"].first()
+    starters = set(zip(first_pitchers.index.get_level_values("game_id"), first_pitchers))
+    entries = plays.groupby(["game_id", "pitcher_id"], as_index=False).first()
+    entries = entries[[(g, p) not in starters for g, p in zip(entries["game_id"], entries["pitcher_id"])]]
+    gm_li = entries.groupby("pitcher_id")["li"].mean()
+
+    frames = []
+    for role, column, sign, ids in (("Bateador", "batter_id", 1, batter_ids), ("Pitcher", "pitcher_id", -1, pitcher_ids)):
+        subset = plays if ids is None else plays[plays[column].isin(ids)]
+        if subset.empty:
+            continue
+        grouped = subset.groupby(column).agg(
+            pa=("li", "size"), pli=("li", "mean"), wpa=("wpa", "sum"), wpa_li=("wpa_li", "sum")
+        )
+        grouped[["wpa", "wpa_li"]] *= sign
+        grouped["clutch"] = grouped["wpa"] / grouped["pli"] - grouped["wpa_li"]
+        grouped["gmli"] = gm_li.reindex(grouped.index) if role == "Pitcher" else np.nan
+        grouped.index.name = "player_id"
+        frames.append(grouped.reset_index().assign(role=role))
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values("wpa", ascending=False).reset_index(drop=True)
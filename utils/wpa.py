@@ -0,0 +1,281 @@
+# utils/wpa.py
+"""
+Cálculo de Win Probability Added (WPA) a partir del feed live de statsapi.
+
+Lógica pura (sin Streamlit ni red) compartida por la página de Análisis WPA,
+la Home, el modo en vivo y los benchmarks. pandas se importa dentro de las
+funciones que arman DataFrames: la ingesta solo usa play_wpa_records (numpy).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TEAM_ID = 695  # Leones del Caracas
+
+# Versión del modelo de win_probability: cambiarla junto con la fórmula y
+# correr scripts/recompute_wpa.py para regenerar el WPA guardado
+WP_MODEL_VERSION = 1
+
+# Columnas de plate_appearances que necesita play_wpa
+WPA_COLUMNS = ["game_id", "at_bat_index", "inning", "half_inning", "bat_score", "fld_score", "runs_scored"]
+
+
+def win_probability(inning, diff):
+    """Win Probability (vectorizado) según inning y diferencial del equipo"""
+    inning = np.asarray(inning, dtype=float)
+    diff = np.asarray(diff, dtype=float)
+    leverage = np.minimum(inning / 9.0, 1.0)
+    wp = 1.0 / (1.0 + np.exp(-0.75 * diff))
+    return np.clip(wp + 0.25 * leverage * (wp - 0.5), 0.0, 1.0)
+
+
+def calculate_wp(inning: int, diff: int) -> float:
+    """Calcula Win Probability simple basado en inning y diferencial"""
+    return float(win_probability(inning, diff))
+
+
+def _wp_arrays(game_ids, innings, home_diff, final=True):
+    """(wp_before, wp_after) del home club para turnos ya ordenados por juego y turno"""
+    wp_after = win_probability(innings, home_diff)
+    first_in_game = np.insert(game_ids[1:] != game_ids[:-1], 0, True)
+    last_in_game = np.append(game_ids[1:] != game_ids[:-1], True)
+    if final:
+        wp_after = np.where(last_in_game, (home_diff > 0).astype(float), wp_after)
+    wp_before = np.where(first_in_game, 0.5, np.roll(wp_after, 1))
+    return wp_before, wp_after
+
+
+def _home_diff(bottom, bat_score, fld_score, runs_scored):
+    bat_after = bat_score + runs_scored
+    return np.where(bottom, bat_after - fld_score, fld_score - bat_after)
+
+
+def play_wpa(pa: pd.DataFrame, final: bool = True) -> pd.DataFrame:
+    """
+    WP/WPA del home club para cada turno guardado (una pasada vectorizada
+    por todos los juegos). Mismo cálculo que WPAState: WP antes = WP después
+    del turno anterior (0.5 al inicio) y, con `final`, el último turno de cada
+    juego lleva el WP a 0 o 1.
+    """
+    pa = pa.sort_values(["game_id", "at_bat_index"]).reset_index(drop=True)
+    if pa.empty:
+        return pa.assign(wp_before=[], wp_after=[], wpa=[], wp_model_version=[])
+
+    home_diff = _home_diff(
+        (pa["half_inning"] == "bottom").to_numpy(),
+        pa["bat_score"].to_numpy(), pa["fld_score"].to_numpy(), pa["runs_scored"].to_numpy(),
+    )
+    wp_before, wp_after = _wp_arrays(pa["game_id"].to_numpy(), pa["inning"].to_numpy(), home_diff, final)
+    return pa.assign(
+        wp_before=wp_before,
+        wp_after=wp_after,
+        wpa=wp_after - wp_before,
+        wp_model_version=WP_MODEL_VERSION,
+    )
+
+
+def play_wpa_records(records: list) -> list:
+    """
+    Registros de plate_appearances con wp_before, wp_after, wpa y
+    wp_model_version. Trabaja sobre arrays (sin DataFrame): se llama una vez
+    por juego durante la ingesta.
+    """
+    if not records:
+        return records
+    game_ids = np.array([r["game_id"] for r in records])
+    order = np.lexsort((np.array([r["at_bat_index"] for r in records]), game_ids))
+    ordered = [records[i] for i in order]
+
+    home_diff = _home_diff(
+        np.array([r["half_inning"] == "bottom" for r in ordered]),
+        np.array([r["bat_score"] for r in ordered], dtype=float),
+        np.array([r["fld_score"] for r in ordered], dtype=float),
+        np.array([r["runs_scored"] for r in ordered], dtype=float),
+    )
+    wp_before, wp_after = _wp_arrays(
+        game_ids[order], np.array([r["inning"] for r in ordered], dtype=float), home_diff,
+    )
+    result = [None] * len(records)
+    for i, before, after in zip(order.tolist(), wp_before.tolist(), wp_after.tolist()):
+        result[i] = dict(
+            records[i],
+            wp_before=before,
+            wp_after=after,
+            wpa=after - before,
+            wp_model_version=WP_MODEL_VERSION,
+        )
+    return result
+
+
+def batting_wpa(pa: pd.DataFrame) -> np.ndarray:
+    """WPA de cada turno desde la perspectiva del equipo al bate (el guardado es del home club)"""
+    return np.where(pa["half_inning"] == "bottom", pa["wpa"], -pa["wpa"])
+
+
+class WPAState:
+    """
+    Estado del WPA de un juego (marcador y último WP) desde la perspectiva de
+    `team_id`. Las jugadas se aplican una a una, así el modo en vivo solo
+    procesa las nuevas.
+    """
+
+    def __init__(self, team_is_home: bool, team_id: int = TEAM_ID):
+        self.team_id = team_id
+        self.team_is_home = team_is_home
+        self.home_score = 0
+        self.away_score = 0
+        self.prev_wp = 0.5
+        self.rows = []
+
+    def apply_play(self, play: dict) -> dict:
+        """Agrega la fila de WPA de la jugada y actualiza marcador y WP"""
+        leones_is_home = self.team_is_home
+        about = play.get("about", {})
+        result = play.get("result", {})
+        matchup = play.get("matchup", {})
+
+        inning = about.get("inning", 1)
+        half = about.get("halfInning", "top")
+
+        # Calcular carreras anotadas
+        runs = sum(1 for runner in play.get("runners", [])
+                   if runner.get("movement", {}).get("end") == "score")
+
+        # Actualizar score
+        if half == "bottom":
+            self.home_score += runs
+        else:
+            self.away_score += runs
+
+        # Perspectiva Leones
+        leones_score = self.home_score if leones_is_home else self.away_score
+        opp_score = self.away_score if leones_is_home else self.home_score
+
+        # Calcular WPA
+        diff = leones_score - opp_score
+        wp_after = calculate_wp(inning, diff)
+        wpa = wp_after - self.prev_wp
+
+        # Determinar si el bateador/pitcher es de Leones
+        batter_team = matchup.get("batter", {}).get("parentTeamId")
+        pitcher_team = matchup.get("pitcher", {}).get("parentTeamId")
+
+        row = {
+            "atbat_index": len(self.rows),
+            "inning": inning,
+            "halfInning": half,
+            "batter_id": matchup.get("batter", {}).get("id"),
+            "batter": matchup.get("batter", {}).get("fullName", "Desconocido"),
+            "pitcher_id": matchup.get("pitcher", {}).get("id"),
+            "pitcher": matchup.get("pitcher", {}).get("fullName", "Desconocido"),
+            "eventType": result.get("event", ""),
+            "description": result.get("description", ""),
+            "leones_before": leones_score - (runs if half == ("bottom" if leones_is_home else "top") else 0),
+            "opp_before": opp_score - (runs if half != ("bottom" if leones_is_home else "top") else 0),
+            "leones_after": leones_score,
+            "opp_after": opp_score,
+            "wp_before": self.prev_wp,
+            "wp_after": wp_after,
+            "wpa": wpa,
+            "batter_is_leones": batter_team == self.team_id if batter_team else None,
+            "pitcher_is_leones": pitcher_team == self.team_id if pitcher_team else None
+        }
+        self.rows.append(row)
+        self.prev_wp = wp_after
+        return row
+
+    def to_frame(self, final: bool = True) -> pd.DataFrame:
+        """DataFrame de jugadas; con `final` la última jugada lleva el WP a 0 o 1"""
+        rows = list(self.rows)
+
+        # Ajustar WPA final
+        if final and rows:
+            last = dict(rows[-1])
+            final_diff = last["leones_after"] - last["opp_after"]
+            final_wp = 1.0 if final_diff > 0 else 0.0
+            last["wp_after"] = final_wp
+            last["wpa"] = final_wp - last["wp_before"]
+            rows[-1] = last
+
+        import pandas as pd
+
+        return pd.DataFrame(rows)
+
+
+def feed_team_is_home(feed: dict, team_id: int = TEAM_ID):
+    """True/False si `team_id` es local en el feed; None si el feed no trae equipos"""
+    try:
+        return feed["gameData"]["teams"]["home"]["id"] == team_id
+    except (KeyError, TypeError):
+        return None
+
+
+def compute_feed_wpa(feed: dict, team_id: int = TEAM_ID) -> tuple:
+    """
+    Recorre las jugadas del feed y calcula WP/WPA desde la perspectiva de `team_id`.
+
+    Returns:
+        tuple: (df_wpa, team_is_home, error_message)
+    """
+    import pandas as pd
+
+    # Identificar si el equipo es local o visitante
+    leones_is_home = feed_team_is_home(feed, team_id)
+    if leones_is_home is None:
+        return pd.DataFrame(), False, "Error en datos del juego"
+
+    # Procesar jugadas
+    all_plays = feed.get("liveData", {}).get("plays", {}).get("allPlays", [])
+
+    if not all_plays:
+        return pd.DataFrame(), leones_is_home, "No hay jugadas disponibles"
+
+    state = WPAState(leones_is_home, team_id)
+    for play in all_plays:
+        state.apply_play(play)
+
+    return state.to_frame(final=True), leones_is_home, None
+
+
+def roster_from_boxscore(box: dict, team_id: int = TEAM_ID) -> set:
+    """IDs de jugadores del equipo que participaron en el juego"""
+    players = set()
+
+    for side in ["home", "away"]:
+        team_data = box.get("teams", {}).get(side, {})
+        if team_data.get("team", {}).get("id") == team_id:
+            for player_id, player_data in team_data.get("players", {}).items():
+                players.add(player_data.get("person", {}).get("id"))
+
+    return players
+
+
+def calculate_player_wpa(df_wpa: pd.DataFrame, roster_ids: set) -> pd.DataFrame:
+    """Calcula WPA total por jugador"""
+    import pandas as pd
+
+    # WPA como bateador
+    wpa_bat = df_wpa.groupby(["batter_id", "batter"])["wpa"].sum().reset_index()
+    wpa_bat.columns = ["player_id", "player", "wpa_bat"]
+
+    # WPA como pitcher (invertido - bueno para el pitcher si el bateador hace negativo)
+    wpa_pit = df_wpa.groupby(["pitcher_id", "pitcher"])["wpa"].sum().reset_index()
+    wpa_pit.columns = ["player_id", "player", "wpa_pit"]
+
+    # Combinar
+    wpa_total = pd.merge(wpa_bat, wpa_pit, on=["player_id", "player"], how="outer").fillna(0)
+
+    # Filtrar solo jugadores de Leones si tenemos el roster
+    if roster_ids:
+        wpa_total = wpa_total[wpa_total["player_id"].isin(roster_ids)]
+
+    wpa_total["WPA_total"] = wpa_total["wpa_bat"] + wpa_total["wpa_pit"]
+    wpa_total = wpa_total.sort_values("WPA_total", ascending=False)
+
+    return wpa_total